@@ -0,0 +1,336 @@
+"""
+Batched writes of score sheet changes.
+"""
+from django.db import transaction
+from rest_framework import serializers
+from bowling_entry import models as bowling_models
+from bowling_entry import coalesce
+from bowling_entry import events
+from bowling_entry import packing
+from bowling_entry import scoring
+from bowling_entry.bulk import bulk_delete, bulk_update
+from bowling_entry.signals import scores_updated
+
+BOWLER_FIELDS = ('definition', 'type', 'handicap', 'average', )
+GAME_FIELDS = ('total', )
+FRAME_FIELDS = ('throw1_type', 'throw1_value', 'throw2_type', 'throw2_value', 'throw3_type', 'throw3_value', )
+
+
+class ScoreSheetBatch(object):
+    """
+    Collection of the bowlers, games and frames of a match that are targeted by a score sheet update.  Rows are loaded
+    with one query per level, modified in memory and written back with bulk queries, so the number of queries does not
+    depend on the number of frames in the update.
+
+    Frames of packed games are unpacked when they are loaded and packed again when they are saved, games that still
+    have frame rows are converted to the packed format when packed frames are turned on.
+    """
+
+    def __init__(self, match, league=None, packed=None):
+        self.match = match
+        self._league = league
+        self.packed = packing.packed_frames_enabled() if packed is None else packed
+
+        self.bowlers = {}
+        self.games = {}
+        self.games_by_pk = {}
+        self.frames = {}
+
+        self.dirty_bowlers = {}
+        self.dirty_games = {}
+        self.dirty_frames = {}
+        self.new_frames = {}
+        self.repacked_games = {}
+        self.converted_games = set()
+        self.frame_values = {}
+
+        # Lanes that the match is moved to, None when they are not changed.
+        self.lanes = None
+
+        # Version of the match that the changes were written at, known once they went through the write coalescer.
+        self.version = None
+
+    @property
+    def league(self):
+        if self._league is None:
+            self._league = self.match.week.league
+        return self._league
+
+    def load(self, bowler_ids, frame_game_numbers=None):
+        """
+        Load the bowlers of the match that are listed, all of their games and the frames of the games.
+        :param bowler_ids: primary keys of the bowler instances targeted by the update.
+        :param frame_game_numbers: (bowler id, game number) pairs of the games whose frames will be updated, all of
+        the games when not provided.
+        """
+        bowler_ids = set(bowler_ids)
+        if not bowler_ids:
+            return
+
+        teams = [self.match.team1_id, self.match.team2_id]
+        for bowler in bowling_models.TeamInstanceBowler.objects.filter(team__in=teams, pk__in=bowler_ids):
+            self.bowlers[bowler.pk] = bowler
+
+        if not self.bowlers:
+            return
+
+        for game in bowling_models.Game.objects.filter(bowler__in=list(self.bowlers)):
+            self.games[(game.bowler_id, game.game_number)] = game
+            self.games_by_pk[game.pk] = game
+
+        if frame_game_numbers is None:
+            frame_games = list(self.games.values())
+        else:
+            frame_games = [self.games[key] for key in frame_game_numbers if key in self.games]
+
+        self.load_frames(frame_games)
+
+    def load_game(self, game):
+        """
+        Add a single game that was looked up along with its bowler and load its frames.
+        """
+        self.bowlers[game.bowler_id] = game.bowler
+        self.games[(game.bowler_id, game.game_number)] = game
+        self.games_by_pk[game.pk] = game
+        self.load_frames([game])
+
+    def load_frames(self, games):
+        """
+        Load the frames of the games, with a single query for the games that still have frame rows.
+        """
+        row_games = [game for game in games if game.packed_frames is None]
+        if row_games:
+            for frame in bowling_models.Frame.objects.filter(game__in=row_games):
+                self.frames[(frame.game_id, frame.frame_number)] = frame
+
+        for game in games:
+            if game.packed_frames is not None:
+                for frame in packing.unpack_frames(game):
+                    self.frames[(game.pk, frame.frame_number)] = frame
+
+    def is_packed(self, game):
+        """
+        Whether the frames of the game are written to its packed column.
+        """
+        return self.packed or game.packed_frames is not None
+
+    def get_bowler(self, team, bowler_id):
+        bowler = self.bowlers.get(bowler_id)
+        if bowler is None or bowler.team_id != team.pk:
+            raise serializers.ValidationError('Bowler %s is not a part of team %s' % (bowler_id, team.pk))
+        return bowler
+
+    def get_game(self, bowler, game_number):
+        game = self.games.get((bowler.pk, game_number))
+        if game is None:
+            raise serializers.ValidationError('Bowler %s does not have a game %s' % (bowler.pk, game_number))
+        return game
+
+    def get_frame(self, game, frame_number):
+        """
+        Retrieve the frame of the game, a new frame is created when the game does not have it yet.
+        """
+        key = (game.pk, frame_number)
+        frame = self.frames.get(key)
+        if frame is None:
+            if self.is_packed(game) and not 1 <= frame_number <= bowling_models.FRAMES_PER_GAME:
+                raise serializers.ValidationError('Game %s does not have a frame %s' % (game.pk, frame_number))
+
+            frame = bowling_models.Frame(game=game, frame_number=frame_number)
+            self.frames[key] = frame
+            if not self.is_packed(game):
+                self.new_frames[key] = frame
+        return frame
+
+    def update_lanes(self, lanes):
+        self.lanes = lanes
+
+    def update_bowler(self, bowler, definition, bowler_type):
+        values = (definition.pk, bowler_type, self.league.calculate_handicap(definition), definition.average)
+        if values == (bowler.definition_id, bowler.type, bowler.handicap, bowler.average):
+            return
+
+        bowler.definition = definition
+        bowler.type = bowler_type
+        bowler.handicap, bowler.average = values[2:]
+        self.dirty_bowlers[bowler.pk] = bowler
+
+    def update_game(self, game, total):
+        if total == game.total:
+            return
+
+        game.total = total
+        self.dirty_games[game.pk] = game
+
+    def score_game(self, game):
+        """
+        Recompute the total of the game from its frames in the batch.
+        """
+        rows = [(game.pk, frame.frame_number) + tuple(getattr(frame, field) for field in FRAME_FIELDS)
+                for (game_pk, frame_number), frame in self.frames.items() if game_pk == game.pk]
+
+        game_ids, throws = scoring.throws_array(rows)
+        self.update_game(game, int(scoring.game_totals(throws)[0]) if game_ids else 0)
+
+    def update_frame(self, frame, values):
+        for attr, value in values.items():
+            setattr(frame, attr, value)
+
+        key = (frame.game_id, frame.frame_number)
+        self.frame_values.setdefault(key, {}).update(values)
+
+        game = self.games_by_pk[frame.game_id]
+        if self.is_packed(game):
+            self.repacked_games[game.pk] = game
+            return
+
+        if key not in self.new_frames:
+            self.dirty_frames[key] = frame
+
+    def has_score_changes(self):
+        """
+        Whether a game total or a bowler that the standings and the statistics are computed from was changed.
+        """
+        return bool(self.dirty_bowlers or self.dirty_games)
+
+    def has_changes(self):
+        return bool(self.dirty_bowlers or self.dirty_games or self.dirty_frames or self.new_frames or
+                    self.repacked_games or self.lanes is not None)
+
+    def repack(self):
+        """
+        Pack the frames of the games whose frames were updated.  Games that are converted from frame rows are
+        remembered so that their rows are removed when the batch is written.
+        """
+        for game in self.repacked_games.values():
+            if game.packed_frames is None:
+                self.converted_games.add(game.pk)
+
+            frames = [frame for key, frame in self.frames.items() if key[0] == game.pk]
+            try:
+                game.packed_frames = packing.pack_frames(frames)
+            except ValueError as error:
+                raise serializers.ValidationError(str(error))
+
+    def merge(self, other):
+        """
+        Apply the changes of a later batch of the same match on top of the changes of this batch.  Rows that both
+        batches modified are written once, with the values of the fields that each of them changed.
+        """
+        for pk, bowler in other.dirty_bowlers.items():
+            target = self.bowlers.setdefault(pk, bowler)
+            for field in BOWLER_FIELDS:
+                setattr(target, field, getattr(bowler, field))
+            self.dirty_bowlers[pk] = target
+
+        frame_games = set(key[0] for key in other.frame_values)
+        for game_pk in frame_games.union(other.dirty_games):
+            if game_pk not in self.games_by_pk:
+                game = other.games_by_pk[game_pk]
+                self.games[(game.bowler_id, game.game_number)] = game
+                self.games_by_pk[game_pk] = game
+
+        for pk, game in other.dirty_games.items():
+            target = self.games_by_pk[pk]
+            if target is game:
+                # Games that only the later batch loaded already hold its total.
+                self.dirty_games[pk] = game
+            else:
+                self.update_game(target, game.total)
+
+        # Frames that only the later batch loaded are needed to pack the games again.
+        for key, frame in other.frames.items():
+            if key[0] in frame_games and key not in self.frames:
+                self.frames[key] = frame
+                if key in other.new_frames:
+                    self.new_frames[key] = frame
+
+        for key, values in sorted(other.frame_values.items()):
+            self.update_frame(self.frames[key], values)
+
+        self.converted_games.update(other.converted_games)
+
+        if other.lanes is not None:
+            self.lanes = other.lanes
+
+    def save(self):
+        """
+        Write all of the modified rows back to the database, through the write coalescer when it is turned on.
+        """
+        if not self.has_changes():
+            return
+
+        # Packing validates the frames, invalid updates are rejected before they are queued.
+        self.repack()
+
+        coalescer = coalesce.get_coalescer()
+        if coalescer is not None:
+            self.version = coalescer.submit(self)
+            return
+
+        with transaction.atomic():
+            self.write()
+        self.publish()
+
+    def write(self):
+        """
+        Write the modified rows, must be called within a transaction.
+        """
+        # Frames merged in from later batches have not been packed yet.
+        self.repack()
+
+        if self.lanes is not None:
+            bowling_models.Match.objects.filter(pk=self.match.pk).update(lanes=self.lanes)
+            # The lanes are listed with the matches of the week, the update does not send the signal that touches it.
+            bowling_models.Week.touch([self.match.week_id])
+
+        bulk_update(bowling_models.TeamInstanceBowler, list(self.dirty_bowlers.values()), BOWLER_FIELDS)
+
+        if self.repacked_games:
+            games = dict(self.dirty_games)
+            games.update(self.repacked_games)
+            bulk_update(bowling_models.Game, list(games.values()), GAME_FIELDS + ('packed_frames', ))
+        else:
+            bulk_update(bowling_models.Game, list(self.dirty_games.values()), GAME_FIELDS)
+
+        if self.converted_games:
+            bulk_delete(bowling_models.Frame.objects.filter(game__in=list(self.converted_games)))
+
+        bulk_update(bowling_models.Frame, list(self.dirty_frames.values()), FRAME_FIELDS)
+
+        if self.new_frames:
+            bowling_models.Frame.objects.bulk_create(list(self.new_frames.values()))
+
+        # Frames and lanes alone do not change any of the tables derived from the scores.
+        if self.has_score_changes():
+            scores_updated.send(sender=self.__class__, matches=[self.match], league=self._league)
+        else:
+            bowling_models.Match.touch([self.match.pk])
+
+    def publish(self):
+        """
+        Tell the viewers of the match about the changes, once they have been committed.
+        """
+        events.publish_scores(self.match, self.changes())
+
+    def changes(self):
+        """
+        Values of the bowlers, games and frames that were modified, in the form pushed to the viewers of the match.
+        """
+        bowlers = [{'id': bowler.pk, 'definition': bowler.definition_id, 'type': bowler.type,
+                    'handicap': bowler.handicap, 'average': bowler.average}
+                   for bowler in self.dirty_bowlers.values()]
+
+        games = [{'id': game.pk, 'bowler': game.bowler_id, 'game_number': game.game_number, 'total': game.total}
+                 for game in self.dirty_games.values()]
+
+        frames = []
+        for game_pk, frame_number in sorted(self.frame_values):
+            game = self.games_by_pk[game_pk]
+            frame = self.frames[(game_pk, frame_number)]
+            values = dict((field, getattr(frame, field)) for field in FRAME_FIELDS)
+            values.update({'game': game_pk, 'bowler': game.bowler_id, 'game_number': game.game_number,
+                           'frame_number': frame_number})
+            frames.append(values)
+
+        return {'bowlers': bowlers, 'games': games, 'frames': frames}
@@ -0,0 +1,314 @@
+"""
+Benchmark of the API routes against synthetic leagues.
+
+Every route is requested a number of times against leagues of several sizes, the latency and the number of SQL queries
+of each request are recorded.  Each request is made inside a transaction that is rolled back afterwards, so the writes
+do not change the data that the following requests see.
+
+The results are plain dictionaries that the benchmark_api management command writes out as JSON, so the results of two
+commits can be compared.
+
+Every view declares the most SQL queries that each of its methods may take in a query_budgets dictionary.  The budgets
+do not depend on the size of the league, the test suite checks them against leagues of two sizes.  Score updates that
+change the total of a game also update the standings, statistics and series of the match, those routes are checked
+against a budget of their own.
+"""
+import collections
+import datetime
+import platform
+import re
+from timeit import default_timer
+
+import django
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.urlresolvers import resolve, reverse
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from bowling_entry import models as bowling_models
+from bowling_entry import packing
+from bowling_entry import synthetic
+
+# Sizes of the generated leagues, the season is half bowled and the last week has no matches yet.
+SCALES = collections.OrderedDict([
+    ('small', {'number_of_teams': 4, 'number_of_weeks': 4, 'number_of_games': 3, 'players_per_team': 4}),
+    ('medium', {'number_of_teams': 12, 'number_of_weeks': 18, 'number_of_games': 3, 'players_per_team': 4}),
+    ('large', {'number_of_teams': 24, 'number_of_weeks': 36, 'number_of_games': 3, 'players_per_team': 5}),
+])
+
+# Names accepted when a scale is given as a list of name=value pairs.
+SCALE_OPTIONS = {
+    'teams': 'number_of_teams',
+    'weeks': 'number_of_weeks',
+    'games': 'number_of_games',
+    'players': 'players_per_team',
+}
+
+
+def parse_scale(value):
+    """
+    Options of the scale, either the name of one of SCALES or a list like teams=16,weeks=32,games=3,players=4.
+    :return: (name, options) tuple.
+    """
+    if value in SCALES:
+        return value, dict(SCALES[value])
+
+    options = dict(SCALES['small'])
+    for item in value.split(','):
+        key, _, number = item.partition('=')
+        if key.strip() not in SCALE_OPTIONS:
+            raise ValueError('Unknown scale option "%s"' % key)
+        options[SCALE_OPTIONS[key.strip()]] = int(number)
+
+    return value, options
+
+
+class BenchmarkContext(object):
+    """
+    Objects of a generated league that the routes are requested for.
+    """
+
+    def __init__(self, league):
+        self.league = league
+
+        weeks = list(league.weeks.order_by('week_number'))
+        self.week = weeks[0]
+        self.open_week = weeks[-1]
+
+        self.match = self.week.matches.select_related('team1', 'team2').order_by('pk')[0]
+        self.bowler_instance = self.match.team1.bowlers.order_by('order')[0]
+        self.game = self.bowler_instance.games.order_by('game_number')[0]
+
+        self.teams = list(league.teams.order_by('pk')[:2])
+        self.team = self.teams[0]
+        self.bowler = self.team.bowlers.order_by('pk')[0]
+        self.substitute = league.substitutes().order_by('pk')[0]
+
+
+class Route(object):
+    """
+    Request made against a route of the API.
+    :param name: name of the route in the results.
+    :param method: HTTP method of the request.
+    :param url: callable that builds the URL from the benchmark context.
+    :param data: callable that builds the request data from the benchmark context.
+    :param format: format of the request data.
+    :param budget: key of the query budget of the route in the query_budgets of its view, the method when not provided.
+    """
+
+    def __init__(self, name, method, url, data=None, format='json', budget=None):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.data = data
+        self.format = format
+        self.budget = budget or method.upper()
+
+    def request(self, client, context):
+        data = self.data(context) if self.data is not None else None
+        response = getattr(client, self.method)(self.url(context), data, format=self.format)
+
+        # Streamed responses are only done once all of their content has been read.
+        if response.streaming:
+            for chunk in response.streaming_content:
+                pass
+
+        return response
+
+
+def frame_url(context):
+    return reverse('bowling_entry_league_week_match_frame_detail',
+                   args=[context.league.pk, context.week.week_number, context.match.pk, context.bowler_instance.pk,
+                         context.game.game_number, 1])
+
+
+def score_sheet_update(context, total=None):
+    # A frame entered on the score sheet, the total of the game is sent back unchanged unless another one is given.
+    return {'team1': {'bowlers': [{'id': context.bowler_instance.pk, 'games': [
+        {'game_number': context.game.game_number, 'total': context.game.total if total is None else total,
+         'frames': [{'frame_number': 1, 'throw1_value': 7, 'throw2_value': 2}]}
+    ]}]}}
+
+
+def frame_total_update(context):
+    # A gutter frame takes the pins of the frame and of its bonus off the total, a frame that is already a gutter frame
+    # is given pins instead.
+    frame = next(frame for frame in context.game.get_frames() if frame.frame_number == 1)
+    if frame.throw1_value or frame.throw2_value:
+        return {'throw1_value': 0, 'throw2_value': 0, 'update_total': True}
+    return {'throw1_value': 9, 'throw2_value': 0, 'update_total': True}
+
+
+def roster_upload(context):
+    lines = ['name,gender,average,team'] + ['Imported %s,M,150,Imported Team %s' % (index, index // 4)
+                                            for index in range(20)]
+    return {'file': SimpleUploadedFile('roster.csv', '\n'.join(lines).encode('utf-8'))}
+
+
+ROUTES = [
+    Route('league_list', 'get', lambda context: reverse('bowling_entry_leagues')),
+    Route('league_detail', 'get', lambda context: context.league.get_absolute_url()),
+    Route('league_update', 'patch', lambda context: context.league.get_absolute_url(),
+          lambda context: {'name': 'Renamed League'}),
+    Route('substitutes', 'get', lambda context: context.league.get_absolute_substitutes_url()),
+    Route('substitute_detail', 'get', lambda context: context.substitute.get_absolute_url()),
+    Route('substitute_update', 'patch', lambda context: context.substitute.get_absolute_url(),
+          lambda context: {'average': 165}),
+    Route('teams', 'get', lambda context: context.league.get_absolute_teams_url()),
+    Route('team_detail', 'get', lambda context: context.team.get_absolute_url()),
+    Route('team_bowlers', 'get', lambda context: context.team.get_absolute_bowlers_url()),
+    Route('bowler_detail', 'get', lambda context: context.bowler.get_absolute_url()),
+    Route('bowler_update', 'patch', lambda context: context.bowler.get_absolute_url(),
+          lambda context: {'average': 170}),
+    Route('weeks', 'get', lambda context: context.league.get_absolute_weeks_url()),
+    Route('week_detail', 'get', lambda context: context.week.get_absolute_url()),
+    Route('matches', 'get', lambda context: context.week.get_absolute_matches_url()),
+    Route('match_create', 'post', lambda context: context.open_week.get_absolute_matches_url(),
+          lambda context: {'team1_definition': context.teams[0].pk, 'team2_definition': context.teams[1].pk,
+                           'lanes': '1,2'}),
+    Route('scoresheet', 'get', lambda context: context.match.get_absolute_url()),
+    Route('scoresheet_update', 'patch', lambda context: context.match.get_absolute_url(), score_sheet_update),
+    Route('scoresheet_update_total', 'patch', lambda context: context.match.get_absolute_url(),
+          lambda context: score_sheet_update(context, total=context.game.total + 1), budget='PATCH_TOTAL'),
+    Route('frame', 'get', frame_url),
+    Route('frame_update', 'patch', frame_url, lambda context: {'throw1_value': 9, 'throw2_value': 1}),
+    Route('frame_update_total', 'patch', frame_url, frame_total_update, budget='PATCH_TOTAL'),
+    Route('week_standings', 'get', lambda context: context.week.get_absolute_standings_url()),
+    Route('standings', 'get', lambda context: context.league.get_absolute_standings_url()),
+    Route('leaderboard', 'get', lambda context: reverse('bowling_entry_leaderboard', args=['series']),
+          lambda context: {'handicap': True, 'gender': bowling_models.FEMALE}),
+    Route('schedule', 'post', lambda context: context.league.get_absolute_schedule_url(),
+          lambda context: {'replace': True}),
+    Route('roster', 'post', lambda context: context.league.get_absolute_roster_url(), roster_upload,
+          format='multipart'),
+    Route('export', 'get', lambda context: context.league.get_absolute_export_url()),
+    Route('self', 'get', lambda context: reverse('bowling_entry_self')),
+]
+
+
+def query_budget(route, context):
+    """
+    Most queries that the view of the route may take for the budget of the route, None when it does not declare one.
+    """
+    view = resolve(route.url(context)).func
+    return getattr(getattr(view, 'cls', None), 'query_budgets', {}).get(route.budget)
+
+
+# Parts of a captured query that change from one request to the next.
+QUERY_PREFIX = re.compile(r"^QUERY = u?'")
+QUERY_PARAMS = re.compile(r"' - PARAMS = .*$", re.DOTALL)
+IN_LIST = re.compile(r'IN \([^()]*\)')
+SAVEPOINT_NAME = re.compile(r'"s\d+_x\d+"')
+
+
+def normalize_sql(sql):
+    """
+    Statement of a captured query without its parameters, so that the same statement run for different rows matches.
+    """
+    sql = QUERY_PARAMS.sub('', QUERY_PREFIX.sub('', sql))
+    return SAVEPOINT_NAME.sub('"savepoint"', IN_LIST.sub('IN (...)', sql))
+
+
+def duplicated_queries(queries):
+    """
+    Statements that were run more than once, usually a lookup made for every row of a list.
+    :param queries: queries captured by CaptureQueriesContext.
+    :return: list of (count, statement) tuples, most repeated first.
+    """
+    counts = collections.Counter(normalize_sql(query['sql']) for query in queries)
+    return sorted(((count, sql) for sql, count in counts.items() if count > 1), reverse=True)
+
+
+def measure(client, route, context, repeat=5):
+    """
+    Request the route a number of times, rolling back the changes of every request.
+    :return: dictionary with the status, the number of queries and the latencies in milliseconds.
+    """
+    timings = []
+    queries = []
+    status = None
+
+    for index in range(repeat):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                start = default_timer()
+                response = route.request(client, context)
+                timings.append((default_timer() - start) * 1000)
+            transaction.set_rollback(True)
+
+        queries.append(len(captured))
+        status = response.status_code
+
+    ordered = sorted(timings)
+    return {
+        'route': route.name,
+        'method': route.method.upper(),
+        'status': status,
+        'queries': max(queries),
+        'budget': query_budget(route, context),
+        'first_ms': round(timings[0], 3),
+        'min_ms': round(ordered[0], 3),
+        'median_ms': round(ordered[len(ordered) // 2], 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def run_benchmark(client, secretary, scales, repeat=5, routes=None, seed=0):
+    """
+    Generate a league for every scale and measure the routes against it.
+    :param client: authenticated API client.
+    :param secretary: user that the leagues are created for.
+    :param scales: list of (name, options) tuples, the options are passed on to synthetic.generate_league.
+    :param repeat: number of requests made to each route.
+    :param routes: routes to measure, all of ROUTES when not provided.
+    :param seed: seed of the generated leagues.
+    :return: dictionary with the environment, the scales and the measurements.
+    """
+    routes = ROUTES if routes is None else routes
+    report = {
+        'created': datetime.datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'packed_frames': packing.packed_frames_enabled(),
+        'scales': [],
+        'results': [],
+    }
+
+    for name, options in scales:
+        start = default_timer()
+        league = synthetic.generate_league(secretary, scored_weeks=max(options['number_of_weeks'] // 2, 1),
+                                           open_weeks=1, seed=seed, name='Benchmark %s' % name, **options)
+        scale = dict(options, name=name, generate_ms=round((default_timer() - start) * 1000, 3),
+                     games=bowling_models.Game.objects.filter(bowler__team__week__league=league).count())
+        report['scales'].append(scale)
+
+        context = BenchmarkContext(league)
+        for route in routes:
+            result = measure(client, route, context, repeat)
+            result['scale'] = name
+            report['results'].append(result)
+
+    return report
+
+
+def compare(baseline, report):
+    """
+    Compare the measurements against the ones of an earlier run.
+    :return: list of dictionaries with the change in queries and in median latency of every route and scale.
+    """
+    previous = dict(((result['scale'], result['route']), result) for result in baseline['results'])
+
+    changes = []
+    for result in report['results']:
+        before = previous.get((result['scale'], result['route']))
+        if before is None:
+            continue
+
+        changes.append({
+            'scale': result['scale'],
+            'route': result['route'],
+            'queries': result['queries'] - before['queries'],
+            'median_ratio': round(result['median_ms'] / before['median_ms'], 3) if before['median_ms'] else None,
+        })
+
+    return changes
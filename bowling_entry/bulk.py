@@ -0,0 +1,159 @@
+"""
+Helpers for writing many rows of the same model in as few queries as possible.
+"""
+import itertools
+
+from django.db import connections, router, transaction
+
+# Upper bound on the number of rows written by a single statement.
+MAX_BATCH_SIZE = 1000
+
+
+def bulk_insert(model, objs, key_fields, **filter_kwargs):
+    """
+    Insert all of the objects with a single bulk_create and fill in their primary keys.
+
+    bulk_create does not report the keys of the rows that it inserted, so they are read back in one query.  The
+    key_fields must identify each of the new rows uniquely among the rows that match filter_kwargs.
+    :param model: model class of the objects.
+    :param objs: unsaved model instances.
+    :param key_fields: attribute names (use the _id form for foreign keys) that identify a row.
+    :param filter_kwargs: filter that selects the inserted rows when reading back the keys.
+    :return: the objects with their primary keys assigned.
+    """
+    if not objs:
+        return objs
+
+    model.objects.bulk_create(objs)
+
+    pks = {}
+    for row in model.objects.filter(**filter_kwargs).values_list('pk', *key_fields):
+        pks[row[1:]] = row[0]
+
+    for obj in objs:
+        obj.pk = pks[tuple(getattr(obj, field) for field in key_fields)]
+
+    return objs
+
+
+def bulk_update(model, objs, fields):
+    """
+    Write the fields of all of the objects back to the database.  Each batch of objects is written with a single
+    UPDATE ... SET column = CASE pk WHEN ... END statement.
+    :param model: model class of the objects.
+    :param objs: saved model instances.
+    :param fields: names of the fields to write.
+    """
+    if not objs or not fields:
+        return
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+
+    meta = model._meta
+    model_fields = [meta.get_field(name) for name in fields]
+    pk_column = quote_name(meta.pk.column)
+
+    # Every object needs a pk and a value for each field in the CASE statements and a pk in the WHERE clause.
+    batch_size = min(MAX_BATCH_SIZE, connection.ops.bulk_batch_size([meta.pk] * (2 * len(fields) + 1), objs))
+
+    # PostgreSQL can not infer the type of the parameters in the CASE statements.
+    cast_values = connection.vendor == 'postgresql'
+
+    with transaction.atomic(using=using, savepoint=False):
+        cursor = connection.cursor()
+
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            assignments = []
+            params = []
+
+            for field in model_fields:
+                placeholder = 'CAST(%%s AS %s)' % field.db_type(connection) if cast_values else '%s'
+
+                cases = []
+                for obj in batch:
+                    cases.append('WHEN %%s THEN %s' % placeholder)
+                    params.append(obj.pk)
+                    params.append(field.get_db_prep_save(getattr(obj, field.attname), connection=connection))
+
+                assignments.append('%s = CASE %s %s END' % (quote_name(field.column), pk_column, ' '.join(cases)))
+
+            params.extend(obj.pk for obj in batch)
+
+            cursor.execute('UPDATE %s SET %s WHERE %s IN (%s)' % (quote_name(meta.db_table), ', '.join(assignments),
+                                                                   pk_column, ', '.join(['%s'] * len(batch))),
+                           params)
+
+
+def bulk_delete(queryset):
+    """
+    Delete the rows selected by the queryset with a single DELETE ... WHERE pk IN (SELECT ...) statement.  Databases
+    that can not select from the table that is being written to (MySQL) read the keys first and delete the rows in
+    batches of keys instead.
+
+    Unlike QuerySet.delete, the rows are not collected first, so the rows that point at them are not deleted along
+    with them and no delete signals are sent.  The rows that reference the deleted rows must be deleted first.
+    :param queryset: queryset selecting the rows to delete.
+    :return: the number of rows deleted.
+    """
+    model = queryset.model
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    meta = model._meta
+
+    sql = 'DELETE FROM %s WHERE %s IN (%%s)' % (quote_name(meta.db_table), quote_name(meta.pk.column))
+    queryset = queryset.order_by()
+
+    with transaction.atomic(using=using, savepoint=False):
+        cursor = connection.cursor()
+
+        if connection.features.update_can_self_select:
+            select_sql, params = queryset.values('pk').query.sql_with_params()
+            cursor.execute(sql % select_sql, params)
+            return cursor.rowcount
+
+        pks = list(queryset.values_list('pk', flat=True))
+        batch_size = min(MAX_BATCH_SIZE, connection.ops.bulk_batch_size([meta.pk], pks))
+
+        count = 0
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start:start + batch_size]
+            cursor.execute(sql % ', '.join(['%s'] * len(batch)), batch)
+            count += cursor.rowcount
+        return count
+
+
+def insert_rows(model, fields, rows, batch_size=MAX_BATCH_SIZE):
+    """
+    Insert rows given as tuples of field values with executemany, without building model instances.  The values are
+    written as they are, they must already be in the form that the database stores.
+    :param model: model class that the rows are inserted into.
+    :param fields: names of the fields in the order of the values of the rows.
+    :param rows: iterable of tuples of values.
+    :param batch_size: number of rows passed to a single executemany.
+    :return: the number of rows inserted.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+
+    meta = model._meta
+    columns = [quote_name(meta.get_field(name).column) for name in fields]
+    sql = 'INSERT INTO %s (%s) VALUES (%s)' % (quote_name(meta.db_table), ', '.join(columns),
+                                              ', '.join(['%s'] * len(columns)))
+
+    count = 0
+    rows = iter(rows)
+    with transaction.atomic(using=using, savepoint=False):
+        cursor = connection.cursor()
+
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return count
+
+            cursor.executemany(sql, batch)
+            count += len(batch)
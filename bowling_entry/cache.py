@@ -0,0 +1,54 @@
+"""
+Cache of the serialized score sheets of matches.
+
+Caching is turned on by naming one of the caches defined in CACHES with the BOWLING_ENTRY_SCORESHEET_CACHE setting,
+the locmem and file based backends are enough for a single server.  Entries are keyed by the match and the versions of
+the match and its league, every write to the match, its bowlers, games or frames moves the match to a new version and
+renaming teams or bowlers moves the league to a new version, so stale entries are never read and simply expire after
+BOWLING_ENTRY_SCORESHEET_CACHE_TIMEOUT seconds.
+"""
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_TIMEOUT = 60 * 60
+
+
+def get_cache():
+    """
+    The cache that holds the score sheets, None when caching is turned off.
+    """
+    alias = getattr(settings, 'BOWLING_ENTRY_SCORESHEET_CACHE', None)
+    if alias is None:
+        return None
+    return caches[alias]
+
+
+def scoresheet_key(match_pk, versions):
+    return 'bowling_entry:scoresheet:%s:%s' % (match_pk, '.'.join(str(version) for version in versions))
+
+
+def get_scoresheet(match_pk, versions):
+    """
+    The cached score sheet of the match, None when it has not been cached.
+    :param match_pk: primary key of the match.
+    :param versions: current versions of the match and its league.
+    """
+    cache = get_cache()
+    if cache is None:
+        return None
+    return cache.get(scoresheet_key(match_pk, versions))
+
+
+def set_scoresheet(match_pk, versions, data):
+    """
+    Cache the serialized score sheet of the match.
+    :param match_pk: primary key of the match.
+    :param versions: current versions of the match and its league.
+    :param data: serialized score sheet.
+    """
+    cache = get_cache()
+    if cache is not None:
+        cache.set(scoresheet_key(match_pk, versions), OrderedDict(data),
+                  getattr(settings, 'BOWLING_ENTRY_SCORESHEET_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
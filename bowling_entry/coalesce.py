@@ -0,0 +1,158 @@
+"""
+Coalescing of score sheet writes.
+
+On league night every lane sends an update after each ball, and committing each of them on its own serializes the
+requests on the write lock of the database.  When the BOWLING_ENTRY_COALESCE_WINDOW setting (in seconds) is set, the
+batches of the updates are queued instead: the first update that arrives opens a group and waits for the window to
+pass, or for BOWLING_ENTRY_COALESCE_MAX_UPDATES updates to be queued, then writes every batch of the group in a single
+transaction.  Batches of the same match are merged first, so a frame that was changed by several updates is written
+once.  Every request waits until its group has been committed and is given the version of the match that its changes
+were written at.
+
+The queue lives in the memory of the process, so only the updates of requests served by the threads of one process are
+coalesced.  The writes of a group are committed on their own, the requests must not be wrapped in a transaction
+(ATOMIC_REQUESTS) for the coalescing to happen.
+"""
+import collections
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from bowling_entry import models as bowling_models
+
+# Response header that carries the version of the match that a coalesced update was written at.
+VERSION_HEADER = 'X-Match-Version'
+
+
+def get_window():
+    return getattr(settings, 'BOWLING_ENTRY_COALESCE_WINDOW', 0)
+
+
+def get_max_updates():
+    return getattr(settings, 'BOWLING_ENTRY_COALESCE_MAX_UPDATES', 50)
+
+
+def merge_batches(batches):
+    """
+    Merge the batches of the same match into the first batch of the match.
+    :return: one batch per match, in the order that the matches were first updated.
+    """
+    merged = collections.OrderedDict()
+    for batch in batches:
+        target = merged.get(batch.match.pk)
+        if target is None:
+            merged[batch.match.pk] = batch
+        else:
+            target.merge(batch)
+    return list(merged.values())
+
+
+def commit_batches(batches):
+    """
+    Write the batches in a single transaction and tell the viewers of the matches about the changes.
+    :return: dictionary of match pk to the version of the match that the changes were written at.
+    """
+    batches = merge_batches(batches)
+
+    with transaction.atomic():
+        for batch in batches:
+            batch.write()
+
+        matches = bowling_models.Match.objects.filter(pk__in=[batch.match.pk for batch in batches])
+        versions = dict(matches.values_list('pk', 'version'))
+
+    for batch in batches:
+        batch.publish()
+
+    return versions
+
+
+class Group(object):
+    """
+    Batches that are written together.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.done = threading.Event()
+        self.versions = {}
+        self.error = None
+
+
+class WriteCoalescer(object):
+    """
+    Queues the batches of score sheet updates and writes them in groups.
+    """
+
+    def __init__(self, window, max_updates):
+        self.window = window
+        self.max_updates = max_updates
+        self.condition = threading.Condition()
+        self.group = None
+
+    def submit(self, batch):
+        """
+        Queue the batch and wait until it has been written.
+        :param batch: ScoreSheetBatch with the changes of an update.
+        :return: the version of the match that the changes were written at.
+        """
+        with self.condition:
+            group = self.group
+            leader = group is None or len(group.batches) >= self.max_updates
+            if leader:
+                group = self.group = Group()
+
+            group.batches.append(batch)
+            if len(group.batches) >= self.max_updates:
+                self.condition.notify_all()
+
+            if leader:
+                deadline = time.time() + self.window
+                while len(group.batches) < self.max_updates:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+                # Later updates open a new group, this one is closed.
+                if self.group is group:
+                    self.group = None
+
+        if leader:
+            try:
+                group.versions = self.commit(group.batches)
+            except Exception as error:
+                group.error = error
+                raise
+            finally:
+                group.done.set()
+        else:
+            group.done.wait()
+            if group.error is not None:
+                raise group.error
+
+        return group.versions.get(batch.match.pk)
+
+    def commit(self, batches):
+        return commit_batches(batches)
+
+
+_coalescers = {}
+_coalescers_lock = threading.Lock()
+
+
+def get_coalescer():
+    """
+    Write coalescer for the current settings, None when the writes are not coalesced.
+    """
+    window = get_window()
+    if not window:
+        return None
+
+    key = (window, get_max_updates())
+    with _coalescers_lock:
+        coalescer = _coalescers.get(key)
+        if coalescer is None:
+            coalescer = _coalescers[key] = WriteCoalescer(*key)
+    return coalescer
@@ -0,0 +1,199 @@
+"""
+Server-sent events pushed to the viewers of matches and weeks.
+
+Score sheet updates are published to an in-process broker as a single message holding the bowlers, games and frames
+that changed.  The message is encoded once and added to the history of the topics of the match and of its week, the
+streams of all of the viewers read it from there.  The history of a topic is a ring buffer of the latest
+BOWLING_ENTRY_EVENTS_HISTORY messages, which lets a client that reconnects with a Last-Event-ID pick up the messages
+that it missed.  A topic that has no open streams is dropped along with its history BOWLING_ENTRY_EVENTS_TOPIC_TTL
+seconds after its last message was published or its last stream was closed, long enough for a viewer to reconnect.
+
+The broker lives in the memory of the process, so publishers and viewers have to be served by the same process (a
+single node running a threaded server).  Every open stream holds on to a worker thread, streams are closed after
+BOWLING_ENTRY_EVENTS_TIMEOUT seconds and the browser reconnects on its own.
+"""
+import collections
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+SCORES_EVENT = 'scores'
+
+# Comment sent when nothing was published for a while, keeps proxies from closing the connection.
+KEEPALIVE = ': keepalive\n\n'
+
+
+def get_history_size():
+    return getattr(settings, 'BOWLING_ENTRY_EVENTS_HISTORY', 100)
+
+
+def get_keepalive_interval():
+    return getattr(settings, 'BOWLING_ENTRY_EVENTS_KEEPALIVE', 15)
+
+
+def get_stream_timeout():
+    return getattr(settings, 'BOWLING_ENTRY_EVENTS_TIMEOUT', 300)
+
+
+def get_topic_ttl():
+    return getattr(settings, 'BOWLING_ENTRY_EVENTS_TOPIC_TTL', 60)
+
+
+def match_topic(match_pk):
+    return 'match:%s' % match_pk
+
+
+def week_topic(week_pk):
+    return 'week:%s' % week_pk
+
+
+def format_message(event_id, event, data):
+    return 'id: %s\nevent: %s\ndata: %s\n\n' % (event_id, event, data)
+
+
+class Broker(object):
+    """
+    Keeps the latest messages of each topic and wakes up the streams when a message is published.
+    """
+
+    def __init__(self, history_size=None, topic_ttl=None):
+        self.history_size = history_size or get_history_size()
+        self.topic_ttl = topic_ttl if topic_ttl is not None else get_topic_ttl()
+        self.condition = threading.Condition()
+        self.topics = {}
+        self.subscribers = {}
+        # Time at which each topic without open streams is dropped, in the order that they expire.
+        self.expires = collections.OrderedDict()
+        self.last_id = 0
+
+    def publish(self, topics, event, data):
+        """
+        Encode the message once and add it to the history of every topic.
+        :param topics: names of the topics that the message is published to.
+        :param event: name of the event.
+        :param data: JSON serializable payload.
+        :return: the id of the message.
+        """
+        data = json.dumps(data, cls=DjangoJSONEncoder)
+
+        with self.condition:
+            now = time.time()
+            self.expire(now)
+
+            self.last_id += 1
+            message = (self.last_id, format_message(self.last_id, event, data))
+            for topic in topics:
+                history = self.topics.get(topic)
+                if history is None:
+                    history = self.topics[topic] = collections.deque(maxlen=self.history_size)
+                history.append(message)
+
+                if topic not in self.subscribers:
+                    self.expires.pop(topic, None)
+                    self.expires[topic] = now + self.topic_ttl
+            self.condition.notify_all()
+
+        return self.last_id
+
+    def subscribe(self, topic):
+        """
+        Register a stream of the topic.
+        :return: token that unsubscribes the stream.
+        """
+        token = object()
+        with self.condition:
+            self.expire(time.time())
+            self.subscribers.setdefault(topic, set()).add(token)
+            self.expires.pop(topic, None)
+        return token
+
+    def unsubscribe(self, topic, token):
+        """
+        Remove a stream of the topic, the history of the topic is kept for topic_ttl seconds after its last stream.
+        """
+        with self.condition:
+            subscribers = self.subscribers.get(topic)
+            if subscribers is None:
+                return
+
+            subscribers.discard(token)
+            if not subscribers:
+                del self.subscribers[topic]
+                if topic in self.topics:
+                    self.expires[topic] = time.time() + self.topic_ttl
+
+    def expire(self, now):
+        """
+        Drop the topics without open streams whose time is up, must be called with the lock held.
+        """
+        while self.expires:
+            topic = next(iter(self.expires))
+            if self.expires[topic] > now:
+                return
+
+            del self.expires[topic]
+            self.topics.pop(topic, None)
+
+    def pending(self, topic, last_id):
+        """
+        Messages of the topic that were published after the message with the id, must be called with the lock held.
+        """
+        return [message for message in self.topics.get(topic, ()) if message[0] > last_id]
+
+    def listen(self, topic, last_id=None, keepalive=None, timeout=None):
+        """
+        Wait for the messages of the topic.
+        :param topic: name of the topic.
+        :param last_id: id of the last message that the client received, only new messages are sent when not provided.
+        :param keepalive: seconds without messages before a keep alive comment is sent.
+        :param timeout: seconds before the stream ends.
+        :return: iterator of the encoded messages.
+        """
+        keepalive = keepalive or get_keepalive_interval()
+        deadline = time.time() + (timeout or get_stream_timeout())
+
+        token = self.subscribe(topic)
+        try:
+            with self.condition:
+                if last_id is None or last_id > self.last_id:
+                    last_id = self.last_id
+
+            while time.time() < deadline:
+                with self.condition:
+                    messages = self.pending(topic, last_id)
+                    if not messages:
+                        self.condition.wait(min(keepalive, max(deadline - time.time(), 0)))
+                        messages = self.pending(topic, last_id)
+
+                if not messages:
+                    yield KEEPALIVE
+                    continue
+
+                last_id = messages[-1][0]
+                for message_id, message in messages:
+                    yield message
+        finally:
+            self.unsubscribe(topic, token)
+
+
+broker = Broker()
+
+
+def parse_last_event_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def publish_scores(match, changes):
+    """
+    Push the changes of the score sheet of the match to the viewers of the match and of its week.
+    :param match: match that was updated.
+    :param changes: dictionary with the lists of bowlers, games and frames that changed.
+    """
+    data = dict(changes, match=match.pk, week=match.week_id)
+    return broker.publish([match_topic(match.pk), week_topic(match.week_id)], SCORES_EVENT, data)
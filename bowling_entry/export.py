@@ -0,0 +1,157 @@
+"""
+Export of every game and frame bowled in a league.
+
+The export has one row per frame, with the week, match, team, bowler and game that the frame belongs to repeated on
+every row.  Games that do not have any frames yet are exported as a single row with empty frame columns.
+
+The games are read in chunks of BOWLING_ENTRY_EXPORT_CHUNK_SIZE games ordered by primary key, each chunk takes one
+joined query for the games and one query for the frames of the chunk.  The rows are rendered as they are read, so only
+a single chunk is held in memory and the first chunk goes out before the rest of the league is read.
+"""
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import six
+from bowling_entry import models as bowling_models
+from bowling_entry import packing
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+
+CONTENT_TYPES = {
+    CSV: 'text/csv; charset=utf-8',
+    NDJSON: 'application/x-ndjson; charset=utf-8',
+}
+
+# Columns of the game rows along with the lookups that they are read from.
+GAME_COLUMNS = (
+    ('week_number', 'bowler__team__week__week_number'),
+    ('date', 'bowler__team__week__date'),
+    ('match', 'bowler__team__match'),
+    ('lanes', 'bowler__team__match__lanes'),
+    ('team', 'bowler__team__definition__name'),
+    ('bowler', 'bowler__definition__name'),
+    ('bowler_type', 'bowler__type'),
+    ('average', 'bowler__average'),
+    ('handicap', 'bowler__handicap'),
+    ('game_number', 'game_number'),
+    ('total', 'total'),
+)
+
+FRAME_COLUMNS = ('frame_number', ) + tuple(field for fields in packing.THROW_FIELDS for field in fields)
+
+COLUMNS = tuple(name for name, lookup in GAME_COLUMNS) + FRAME_COLUMNS
+
+EMPTY_FRAME = (None, ) * len(FRAME_COLUMNS)
+
+
+def get_chunk_size():
+    return getattr(settings, 'BOWLING_ENTRY_EXPORT_CHUNK_SIZE', 500)
+
+
+def game_chunks(league, chunk_size):
+    """
+    Read the games of the league in chunks, each chunk is read with a single joined query.
+    :return: iterator of lists of (pk, packed_frames, game columns...) tuples.
+    """
+    games = bowling_models.Game.objects.filter(bowler__team__week__league=league).order_by('pk')
+    lookups = [lookup for name, lookup in GAME_COLUMNS]
+    last_pk = 0
+
+    while True:
+        chunk = list(games.filter(pk__gt=last_pk).values_list('pk', 'packed_frames', *lookups)[:chunk_size])
+        if not chunk:
+            return
+
+        yield chunk
+
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1][0]
+
+
+def chunk_frames(chunk):
+    """
+    Frames of the games of the chunk, read from the frame rows with a single query or unpacked from the games.
+    :return: dictionary of game pk to a list of frame column tuples.
+    """
+    frames = {}
+    unpacked = []
+
+    for row in chunk:
+        if row[1] is None:
+            unpacked.append(row[0])
+        else:
+            game = bowling_models.Game(pk=row[0], packed_frames=row[1])
+            frames[row[0]] = [tuple(getattr(frame, column) for column in FRAME_COLUMNS)
+                              for frame in packing.unpack_frames(game)]
+
+    if unpacked:
+        rows = bowling_models.Frame.objects.filter(game__in=unpacked).order_by('game', 'frame_number')
+        for row in rows.values_list('game', *FRAME_COLUMNS):
+            frames.setdefault(row[0], []).append(row[1:])
+
+    return frames
+
+
+def export_rows(league, chunk_size=None):
+    """
+    Rows of the export of the league.
+    :param league: league to export.
+    :param chunk_size: number of games read by a single query.
+    :return: iterator of lists of row tuples in the order of COLUMNS, one list per chunk.
+    """
+    for chunk in game_chunks(league, chunk_size or get_chunk_size()):
+        frames = chunk_frames(chunk)
+
+        rows = []
+        for row in chunk:
+            for frame in frames.get(row[0]) or [EMPTY_FRAME]:
+                rows.append(row[2:] + frame)
+        yield rows
+
+
+class Echo(object):
+    """
+    File-like object that hands back what is written to it, lets csv.writer render rows without a buffer.
+    """
+    def write(self, value):
+        return value
+
+
+def encode_csv_value(value):
+    if value is None:
+        return ''
+    if six.PY2 and isinstance(value, six.text_type):
+        return value.encode('utf-8')
+    return value
+
+
+def export_csv(league, chunk_size=None):
+    """
+    Render the export of the league as CSV.
+    :return: iterator of strings, one for the header and one per chunk of games.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+
+    for rows in export_rows(league, chunk_size):
+        yield ''.join(writer.writerow([encode_csv_value(value) for value in row]) for row in rows)
+
+
+def export_ndjson(league, chunk_size=None):
+    """
+    Render the export of the league as newline delimited JSON, one object per row.
+    :return: iterator of strings, one per chunk of games.
+    """
+    encoder = DjangoJSONEncoder()
+
+    for rows in export_rows(league, chunk_size):
+        yield ''.join(encoder.encode(dict(zip(COLUMNS, row))) + '\n' for row in rows)
+
+
+EXPORTERS = {
+    CSV: export_csv,
+    NDJSON: export_ndjson,
+}
@@ -0,0 +1,182 @@
+"""
+Timings of the requests served by the bowling_entry views.
+
+When the BOWLING_ENTRY_INSTRUMENTATION setting is on, InstrumentationMiddleware records for every request made to a
+bowling_entry view the number of SQL queries and the time spent running them, the time the serializers spent validating
+the request data and serializing the response, and the time spent rendering the response.  The timings are sent back
+in a Server-Timing header and written to the bowling_entry.instrumentation logger, one line per request with the
+timings attached to the record as the timings attribute for structured log handlers.
+
+The setting is read on every request and set_enabled switches the instrumentation of the running process, so it can be
+turned on and off without a restart.  While it is off the middleware makes a single check per request and the views
+hand out their serializers untouched.
+
+The queries are counted with the debug cursor of the connections, which is only turned on for the requests that are
+instrumented.  The timings of a streamed response only cover the work done before the stream started.
+"""
+import logging
+import threading
+from timeit import default_timer
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Server-Timing'
+
+SQL = 'sql'
+VALIDATION = 'validation'
+SERIALIZATION = 'serialization'
+RENDER = 'render'
+TOTAL = 'total'
+
+# Order of the metrics in the header and in the log line.
+METRICS = (SQL, VALIDATION, SERIALIZATION, RENDER, TOTAL)
+
+_enabled = None
+_local = threading.local()
+
+
+def set_enabled(enabled):
+    """
+    Turn the instrumentation of this process on or off, None goes back to the BOWLING_ENTRY_INSTRUMENTATION setting.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled():
+    if _enabled is not None:
+        return _enabled
+    return getattr(settings, 'BOWLING_ENTRY_INSTRUMENTATION', False)
+
+
+def get_current():
+    """
+    Timings of the request being served by this thread, None when it is not instrumented.
+    """
+    return getattr(_local, 'timings', None)
+
+
+class RequestTimings(object):
+    """
+    Durations, in seconds, of the parts of a single request.
+    """
+
+    def __init__(self):
+        self.start = default_timer()
+        self.durations = {}
+        self.queries = 0
+        self.render_start = None
+
+        # (connection, debug cursor setting, number of queries logged) of every connection when the request started.
+        self.connections = []
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0) + seconds
+
+    def timed(self, name, function):
+        """
+        Wrap the function so that the time spent in it is added to the named duration.
+        """
+        def wrapper(*args, **kwargs):
+            start = default_timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(name, default_timer() - start)
+        return wrapper
+
+    def start_queries(self):
+        for connection in connections.all():
+            self.connections.append((connection, connection.use_debug_cursor, len(connection.queries)))
+            connection.use_debug_cursor = True
+
+    def stop_queries(self):
+        seconds = 0.0
+        for connection, use_debug_cursor, logged in self.connections:
+            queries = connection.queries[logged:]
+            self.queries += len(queries)
+            seconds += sum(float(query['time']) for query in queries)
+
+            # The queries are only kept when something else was logging them too.
+            connection.use_debug_cursor = use_debug_cursor
+            if not use_debug_cursor and not settings.DEBUG:
+                del connection.queries[logged:]
+
+        self.connections = []
+        self.add(SQL, seconds)
+
+    def start_render(self):
+        self.render_start = default_timer()
+
+    def stop_render(self, response):
+        self.add(RENDER, default_timer() - self.render_start)
+
+    def stop(self):
+        self.stop_queries()
+        self.durations[TOTAL] = default_timer() - self.start
+
+    def milliseconds(self):
+        return [(name, round(self.durations[name] * 1000, 3)) for name in METRICS if name in self.durations]
+
+    def header(self):
+        metrics = []
+        for name, duration in self.milliseconds():
+            metric = '%s;dur=%s' % (name, duration)
+            if name == SQL:
+                metric += ';desc="%s queries"' % self.queries
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+    def as_dict(self):
+        return dict(self.milliseconds(), queries=self.queries)
+
+
+def instrument_serializer(serializer):
+    """
+    Time the validation and the serialization done by the serializer when the current request is instrumented.
+    """
+    timings = get_current()
+    if timings is not None:
+        serializer.is_valid = timings.timed(VALIDATION, serializer.is_valid)
+        serializer.to_representation = timings.timed(SERIALIZATION, serializer.to_representation)
+    return serializer
+
+
+class InstrumentationMiddleware(object):
+    """
+    Record the timings of the requests made to the bowling_entry views while the instrumentation is enabled.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _local.timings = None
+        if not is_enabled() or not view_func.__module__.startswith('bowling_entry.'):
+            return None
+
+        timings = _local.timings = request.bowling_timings = RequestTimings()
+        timings.start_queries()
+        return None
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, 'bowling_timings', None)
+        if timings is not None:
+            timings.start_render()
+            response.add_post_render_callback(timings.stop_render)
+        return response
+
+    def process_response(self, request, response):
+        timings = getattr(request, 'bowling_timings', None)
+        if timings is None:
+            return response
+
+        _local.timings = None
+        timings.stop()
+
+        response[HEADER] = timings.header()
+        logger.info('%s %s %s queries=%s %s', request.method, request.path, response.status_code, timings.queries,
+                    ' '.join('%s_ms=%s' % (name, duration) for name, duration in timings.milliseconds()),
+                    extra={'timings': dict(timings.as_dict(), method=request.method, path=request.path,
+                                           status=response.status_code)})
+        return response
@@ -0,0 +1,69 @@
+import json
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from bowling_entry import benchmark
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class Command(BaseCommand):
+    help = ('Measures the latency and the number of queries of the API routes against generated leagues.  Nothing is '
+            'left in the database.')
+    option_list = BaseCommand.option_list + (
+        make_option('--scale', action='append', dest='scales', default=None,
+                    help='Scale to measure: small, medium, large or teams=N,weeks=N,games=N,players=N.  Can be '
+                         'repeated, defaults to all of the named scales.'),
+        make_option('--route', action='append', dest='routes', default=None,
+                    help='Name of a route to measure, can be repeated.  Defaults to all of the routes.'),
+        make_option('--repeat', action='store', dest='repeat', type='int', default=5,
+                    help='Number of requests made to each route.'),
+        make_option('--seed', action='store', dest='seed', type='int', default=0,
+                    help='Seed of the generated leagues.'),
+        make_option('--output', action='store', dest='output', default=None,
+                    help='File that the JSON results are written to instead of the standard output.'),
+        make_option('--compare', action='store', dest='compare', default=None,
+                    help='JSON results of an earlier run to compare against.'),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            scales = [benchmark.parse_scale(scale) for scale in options.get('scales') or benchmark.SCALES]
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        routes = benchmark.ROUTES
+        if options.get('routes'):
+            routes = [route for route in routes if route.name in options['routes']]
+            unknown = set(options['routes']) - set(route.name for route in routes)
+            if unknown:
+                raise CommandError('Unknown routes: %s' % ', '.join(sorted(unknown)))
+
+        baseline = None
+        if options.get('compare'):
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        # The test client is turned away by the host validation unless it is allowed.
+        with override_settings(ALLOWED_HOSTS=['*']), transaction.atomic():
+            # Staff, the leaderboards of the bowling center are only open to its staff.
+            secretary = auth_models.User.objects.create(username='bowling-entry-benchmark', is_staff=True)
+            client = APIClient()
+            client.force_authenticate(user=secretary)
+
+            report = benchmark.run_benchmark(client, secretary, scales, repeat=options.get('repeat') or 1,
+                                             routes=routes, seed=options.get('seed') or 0)
+            transaction.set_rollback(True)
+
+        if baseline is not None:
+            report['comparison'] = benchmark.compare(baseline, report)
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options.get('output'):
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+            self.stdout.write('Results written to %s' % options['output'])
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,70 @@
+import random
+from optparse import make_option
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand, CommandError
+from bowling_entry import models as bowling_models
+from bowling_entry import synthetic
+from django.contrib.auth import models as auth_models
+
+
+class Command(BaseCommand):
+    help = ('Generates leagues with their teams, bowlers, schedules and random scores driven by the averages of the '
+            'bowlers.  The same seed always generates the same leagues.')
+    option_list = BaseCommand.option_list + (
+        make_option('--leagues', action='store', dest='leagues', type='int', default=1,
+                    help='Number of leagues to generate.'),
+        make_option('--teams', action='store', dest='teams', type='int', default=8,
+                    help='Number of teams in each league.'),
+        make_option('--weeks', action='store', dest='weeks', type='int', default=10,
+                    help='Number of weeks in the season of each league.'),
+        make_option('--games', action='store', dest='games', type='int', default=3,
+                    help='Number of games bowled every week.'),
+        make_option('--players', action='store', dest='players', type='int', default=4,
+                    help='Number of bowlers on a team.'),
+        make_option('--substitutes', action='store', dest='substitutes', type='int', default=2,
+                    help='Number of substitutes of each league.'),
+        make_option('--scored-weeks', action='store', dest='scored_weeks', type='int', default=None,
+                    help='Number of weeks, from the start of the season, that have been bowled.  Defaults to the '
+                         'whole season.'),
+        make_option('--seed', action='store', dest='seed', type='int', default=0,
+                    help='Seed of the generated leagues.'),
+        make_option('--secretary', action='store', dest='secretary', default='bowling-entry-synthetic',
+                    help='User name of the secretary of the leagues, the user is created when it does not exist.'),
+        make_option('--skip-standings', action='store_true', dest='skip_standings', default=False,
+                    help='Do not compute the standings and the bowler statistics of the weeks that were bowled.'),
+    )
+
+    def handle(self, *args, **options):
+        number_of_weeks = options.get('weeks')
+        scored_weeks = options.get('scored_weeks')
+        if scored_weeks is None:
+            scored_weeks = number_of_weeks
+
+        if not 0 <= scored_weeks <= number_of_weeks:
+            raise CommandError('The number of scored weeks must be between 0 and %s' % number_of_weeks)
+        if options.get('leagues') < 1:
+            raise CommandError('At least one league must be generated')
+
+        secretary, created = auth_models.User.objects.get_or_create(username=options.get('secretary'))
+        rng = random.Random(options.get('seed'))
+
+        start = default_timer()
+        leagues = []
+        for index in range(options.get('leagues')):
+            leagues.append(synthetic.generate_league(
+                secretary, number_of_teams=options.get('teams'), number_of_weeks=number_of_weeks,
+                number_of_games=options.get('games'), players_per_team=options.get('players'),
+                number_of_substitutes=options.get('substitutes'), scored_weeks=scored_weeks,
+                seed=rng.randint(0, 2 ** 32 - 1), name='Synthetic League %s' % (index + 1),
+                update_standings=not options.get('skip_standings')))
+        seconds = default_timer() - start
+
+        matches = bowling_models.Match.objects.filter(week__league__in=leagues)
+        games = bowling_models.Game.objects.filter(bowler__team__week__league__in=leagues)
+        frames = games.filter(bowler__team__week__week_number__lte=scored_weeks).count() * \
+            bowling_models.FRAMES_PER_GAME
+        rate = frames * 60 / seconds if seconds else 0
+
+        self.stdout.write('Generated %s leagues with %s matches, %s games and %s frames in %.1f seconds, %d frames per '
+                          'minute' % (len(leagues), matches.count(), games.count(), frames, seconds, rate))
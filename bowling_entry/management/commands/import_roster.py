@@ -0,0 +1,41 @@
+import io
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import six
+from bowling_entry import models as bowling_models
+from bowling_entry import roster
+
+
+class Command(BaseCommand):
+    args = '<league_pk> <file>'
+    help = 'Adds the teams, bowlers and substitutes of a CSV or JSON lines roster file to the league.'
+    option_list = BaseCommand.option_list + (
+        make_option('--format', action='store', dest='format', type='choice', choices=roster.FORMATS, default=None,
+                    help='Format of the file, guessed from the file name when not provided.'),
+        make_option('--batch-size', action='store', dest='batch_size', type='int', default=roster.BATCH_SIZE,
+                    help='Number of bowlers written by a single insert.'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 2:
+            raise CommandError('A league and a roster file must be provided')
+
+        try:
+            league = bowling_models.League.objects.get(pk=args[0])
+        except (bowling_models.League.DoesNotExist, ValueError):
+            raise CommandError('League %s does not exist' % args[0])
+
+        roster_format = options.get('format') or roster.guess_format(args[1])
+
+        try:
+            with io.open(args[1], encoding='utf-8-sig', newline='') as roster_file:
+                summary = roster.import_roster(league, roster_file, roster_format=roster_format,
+                                               batch_size=options.get('batch_size') or roster.BATCH_SIZE)
+        except IOError as error:
+            raise CommandError('Unable to open %s: %s' % (args[1], error))
+        except roster.RosterError as error:
+            raise CommandError(six.text_type(error))
+
+        self.stdout.write('%s teams, %s bowlers and %s substitutes imported for %s' % (
+            summary['teams'], summary['bowlers'], summary['substitutes'], league))
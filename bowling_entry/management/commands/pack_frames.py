@@ -0,0 +1,65 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bowling_entry import models as bowling_models
+from bowling_entry import packing
+from bowling_entry.bulk import bulk_delete, bulk_update
+
+
+class Command(BaseCommand):
+    args = '[league_pk league_pk ...]'
+    help = ('Moves the frames of the games from frame rows into the packed column of the games.  Games with frames '
+            'that can not be packed keep their frame rows.')
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size', action='store', dest='batch_size', type='int', default=1000,
+                    help='Number of games packed in a single transaction.'),
+    )
+
+    def handle(self, *args, **options):
+        games = bowling_models.Game.objects.filter(packed_frames__isnull=True, frames__isnull=False)
+
+        if args:
+            games = games.filter(bowler__team__match__week__league__in=args)
+
+        batch_size = options.get('batch_size') or 1000
+        packed_count = 0
+        last_pk = 0
+
+        while True:
+            game_ids = list(games.filter(pk__gt=last_pk).order_by('pk').distinct().values_list('pk', flat=True)[
+                            :batch_size])
+            if not game_ids:
+                break
+
+            packed_count += self.pack_games(game_ids)
+            last_pk = game_ids[-1]
+
+        self.stdout.write('%s games packed' % packed_count)
+
+    def pack_games(self, game_ids):
+        """
+        Pack the frames of the games and remove their frame rows.
+        :return: number of games packed.
+        """
+        frames = {}
+        for frame in bowling_models.Frame.objects.filter(game__in=game_ids):
+            frames.setdefault(frame.game_id, []).append(frame)
+
+        packed_games = []
+        for game_id in game_ids:
+            try:
+                packed_games.append(bowling_models.Game(pk=game_id,
+                                                        packed_frames=packing.pack_frames(frames.get(game_id, []))))
+            except ValueError as error:
+                self.stdout.write('Game %s: %s' % (game_id, error))
+
+        if not packed_games:
+            return 0
+
+        with transaction.atomic():
+            bulk_update(bowling_models.Game, packed_games, ['packed_frames'])
+            # The scores are unchanged, the matches are not moved to a new version for every frame removed.
+            bulk_delete(bowling_models.Frame.objects.filter(game__in=[game.pk for game in packed_games]))
+
+        return len(packed_games)
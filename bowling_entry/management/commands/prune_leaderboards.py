@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from bowling_entry import models as bowling_models
+
+
+class Command(BaseCommand):
+    help = ('Removes the bowler series of the leagues whose season is over, which keeps the reads of the leaderboards '
+            'from slowing down as the seasons pile up.  Meant to be run once a day.')
+
+    def handle(self, *args, **options):
+        count = bowling_models.BowlerSeries.prune()
+        self.stdout.write('%s bowler series removed' % count)
@@ -0,0 +1,62 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from bowling_entry import models as bowling_models
+from bowling_entry import scoring
+from bowling_entry.bulk import bulk_update
+from bowling_entry.signals import scores_updated
+
+# Number of game ids used in a single lookup of the matches that need their standings updated.
+MATCH_LOOKUP_SIZE = 500
+
+
+class Command(BaseCommand):
+    args = '[league_pk league_pk ...]'
+    help = ('Recomputes the totals of the games from their frames and reports the games whose stored total does not '
+            'match the frames.  Games without any frames are left alone.')
+    option_list = BaseCommand.option_list + (
+        make_option('--week', action='store', dest='week', type='int', default=None,
+                    help='Only rescore the games bowled on this week number.'),
+        make_option('--dry-run', action='store_true', dest='dry_run', default=False,
+                    help='Report the mismatched games without updating them.'),
+    )
+
+    def handle(self, *args, **options):
+        games = bowling_models.Game.objects.all()
+
+        if args:
+            games = games.filter(bowler__team__match__week__league__in=args)
+
+        if options.get('week') is not None:
+            games = games.filter(bowler__team__match__week__week_number=options['week'])
+
+        totals = scoring.score_games(games)
+        stored_totals = dict(games.values_list('pk', 'total').iterator())
+
+        mismatched = []
+        for game_id in sorted(totals):
+            stored_total = stored_totals.get(game_id)
+            if stored_total != totals[game_id]:
+                self.stdout.write('Game %s: stored total %s, frames total %s' % (game_id, stored_total,
+                                                                                  totals[game_id]))
+                mismatched.append(bowling_models.Game(pk=game_id, total=totals[game_id]))
+
+        if not options.get('dry_run') and mismatched:
+            bulk_update(bowling_models.Game, mismatched, ['total'])
+            scores_updated.send(sender=self.__class__, matches=self.get_matches([game.pk for game in mismatched]))
+
+        self.stdout.write('%s games scored, %s totals did not match the frames%s' % (
+            len(totals), len(mismatched), '' if options.get('dry_run') else ' and were updated'))
+
+    def get_matches(self, game_ids):
+        """
+        Matches that the games were bowled in.
+        """
+        matches = {}
+        for start in range(0, len(game_ids), MATCH_LOOKUP_SIZE):
+            lookup = bowling_models.Match.objects.filter(
+                teaminstance__bowlers__games__in=game_ids[start:start + MATCH_LOOKUP_SIZE]).distinct()
+            for match in lookup.select_related('week__league'):
+                matches[match.pk] = match
+
+        return list(matches.values())
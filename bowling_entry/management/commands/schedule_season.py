@@ -0,0 +1,33 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from bowling_entry import models as bowling_models
+from bowling_entry import schedule
+
+
+class Command(BaseCommand):
+    args = '<league_pk>'
+    help = 'Creates the matches of every week of the season of the league as a round-robin with rotating lanes.'
+    option_list = BaseCommand.option_list + (
+        make_option('--first-lane', action='store', dest='first_lane', type='int', default=1,
+                    help='Lowest lane number used by the league.'),
+        make_option('--replace', action='store_true', dest='replace', default=False,
+                    help='Remove the matches that were already created for the league.'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('A single league must be provided')
+
+        try:
+            league = bowling_models.League.objects.get(pk=args[0])
+        except (bowling_models.League.DoesNotExist, ValueError):
+            raise CommandError('League %s does not exist' % args[0])
+
+        try:
+            matches = schedule.schedule_season(league, first_lane=options.get('first_lane') or 1,
+                                               replace=options.get('replace', False))
+        except schedule.ScheduleError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write('%s matches scheduled for %s' % (len(matches), league))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from bowling_entry import models as bowling_models
+
+
+class Command(BaseCommand):
+    args = '[league_pk league_pk ...]'
+    help = 'Rebuilds the standings and the bowler series of every match of the leagues from their games.'
+
+    def handle(self, *args, **options):
+        matches = bowling_models.Match.objects.exclude(team1=None).exclude(team2=None).select_related('week__league')
+
+        if args:
+            matches = matches.filter(week__league__in=args)
+
+        count = 0
+        for match in matches.iterator():
+            bowling_models.TeamStanding.update_for_match(match, league=match.week.league)
+            bowling_models.BowlerSeries.update_for_match(match, league=match.week.league)
+            count += 1
+
+        self.stdout.write('Standings updated for %s matches' % count)
@@ -1,8 +1,10 @@
 import datetime
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from django.utils import timezone
+from bowling_entry.bulk import bulk_delete, bulk_insert, bulk_update
 
 
 # Create your models here.
@@ -36,8 +38,40 @@ FRAME_THROW_CHOICES = (
     (SPLIT, 'Split')
 )
 
+FRAMES_PER_GAME = 10
 
-class League(models.Model):
+
+class VersionedModel(models.Model):
+    """
+    Model with a version stamp that moves forward whenever the object or the objects nested under it change.  The
+    stamp is cheap to read, so it is used to tell clients and caches whether anything changed.
+    """
+    version = models.IntegerField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """
+        Every save of the object is a new version of it.
+        """
+        self.version += 1
+        self.modified = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = list(kwargs['update_fields']) + ['version', 'modified']
+        super(VersionedModel, self).save(*args, **kwargs)
+
+    @classmethod
+    def touch(cls, objects):
+        """
+        Move the objects to a new version after the objects nested under them were written.
+        :param objects: primary keys of the objects or a values queryset selecting them.
+        """
+        return cls.objects.filter(pk__in=objects).update(version=models.F('version') + 1, modified=timezone.now())
+
+
+class League(VersionedModel):
     """
     Definition of a league
     """
@@ -64,31 +98,46 @@ class League(models.Model):
         """
         return self.bowlers.filter(team=None)
 
-    def update_weeks(self):
+    def schedule_weeks(self, existing=None):
         """
-        Add or remove weeks from the league object.
+        Compute the full list of (week_number, date) pairs for the season.  Dates of weeks that already exist are
+        kept, missing weeks are placed a week after the closest existing week before them.
+        :param existing: dictionary of week_number to date for the weeks that are already defined.
         """
-        current_week_count = len(self.weeks.all())
+        existing = existing or {}
+        delta = datetime.timedelta(days=7)
+
+        schedule = []
+        date = self.start_date - delta
+        for week_number in range(1, self.number_of_weeks + 1):
+            date = existing.get(week_number, date + delta)
+            schedule.append((week_number, date))
+
+        return schedule
 
-        if current_week_count != self.number_of_weeks:
-            difference = self.number_of_weeks - current_week_count
+    def update_weeks(self):
+        """
+        Add, remove or re-date the weeks of the league so that they match start_date and number_of_weeks.  The number
+        of queries issued does not depend on the length of the season.
+        """
+        existing = dict(self.weeks.values_list('week_number', 'date'))
 
-            if difference > 0:
-                delta = datetime.timedelta(days=7)
-                date = self.start_date
+        # Move the whole season if the start date has changed, keeping the spacing between the weeks.
+        first_date = existing.get(1)
+        if first_date is not None and first_date != self.start_date:
+            shift = self.start_date - first_date
+            self.weeks.update(date=models.F('date') + shift)
+            existing = dict((week_number, date + shift) for week_number, date in existing.items())
 
-                if current_week_count:
-                    last_week = self.weeks.last()
-                    date = last_week.date + delta
+        if any(week_number > self.number_of_weeks for week_number in existing):
+            self.weeks.filter(week_number__gt=self.number_of_weeks).delete()
 
-                current_week_count += 1
+        new_weeks = [Week(league=self, week_number=week_number, date=date)
+                     for week_number, date in self.schedule_weeks(existing)
+                     if week_number not in existing]
 
-                for week_number in range(current_week_count, self.number_of_weeks + 1):
-                    Week.objects.create(week_number=week_number, date=date, league=self)
-                    date += delta
-            else:
-                # Need to delete weeks from week number higher
-                self.weeks.filter(week_number__gt=self.number_of_weeks).delete()
+        if new_weeks:
+            Week.objects.bulk_create(new_weeks)
 
     def calculate_handicap(self, bowler):
         """
@@ -126,8 +175,32 @@ class League(models.Model):
         """
         return reverse('bowling_entry_league_weeks', args=[self.pk])
 
+    def get_absolute_standings_url(self):
+        """
+        URL used to get the current standings of the league.
+        """
+        return reverse('bowling_entry_league_standings', args=[self.pk])
+
+    def get_absolute_schedule_url(self):
+        """
+        URL used to generate the schedule of the season.
+        """
+        return reverse('bowling_entry_league_schedule', args=[self.pk])
+
+    def get_absolute_roster_url(self):
+        """
+        URL used to import the roster of the league.
+        """
+        return reverse('bowling_entry_league_roster', args=[self.pk])
+
+    def get_absolute_export_url(self, export_format='csv'):
+        """
+        URL used to download every game and frame of the league.
+        """
+        return reverse('bowling_entry_league_export', args=[self.pk, export_format])
+
 
-class Week(models.Model):
+class Week(VersionedModel):
     """
     Week object used to collect all of the instance data
     """
@@ -148,6 +221,12 @@ class Week(models.Model):
     def get_absolute_matches_url(self):
         return reverse('bowling_entry_league_week_matches', args=[self.league.pk, self.week_number])
 
+    def get_absolute_standings_url(self):
+        return reverse('bowling_entry_league_week_standings', args=[self.league.pk, self.week_number])
+
+    def get_absolute_events_url(self):
+        return reverse('bowling_entry_league_week_events', args=[self.league.pk, self.week_number])
+
 
 class TeamDefinition(models.Model):
     """
@@ -204,38 +283,92 @@ class TeamInstance(models.Model):
     """
     definition = models.ForeignKey(TeamDefinition, related_name='instances')
     match = models.ForeignKey('Match')
+    week = models.ForeignKey(Week, related_name='team_instances')
+
+    class Meta:
+        # A team bowls a single match a week, the index also serves the conflict checks when matches are created.
+        unique_together = (('week', 'definition'),)
 
     def define(self):
         self.define_bowlers()
 
-    def define_bowlers(self):
+    def define_bowlers(self, create_frames=False):
         """
         Define all of the bowlers to be associated with this team.  Iterates through the team definition for this
         instance.  Fills in vacant bowlers if there are not enough bowlers available.
         """
-        index = 0
-        league = self.match.week.league
+        return TeamInstance.provision([self], create_frames=create_frames)
+
+    @staticmethod
+    def provision(team_instances, league=None, create_frames=False):
+        """
+        Define the bowlers and their games for all of the team instances provided with a few batched inserts.
+        Bowlers are taken from the team definitions in order, vacant bowlers fill the remaining spots.
+        :param team_instances: saved team instances that do not have any bowlers defined yet.
+        :param league: league the teams are bowling in, looked up from the first team when not provided.
+        :param create_frames: also create the empty frames of every game.
+        :return: the bowler instances that were created.
+        """
+        from bowling_entry import packing
+
+        if not team_instances:
+            return []
+
+        if league is None:
+            league = team_instances[0].match.week.league
 
         max_bowlers = league.players_per_team
 
-        # Assume the bowler definition based on the team definition values.
-        for bowler in self.definition.bowlers.all():
-            bowler_instance = TeamInstanceBowler(order=index, team=self)
-            bowler_instance.update_definition(bowler, REGULAR)
-            bowler_instance.save()
-            bowler_instance.create_games()
-            index += 1
-
-            # Break out of the loop if the maximum number of bowlers has been reached.
-            if index >= max_bowlers:
-                break
-
-        # Create the vacant bowlers
-        for vacant_index in range(index, max_bowlers):
-            bowler_instance = TeamInstanceBowler(definition=None, team=self,
-                                                 type=VACANT, order=vacant_index)
-            bowler_instance.save()
-            bowler_instance.create_games()
+        rosters = {}
+        team_definitions = set(team.definition_id for team in team_instances)
+        for definition in BowlerDefinition.objects.filter(team__in=team_definitions).order_by('pk'):
+            rosters.setdefault(definition.team_id, []).append(definition)
+
+        # Averages and handicaps carried over from the weeks already bowled.
+        week_stats = BowlerWeekStats.latest_for_weeks(
+            [definition.pk for roster in rosters.values() for definition in roster],
+            [team.match.week.week_number for team in team_instances])
+
+        bowlers = []
+        for team in team_instances:
+            roster = rosters.get(team.definition_id, [])[:max_bowlers]
+            latest_stats = week_stats[team.match.week.week_number]
+
+            for order, definition in enumerate(roster):
+                stats = latest_stats.get(definition.pk)
+                if stats is not None:
+                    average, handicap = stats.average, stats.handicap
+                else:
+                    average, handicap = definition.average, league.calculate_handicap(definition)
+
+                bowlers.append(TeamInstanceBowler(team=team, order=order, definition=definition, type=REGULAR,
+                                                  average=average, handicap=handicap))
+
+            for order in range(len(roster), max_bowlers):
+                bowlers.append(TeamInstanceBowler(team=team, order=order, definition=None, type=VACANT))
+
+        with transaction.atomic():
+            bulk_insert(TeamInstanceBowler, bowlers, ('team_id', 'order'), team__in=team_instances)
+
+            games = [Game(bowler=bowler, game_number=game_number)
+                     for bowler in bowlers
+                     for game_number in range(1, league.number_of_games + 1)]
+
+            if create_frames and packing.packed_frames_enabled():
+                for game in games:
+                    game.packed_frames = packing.pack_frames([])
+                Game.objects.bulk_create(games)
+            elif create_frames:
+                bulk_insert(Game, games, ('bowler_id', 'game_number'), bowler__team__in=team_instances)
+                Frame.objects.bulk_create([Frame(game=game, frame_number=frame_number)
+                                           for game in games
+                                           for frame_number in range(1, FRAMES_PER_GAME + 1)])
+            else:
+                Game.objects.bulk_create(games)
+
+            Match.touch(set(team.match_id for team in team_instances))
+
+        return bowlers
 
     def clear_games(self):
         for bowler in self.bowlers.all():
@@ -262,7 +395,7 @@ class TeamInstanceBowler(models.Model):
         return '%s %s %s (I)' % (self.definition.league, self.team.definition.name, self.definition.name)
 
     def create_games(self):
-        game_count = self.definition.league.number_of_games
+        game_count = self.team.match.week.league.number_of_games
 
         for game_number in range(1, game_count + 1):
             game = Game(bowler=self, game_number=game_number)
@@ -276,7 +409,7 @@ class TeamInstanceBowler(models.Model):
         self.save()
 
 
-class Match(models.Model):
+class Match(VersionedModel):
     """
     Class that will define a match that is being recorded.
     """
@@ -289,9 +422,16 @@ class Match(models.Model):
         return reverse('bowling_entry_league_week_match_detail', args=[self.week.league.pk, self.week.week_number,
                                                                        self.pk])
 
-    def create_games(self):
-        self.team1.define()
-        self.team2.define()
+    def get_absolute_events_url(self):
+        return reverse('bowling_entry_league_week_match_events', args=[self.week.league.pk, self.week.week_number,
+                                                                       self.pk])
+
+    def create_games(self, league=None, create_frames=False):
+        """
+        Define the bowlers and games of both of the teams in the match.
+        """
+        TeamInstance.provision([self.team1, self.team2], league=league or self.week.league,
+                               create_frames=create_frames)
 
     def clear_games(self):
         self.team1.clear_games()
@@ -306,6 +446,18 @@ class Game(models.Model):
     game_number = models.IntegerField(blank=False)
     total = models.IntegerField(blank=False, default=0)
 
+    # Frames of the game in the compact format of bowling_entry.packing, null while the frames are stored as rows.
+    packed_frames = models.BinaryField(blank=True, null=True)
+
+    def get_frames(self):
+        """
+        Frames of the game from whichever storage holds them.
+        """
+        if self.packed_frames is not None:
+            from bowling_entry import packing
+            return packing.unpack_frames(self)
+        return self.frames.all()
+
 
 class Frame(models.Model):
     game = models.ForeignKey(Game, related_name='frames')
@@ -324,6 +476,339 @@ class Frame(models.Model):
         ordering = ['frame_number', ]
 
     def throw_list(self):
-        if len(self.throws):
-            return [int(i) for i in self.throws.split(',')]
-        return []
\ No newline at end of file
+        throws = (self.throw1_value, self.throw2_value, self.throw3_value)
+        return [value for value in throws if value is not None]
+
+
+class TeamStanding(models.Model):
+    """
+    Points and pins that a team earned in a single match.  The rows are recomputed whenever the games of the match
+    change and are summed up to get the standings of the league as of any week.
+    """
+    league = models.ForeignKey(League, related_name='standings')
+    week_number = models.IntegerField(blank=False)
+    match = models.ForeignKey(Match, related_name='standings')
+    team = models.ForeignKey(TeamDefinition, related_name='standings')
+    points_won = models.FloatField(default=0)
+    points_lost = models.FloatField(default=0)
+    games_bowled = models.IntegerField(default=0)
+    scratch_pins = models.IntegerField(default=0)
+    handicap_pins = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('match', 'team'),)
+        index_together = (('league', 'week_number'),)
+
+    def __unicode__(self):
+        return '%s: week %s %s' % (self.team, self.week_number, self.points_won)
+
+    @staticmethod
+    def update_for_match(match, league=None):
+        """
+        Recompute the standings rows of the two teams that bowled the match.  Games count once both teams have
+        bowled them, the team with the higher handicap total wins points_per_game and the team with the higher
+        handicap series wins points_for_totals once all of the games have been bowled.  Ties split the points.
+        """
+        if league is None:
+            league = match.week.league
+
+        teams = {}
+        week_number = None
+        games = Game.objects.filter(bowler__team__match=match)
+        for team_id, definition_id, week_number, game_number, total, handicap in games.values_list(
+                'bowler__team', 'bowler__team__definition', 'bowler__team__match__week__week_number',
+                'game_number', 'total', 'bowler__handicap'):
+            team = teams.setdefault(team_id, {'definition': definition_id, 'scratch': {}, 'handicap': {}})
+            team['scratch'][game_number] = team['scratch'].get(game_number, 0) + total
+            team['handicap'][game_number] = team['handicap'].get(game_number, 0) + total + (handicap or 0)
+
+        if match.team1_id not in teams or match.team2_id not in teams:
+            return []
+
+        standings = []
+        for team_id, opponent_id in ((match.team1_id, match.team2_id), (match.team2_id, match.team1_id)):
+            team = teams[team_id]
+            opponent = teams[opponent_id]
+            standing = TeamStanding(league=league, week_number=week_number, match=match,
+                                    team_id=team['definition'])
+
+            bowled = [game_number for game_number in sorted(team['scratch'])
+                      if team['scratch'][game_number] and opponent['scratch'].get(game_number)]
+
+            for game_number in bowled:
+                standing.games_bowled += 1
+                standing.scratch_pins += team['scratch'][game_number]
+                standing.handicap_pins += team['handicap'][game_number]
+                standing.award(team['handicap'][game_number], opponent['handicap'][game_number],
+                               league.points_per_game)
+
+            if len(bowled) == league.number_of_games:
+                standing.award(sum(team['handicap'][game_number] for game_number in bowled),
+                               sum(opponent['handicap'][game_number] for game_number in bowled),
+                               league.points_for_totals)
+
+            standings.append(standing)
+
+        TeamStanding.objects.filter(match=match).delete()
+        TeamStanding.objects.bulk_create(standings)
+
+        return standings
+
+    def award(self, score, opponent_score, points):
+        """
+        Award the points for a single comparison against the opponent.
+        """
+        if score > opponent_score:
+            self.points_won += points
+        elif score < opponent_score:
+            self.points_lost += points
+        else:
+            self.points_won += points / 2.0
+            self.points_lost += points / 2.0
+
+
+class BowlerWeekStats(models.Model):
+    """
+    Games and pins that a bowler bowled on a week of the league along with the running season totals, the running
+    average and the handicap that the bowler will carry into the following week.
+    """
+    league = models.ForeignKey(League, related_name='bowler_stats')
+    bowler = models.ForeignKey(BowlerDefinition, related_name='week_stats')
+    week_number = models.IntegerField(blank=False)
+    games_bowled = models.IntegerField(default=0)
+    pins = models.IntegerField(default=0)
+    season_games = models.IntegerField(default=0)
+    season_pins = models.IntegerField(default=0)
+    average = models.IntegerField(blank=True, null=True)
+    handicap = models.IntegerField(blank=True, null=True)
+
+    class Meta:
+        unique_together = (('bowler', 'week_number'),)
+        ordering = ['week_number', ]
+
+    def __unicode__(self):
+        return '%s: week %s average %s' % (self.bowler, self.week_number, self.average)
+
+    @staticmethod
+    def latest(bowlers, week_number):
+        """
+        Latest statistics of each of the bowlers from before the week provided.
+        :return: dictionary of bowler definition id to the statistics.
+        """
+        return BowlerWeekStats.latest_for_weeks(bowlers, [week_number])[week_number]
+
+    @staticmethod
+    def latest_for_weeks(bowlers, week_numbers):
+        """
+        Latest statistics of each of the bowlers from before each of the weeks provided, read with a single query.
+        :return: dictionary of week number to a dictionary of bowler definition id to the statistics.
+        """
+        week_numbers = sorted(set(week_numbers))
+        if not week_numbers:
+            return {}
+
+        rows = BowlerWeekStats.objects.filter(bowler__in=bowlers, week_number__lt=week_numbers[-1])
+        rows = iter(rows.order_by('week_number'))
+        row = next(rows, None)
+
+        latest = {}
+        stats = {}
+        for week_number in week_numbers:
+            while row is not None and row.week_number < week_number:
+                stats[row.bowler_id] = row
+                row = next(rows, None)
+            latest[week_number] = dict(stats)
+
+        return latest
+
+    @staticmethod
+    def update_for_match(match, league=None):
+        """
+        Recompute the statistics of the bowlers of the match for the week of the match and carry the change forward
+        to the running totals of the weeks after it.  Only the games of the week are read.
+        """
+        if league is None:
+            league = match.week.league
+
+        bowlers = TeamInstanceBowler.objects.filter(team__match=match, definition__isnull=False)
+        games = Game.objects.filter(bowler__team__match__week=match.week_id,
+                                    bowler__definition__in=bowlers.values('definition'))
+
+        week_number = None
+        teams = set()
+        week_totals = {}
+        for definition_id, team_id, week_number, total in games.values_list(
+                'bowler__definition', 'bowler__definition__team', 'bowler__team__match__week__week_number', 'total'):
+            games_bowled, pins = week_totals.get(definition_id, (0, 0))
+            if total:
+                games_bowled, pins = games_bowled + 1, pins + total
+            week_totals[definition_id] = (games_bowled, pins)
+            teams.add(team_id)
+
+        if week_number is None:
+            return []
+
+        # Bowlers of the teams that already have statistics for the week may have been replaced by a substitute.
+        affected = BowlerWeekStats.objects.filter(league=league).filter(
+            models.Q(bowler__in=list(week_totals)) |
+            models.Q(week_number=week_number, bowler__team__in=[team for team in teams if team is not None]))
+
+        season = {}
+        for week_stats in affected.select_related('bowler'):
+            season.setdefault(week_stats.bowler_id, []).append(week_stats)
+
+        definitions = BowlerDefinition.objects.in_bulk([bowler for bowler in week_totals if bowler not in season])
+
+        created = []
+        changed = []
+        for bowler_id in set(week_totals) | set(season):
+            rows = season.get(bowler_id, [])
+            current = [row for row in rows if row.week_number == week_number]
+
+            if current:
+                current = current[0]
+            else:
+                definition = rows[0].bowler if rows else definitions[bowler_id]
+                current = BowlerWeekStats(league=league, bowler=definition, week_number=week_number)
+                rows.append(current)
+                created.append(current)
+
+            current.games_bowled, current.pins = week_totals.get(bowler_id, (0, 0))
+
+            season_games = season_pins = 0
+            for row in sorted(rows, key=lambda row: row.week_number):
+                season_games += row.games_bowled
+                season_pins += row.pins
+
+                if row.week_number >= week_number:
+                    row.season_games = season_games
+                    row.season_pins = season_pins
+                    row.average = season_pins // season_games if season_games else row.bowler.average
+                    row.handicap = league.calculate_handicap(row)
+
+                    if row.pk is not None:
+                        changed.append(row)
+
+        with transaction.atomic():
+            BowlerWeekStats.objects.bulk_create(created)
+            bulk_update(BowlerWeekStats, changed, ['games_bowled', 'pins', 'season_games', 'season_pins', 'average',
+                                                   'handicap'])
+
+        return created + changed
+
+
+class BowlerSeries(models.Model):
+    """
+    High game and series that a bowler bowled in a single match, with and without the handicap of the bowler.  The rows
+    of a match are recomputed whenever its games change and the gender of the bowler is copied onto them, so that the
+    leaderboards of the bowling center are read from this table alone.  The rows of the seasons that are over are
+    removed by the prune_leaderboards command.
+    """
+    league = models.ForeignKey(League, related_name='bowler_series')
+    week_number = models.IntegerField(blank=False)
+    match = models.ForeignKey(Match, related_name='bowler_series')
+    bowler = models.ForeignKey(BowlerDefinition, related_name='series')
+    gender = models.CharField(choices=BOWLER_GENDER_CHOICES, max_length=1, default=UNKNOWN)
+    handicap = models.IntegerField(default=0)
+    games_bowled = models.IntegerField(default=0)
+    high_game = models.IntegerField(default=0, db_index=True)
+    high_game_handicap = models.IntegerField(default=0, db_index=True)
+
+    # Zero until the bowler has bowled every game of the match.
+    series = models.IntegerField(default=0, db_index=True)
+    series_handicap = models.IntegerField(default=0, db_index=True)
+
+    # Columns that each leaderboard is ordered by, scratch and with handicap.
+    LEADERBOARDS = {
+        'game': ('high_game', 'high_game_handicap'),
+        'series': ('series', 'series_handicap'),
+    }
+
+    class Meta:
+        unique_together = (('match', 'bowler'),)
+        # The leaderboards walk the index of their score from the top and stop once they have found enough rows of the
+        # active leagues, the indexes of a single gender are led by the gender.  Only the seasons that ended since the
+        # rows were last pruned are walked past.
+        index_together = (('gender', 'high_game'), ('gender', 'high_game_handicap'), ('gender', 'series'),
+                          ('gender', 'series_handicap'))
+
+    def __unicode__(self):
+        return '%s: week %s series %s' % (self.bowler, self.week_number, self.series)
+
+    @staticmethod
+    def update_for_match(match, league=None):
+        """
+        Recompute the rows of the bowlers that bowled in the match.  Vacant and blind bowlers are left out, as are the
+        bowlers that have not bowled any game yet.
+        """
+        if league is None:
+            league = match.week.league
+
+        series = {}
+        games = Game.objects.filter(bowler__team__match=match, bowler__definition__isnull=False, total__gt=0)
+        for definition_id, gender, handicap, week_number, total in games.values_list(
+                'bowler__definition', 'bowler__definition__gender', 'bowler__handicap',
+                'bowler__team__match__week__week_number', 'total'):
+            row = series.get(definition_id)
+            if row is None:
+                row = series[definition_id] = BowlerSeries(league=league, week_number=week_number, match=match,
+                                                           bowler_id=definition_id, gender=gender,
+                                                           handicap=handicap or 0)
+
+            row.games_bowled += 1
+            row.high_game = max(row.high_game, total)
+            row.high_game_handicap = row.high_game + row.handicap
+            row.series += total
+
+        rows = list(series.values())
+        for row in rows:
+            if row.games_bowled < league.number_of_games:
+                row.series = 0
+            else:
+                row.series_handicap = row.series + row.handicap * row.games_bowled
+
+        BowlerSeries.objects.filter(match=match).delete()
+        BowlerSeries.objects.bulk_create(rows)
+
+        return rows
+
+    @staticmethod
+    def active_leagues(today=None):
+        """
+        Leagues whose season is under way: started on or before the day and with a week left on or after it.
+        """
+        today = today or datetime.date.today()
+        return League.objects.filter(start_date__lte=today, weeks__date__gte=today)
+
+    @staticmethod
+    def prune(today=None):
+        """
+        Remove the rows of the leagues whose season is over, they are never shown on the leaderboards again.
+        :return: the number of rows removed.
+        """
+        today = today or datetime.date.today()
+        ended = League.objects.filter(start_date__lte=today).exclude(weeks__date__gte=today)
+        return bulk_delete(BowlerSeries.objects.filter(league__in=ended.values('pk')))
+
+    @staticmethod
+    def leaderboard(category, handicap=False, gender=None, limit=10, today=None):
+        """
+        Highest games or series bowled in the active leagues, read with a single query that walks the rows from the
+        highest score down until it has found enough rows of those leagues.
+        :param category: key of LEADERBOARDS.
+        :param handicap: rank the scores with the handicap of the bowlers added.
+        :param gender: only rank the bowlers of the gender.
+        :return: list of dictionaries with the bowler, the league and the score, best score first.
+        """
+        column = BowlerSeries.LEADERBOARDS[category][1 if handicap else 0]
+
+        rows = BowlerSeries.objects.filter(league__in=BowlerSeries.active_leagues(today).values('pk'),
+                                           **{'%s__gt' % column: 0})
+        if gender is not None:
+            rows = rows.filter(gender=gender)
+
+        rows = rows.order_by('-%s' % column, 'week_number', 'pk').values(
+            'bowler', 'bowler__name', 'league', 'league__name', 'week_number', 'gender', 'handicap', 'games_bowled',
+            column)[:limit]
+
+        return [dict(row, rank=rank, score=row[column]) for rank, row in enumerate(rows, 1)]
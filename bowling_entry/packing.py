@@ -0,0 +1,113 @@
+"""
+Compact storage of the frames of a game.
+
+When the BOWLING_ENTRY_PACKED_FRAMES setting is turned on, the frames of a game are stored in the packed_frames column of
+the game instead of in Frame rows.  The packed value is a byte string with one byte per throw, laid out like the
+columns of the scoring arrays: frames one through nine use two bytes each and the tenth frame uses the last three.
+The low four bits of a byte hold the pins knocked down (EMPTY when the throw has not been recorded) and the high bits
+flag fouls and splits.
+
+Games that have a packed value are always read from it, whatever the setting, so both storage modes can be mixed in
+the same database.  The pack_frames management command moves the existing Frame rows into the packed column.
+"""
+from django.conf import settings
+from bowling_entry import models as bowling_models
+
+THROWS_PER_GAME = 21
+PINS = 10
+
+EMPTY = 0x0F
+VALUE_MASK = 0x0F
+FOUL_FLAG = 0x10
+SPLIT_FLAG = 0x20
+
+THROW_FIELDS = (('throw1_type', 'throw1_value'), ('throw2_type', 'throw2_value'), ('throw3_type', 'throw3_value'), )
+
+
+def packed_frames_enabled():
+    """
+    Whether new frames are written to the packed column of their game.
+    """
+    return getattr(settings, 'BOWLING_ENTRY_PACKED_FRAMES', False)
+
+
+def frame_slots(frame_number):
+    """
+    Positions of the throws of the frame in the packed value.
+    """
+    if frame_number == bowling_models.FRAMES_PER_GAME:
+        return range(THROWS_PER_GAME - 3, THROWS_PER_GAME)
+    start = (frame_number - 1) * 2
+    return range(start, start + 2)
+
+
+def pack_throw(throw_type, value):
+    if value is None:
+        byte = EMPTY
+    elif 0 <= value <= PINS:
+        byte = value
+    else:
+        raise ValueError('Throw value %s is not between 0 and %s' % (value, PINS))
+
+    if throw_type == bowling_models.FOUL:
+        byte |= FOUL_FLAG
+    elif throw_type == bowling_models.SPLIT:
+        byte |= SPLIT_FLAG
+
+    return byte
+
+
+def unpack_throw(byte):
+    if byte & FOUL_FLAG:
+        throw_type = bowling_models.FOUL
+    elif byte & SPLIT_FLAG:
+        throw_type = bowling_models.SPLIT
+    else:
+        throw_type = bowling_models.THROW
+
+    value = byte & VALUE_MASK
+    return throw_type, None if value == EMPTY else value
+
+
+def pack_frames(frames):
+    """
+    Pack the throws of the frames of a game.
+    :param frames: frames of the game, frames that are not provided are left empty.
+    :return: the packed value.
+    """
+    packed = bytearray([EMPTY] * THROWS_PER_GAME)
+
+    for frame in frames:
+        if not 1 <= frame.frame_number <= bowling_models.FRAMES_PER_GAME:
+            raise ValueError('Frame number %s is not between 1 and %s' % (frame.frame_number,
+                                                                          bowling_models.FRAMES_PER_GAME))
+
+        for slot, (type_field, value_field) in zip(frame_slots(frame.frame_number), THROW_FIELDS):
+            packed[slot] = pack_throw(getattr(frame, type_field), getattr(frame, value_field))
+
+    return bytes(packed)
+
+
+def unpack_frames(game):
+    """
+    Unpack the frames of a game.  Frames without any recorded throws or flags are left out.
+    :param game: game with a packed value.
+    :return: unsaved frame instances in frame order.
+    """
+    packed = bytearray(game.packed_frames)
+    frames = []
+
+    for frame_number in range(1, bowling_models.FRAMES_PER_GAME + 1):
+        slots = frame_slots(frame_number)
+        if all(packed[slot] == EMPTY for slot in slots):
+            continue
+
+        frame = bowling_models.Frame(game=game, frame_number=frame_number)
+        for slot, (type_field, value_field) in zip(slots, THROW_FIELDS):
+            throw_type, value = unpack_throw(packed[slot])
+            setattr(frame, type_field, throw_type)
+            setattr(frame, value_field, value)
+        frames.append(frame)
+
+    return frames
+
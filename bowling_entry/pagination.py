@@ -0,0 +1,148 @@
+"""
+Keyset pagination of the list endpoints.
+
+Pages are selected by the position of the last row of the previous page in the ordering of the list instead of by an
+offset, so every page costs the same indexed query however deep the client pages.  The ordering always ends with the
+primary key, which makes the positions unique and the cursors stable while rows are added or removed.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def keyset_filter(ordering, position, reverse=False):
+    """
+    Filter that selects the rows after the position in the ordering.
+    :param ordering: field names of the ordering, prefixed with '-' when descending.
+    :param position: values of the ordering fields of the row to start after.
+    :param reverse: select the rows before the position instead.
+    """
+    result = None
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != reverse
+
+        term = Q(**{'%s__%s' % (name, 'lt' if descending else 'gt'): position[index]})
+        for previous, value in zip(ordering[:index], position):
+            term &= Q(**{previous.lstrip('-'): value})
+
+        result = term if result is None else result | term
+
+    return result
+
+
+def reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else '-' + field for field in ordering)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on the natural ordering of a list.  The ordering is taken from the ordering attribute of the
+    view, or from the ordering of the model when the view does not have one.  Views can also override the page_size and
+    max_page_size attributes, clients request a smaller or larger page with the page_size query parameter.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request, view)
+        self.ordering = self.get_ordering(queryset, view)
+
+        position, self.reverse = self.decode_cursor(request)
+
+        ordering = reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(self.ordering, position, self.reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request, view):
+        page_size = getattr(view, 'page_size', None) or getattr(settings, 'BOWLING_ENTRY_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+        max_page_size = getattr(view, 'max_page_size', None) or MAX_PAGE_SIZE
+
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+
+        return min(max(requested, 1), max_page_size)
+
+    def get_ordering(self, queryset, view):
+        ordering = getattr(view, 'ordering', None) or queryset.model._meta.ordering
+        ordering = tuple(ordering)
+
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering += ('pk', )
+        return ordering
+
+    def get_position(self, instance):
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, instance, reverse):
+        cursor = json.dumps({'p': self.get_position(instance), 'r': int(reverse)}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(cursor.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        """
+        :return: position of the cursor (None on the first page) and whether the rows before it are requested.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position, reverse = cursor['p'], bool(cursor['r'])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound('Invalid cursor')
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+
+        return position, reverse
+
+    def get_link(self, instance, reverse):
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(instance, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.page[-1], False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.get_link(self.page[0], True)
@@ -0,0 +1,244 @@
+"""
+Import of the roster of a league from a CSV or JSON lines file.
+
+Every row describes a single bowler: the name, gender and average of the bowler and the name of the team that the
+bowler is on.  Bowlers without a team are added to the league as substitutes.  Teams are matched by name against the
+teams of the league, the teams that do not exist yet are created.
+
+The file is read one row at a time and the rows are written in batches, so only a single batch is ever kept in memory
+no matter how large the file is.  The whole import is done in a single transaction, nothing is written when any of the
+rows is invalid.
+"""
+import csv
+import json
+
+from django.db import transaction
+from django.utils import six
+from bowling_entry import models as bowling_models
+from bowling_entry.bulk import bulk_insert
+
+# Number of bowlers written by a single insert.
+BATCH_SIZE = 500
+
+CSV = 'csv'
+JSON = 'json'
+FORMATS = (CSV, JSON)
+
+GENDERS = dict([(value.lower(), value) for value, label in bowling_models.BOWLER_GENDER_CHOICES] +
+               [(label.lower(), value) for value, label in bowling_models.BOWLER_GENDER_CHOICES])
+
+
+class RosterError(Exception):
+    """
+    Raised when a row of the roster can not be imported.
+    """
+    def __init__(self, message, line_number=None):
+        if line_number is not None:
+            message = 'Line %s: %s' % (line_number, message)
+        super(RosterError, self).__init__(message)
+        self.line_number = line_number
+
+
+def guess_format(file_name):
+    """
+    Format of the file based on its extension.
+    """
+    if file_name and file_name.lower().endswith('.csv'):
+        return CSV
+    return JSON
+
+
+def text_lines(lines, encoding='utf-8'):
+    """
+    Decode the lines of a file opened in binary mode, leaves lines that are already text alone.
+    """
+    for index, line in enumerate(lines):
+        if isinstance(line, six.binary_type):
+            line = line.decode(encoding)
+        if index == 0:
+            line = line.lstrip(u'\ufeff')
+        yield line
+
+
+def read_csv(lines):
+    """
+    Parse the rows of a CSV file with a header line.
+    :param lines: text lines of the file.
+    :return: iterator of (line number, row dictionary).
+    """
+    lines = text_lines(lines)
+    if six.PY2:
+        # The Python 2 csv module only reads byte strings.
+        reader = csv.reader(line.encode('utf-8') for line in lines)
+        rows = ([value.decode('utf-8') for value in row] for row in reader)
+    else:
+        reader = csv.reader(lines)
+        rows = reader
+
+    header = None
+    for row in rows:
+        if not any(value.strip() for value in row):
+            continue
+
+        if header is None:
+            header = [value.strip().lower() for value in row]
+            continue
+
+        yield reader.line_num, dict(zip(header, row))
+
+
+def read_json(lines):
+    """
+    Parse the rows of a JSON lines file, one object per line.
+    :param lines: text lines of the file.
+    :return: iterator of (line number, row dictionary).
+    """
+    for line_number, line in enumerate(text_lines(lines), 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise RosterError('Invalid JSON', line_number)
+
+        if not isinstance(row, dict):
+            raise RosterError('Each line must contain a single object', line_number)
+
+        yield line_number, row
+
+
+READERS = {
+    CSV: read_csv,
+    JSON: read_json,
+}
+
+
+class RosterImport(object):
+    """
+    Collects the bowlers of the roster and writes them out in batches.
+    """
+
+    def __init__(self, league, batch_size=BATCH_SIZE):
+        self.league = league
+        self.batch_size = batch_size
+        self.bowlers = []
+        self.new_teams = []
+
+        self.teams_created = 0
+        self.bowlers_created = 0
+        self.substitutes_created = 0
+
+        # All of the teams of the league are looked up once, the rows are checked against them in memory.
+        self.teams = {}
+        for team in bowling_models.TeamDefinition.objects.filter(league=league).order_by('-pk'):
+            self.teams[team.name.strip().lower()] = team
+
+    def get_team(self, name):
+        """
+        Team of the league with the name, the team is created with the next batch when it does not exist yet.
+        """
+        key = name.lower()
+        team = self.teams.get(key)
+        if team is None:
+            team = bowling_models.TeamDefinition(league=self.league, name=name)
+            self.teams[key] = team
+            self.new_teams.append(team)
+        return team
+
+    def add(self, row, line_number=None):
+        """
+        Validate the row and queue the bowler for the next batch.
+        :param row: dictionary with the name, gender, average and team of the bowler.
+        :param line_number: line of the file that the row came from, used in error messages.
+        """
+        name = six.text_type(row.get('name') or '').strip()
+        if not name:
+            raise RosterError('A name is required', line_number)
+        if len(name) > 100:
+            raise RosterError('The name is longer than 100 characters', line_number)
+
+        gender = six.text_type(row.get('gender') or '').strip().lower()
+        if gender:
+            try:
+                gender = GENDERS[gender]
+            except KeyError:
+                raise RosterError('Unknown gender "%s"' % row.get('gender'), line_number)
+        else:
+            gender = bowling_models.UNKNOWN
+
+        average = row.get('average')
+        if isinstance(average, six.string_types):
+            average = average.strip() or None
+        if average is not None:
+            try:
+                average = int(average)
+            except (TypeError, ValueError):
+                raise RosterError('The average must be a whole number', line_number)
+
+        team_name = six.text_type(row.get('team') or '').strip()
+        if len(team_name) > 100:
+            raise RosterError('The team name is longer than 100 characters', line_number)
+        team = self.get_team(team_name) if team_name else None
+
+        self.bowlers.append(bowling_models.BowlerDefinition(league=self.league, name=name, gender=gender,
+                                                            average=average, team=team))
+        if len(self.bowlers) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Insert the teams and bowlers of the current batch.
+        """
+        if self.new_teams:
+            # None of the new teams share a name with a team of the league, so the names identify the new rows.
+            bulk_insert(bowling_models.TeamDefinition, self.new_teams, ('name', ), league=self.league,
+                        name__in=[team.name for team in self.new_teams])
+            self.teams_created += len(self.new_teams)
+            self.new_teams = []
+
+        for bowler in self.bowlers:
+            if bowler.team is not None:
+                # The team of the bowler may have been inserted after the bowler was queued.
+                bowler.team = bowler.team
+                self.bowlers_created += 1
+            else:
+                self.substitutes_created += 1
+
+        bowling_models.BowlerDefinition.objects.bulk_create(self.bowlers)
+        self.bowlers = []
+
+    def summary(self):
+        return {'teams': self.teams_created, 'bowlers': self.bowlers_created,
+                'substitutes': self.substitutes_created}
+
+
+def import_roster(league, lines, roster_format=CSV, batch_size=BATCH_SIZE):
+    """
+    Import the roster of the league in a single transaction.
+    :param league: league that the teams and bowlers are added to.
+    :param lines: lines of the file, either text or utf-8 encoded bytes.
+    :param roster_format: csv or json (JSON lines).
+    :param batch_size: number of bowlers written by a single insert.
+    :return: dictionary with the number of teams, bowlers and substitutes that were created.
+    """
+    try:
+        reader = READERS[roster_format]
+    except KeyError:
+        raise RosterError('Unknown roster format "%s"' % roster_format)
+
+    roster = RosterImport(league, batch_size=batch_size)
+
+    with transaction.atomic():
+        try:
+            for line_number, row in reader(lines):
+                roster.add(row, line_number)
+        except (csv.Error, UnicodeDecodeError) as error:
+            raise RosterError('Unable to read the file: %s' % error)
+        roster.flush()
+
+        # The rows were inserted in bulk, which does not send the signals that update the league version.
+        bowling_models.League.touch([league.pk])
+
+    return roster.summary()
@@ -0,0 +1,181 @@
+"""
+Generation of the schedule of a league season.
+
+The pairings are a round-robin built with the circle method: one team stays in place while the others rotate around
+it, so every team meets every other team once every (number of teams - 1) weeks.  Once every pairing has been
+bowled the rounds start over with the teams swapped, which balances how often a team is listed first.  When the
+number of teams is odd, the team paired with the bye sits the week out.
+
+Lane pairs are rotated every week so that the matches move across the house instead of staying on the same pair.
+"""
+from django.db import transaction
+from bowling_entry import models as bowling_models
+from bowling_entry.bulk import bulk_delete, bulk_insert, bulk_update
+
+# Number of team instances provisioned with bowlers and games at once, keeps the lookups within the SQLite limits.
+PROVISION_BATCH_SIZE = 200
+
+
+class ScheduleError(Exception):
+    """
+    Raised when the season of a league can not be scheduled.
+    """
+
+
+def round_robin(teams, number_of_weeks):
+    """
+    Pair up the teams for every week of the season.
+    :param teams: teams (or their keys) in the order that they are rotated.
+    :param number_of_weeks: number of weeks to schedule.
+    :return: one list of (team1, team2) pairs per week.
+    """
+    teams = list(teams)
+    if len(teams) < 2:
+        raise ScheduleError('At least two teams are needed to build a schedule')
+
+    if len(teams) % 2:
+        teams.append(None)
+
+    rounds = len(teams) - 1
+    half = len(teams) // 2
+    weeks = []
+
+    for week_index in range(number_of_weeks):
+        round_index = week_index % rounds
+        swapped = (week_index // rounds) % 2 == 1
+
+        # Rotate every team but the first one by the round index.
+        rotating = teams[1:]
+        rotating = rotating[-round_index:] + rotating[:-round_index] if round_index else rotating
+        order = [teams[0]] + rotating
+
+        pairs = []
+        for index in range(half):
+            team1, team2 = order[index], order[-index - 1]
+
+            # Alternate the position of the fixed team, it would always be listed first otherwise.
+            if index == 0 and round_index % 2:
+                team1, team2 = team2, team1
+            if swapped:
+                team1, team2 = team2, team1
+
+            if team1 is not None and team2 is not None:
+                pairs.append((team1, team2))
+
+        weeks.append(pairs)
+
+    return weeks
+
+
+def lane_pairs(week_index, number_of_matches, first_lane=1):
+    """
+    Lanes of each of the matches bowled during the week, the lane pairs rotate by one every week.
+    :return: list of lanes strings in the format of Match.lanes.
+    """
+    lanes = []
+    for index in range(number_of_matches):
+        pair = (index + week_index) % number_of_matches
+        lane = first_lane + pair * 2
+        lanes.append('%s,%s' % (lane, lane + 1))
+    return lanes
+
+
+def clear_matches(matches):
+    """
+    Delete the team instances, bowlers, games, frames, standings and bowler series of the matches with a single
+    statement per table, without the delete signals that would touch the matches once for every row.  Must be called
+    within a transaction.
+    :param matches: queryset selecting the matches.
+    """
+    teams = bowling_models.TeamInstance.objects.filter(match__in=matches)
+
+    # The matches and the team instances point at each other, clear the references before deleting.
+    matches.update(team1=None, team2=None)
+    bulk_delete(bowling_models.Frame.objects.filter(game__bowler__team__in=teams))
+    bulk_delete(bowling_models.Game.objects.filter(bowler__team__in=teams))
+    bulk_delete(bowling_models.TeamInstanceBowler.objects.filter(team__in=teams))
+    bulk_delete(teams)
+    bulk_delete(bowling_models.TeamStanding.objects.filter(match__in=matches))
+    bulk_delete(bowling_models.BowlerSeries.objects.filter(match__in=matches))
+
+
+def delete_match(match):
+    """
+    Remove the match along with its team instances, bowlers, games, frames, standings and bowler series.
+    """
+    with transaction.atomic():
+        matches = bowling_models.Match.objects.filter(pk=match.pk)
+        clear_matches(matches)
+        bulk_delete(matches)
+
+        bowling_models.Week.touch([match.week_id])
+
+
+def delete_matches(weeks):
+    """
+    Remove the matches of the weeks along with their team instances, bowlers, games, frames, standings, bowler
+    statistics and bowler series.  Every table is cleared with a single statement, however many matches the weeks hold.
+    """
+    matches = bowling_models.Match.objects.filter(week__in=weeks)
+
+    week_numbers = {}
+    for week in weeks:
+        week_numbers.setdefault(week.league_id, set()).add(week.week_number)
+
+    with transaction.atomic():
+        clear_matches(matches)
+        # Statistics are kept by week number, the handicaps of a new schedule would otherwise be carried over from them.
+        for league_id, numbers in week_numbers.items():
+            bulk_delete(bowling_models.BowlerWeekStats.objects.filter(league=league_id, week_number__in=numbers))
+        bulk_delete(matches)
+
+        # The rows were deleted without sending the signals that move the weeks to a new version.
+        bowling_models.Week.touch([week.pk for week in weeks])
+
+
+def schedule_season(league, first_lane=1, replace=False):
+    """
+    Create the matches of every week of the league, along with their team instances, bowlers and games, with batched
+    inserts in a single transaction.
+    :param league: league to schedule.
+    :param first_lane: lowest lane number used by the league.
+    :param replace: remove the matches that were already created instead of refusing to schedule the season.
+    :return: the matches that were created.
+    """
+    weeks = list(league.weeks.order_by('week_number'))
+    teams = list(league.teams.order_by('pk'))
+    schedule = round_robin(teams, len(weeks))
+
+    with transaction.atomic():
+        if bowling_models.Match.objects.filter(week__league=league).exists():
+            if not replace:
+                raise ScheduleError('%s already has matches scheduled' % league)
+            delete_matches(weeks)
+
+        matches = []
+        for week_index, (week, pairs) in enumerate(zip(weeks, schedule)):
+            for (team1, team2), lanes in zip(pairs, lane_pairs(week_index, len(pairs), first_lane)):
+                match = bowling_models.Match(week=week, lanes=lanes)
+                match.team1 = bowling_models.TeamInstance(definition=team1, match=match, week=week)
+                match.team2 = bowling_models.TeamInstance(definition=team2, match=match, week=week)
+                matches.append(match)
+
+        bulk_insert(bowling_models.Match, matches, ('week_id', 'lanes'), week__league=league)
+
+        team_instances = []
+        for match in matches:
+            match.team1.match = match.team2.match = match
+            team_instances.extend([match.team1, match.team2])
+
+        bulk_insert(bowling_models.TeamInstance, team_instances, ('week_id', 'definition_id'), week__league=league)
+
+        for match in matches:
+            match.team1_id, match.team2_id = match.team1.pk, match.team2.pk
+        bulk_update(bowling_models.Match, matches, ('team1', 'team2'))
+
+        for start in range(0, len(team_instances), PROVISION_BATCH_SIZE):
+            bowling_models.TeamInstance.provision(team_instances[start:start + PROVISION_BATCH_SIZE], league=league)
+
+        bowling_models.Week.touch([week.pk for week in weeks])
+
+    return matches
@@ -0,0 +1,135 @@
+"""
+Scoring of games from the throws recorded in their frames.
+
+Games are scored in bulk as NumPy arrays with one row per game and one column per throw.  Frames one through nine use
+two columns each (the second one is empty after a strike) and the tenth frame uses the last three columns.
+"""
+import numpy
+
+from bowling_entry import models as bowling_models
+from bowling_entry import packing
+from bowling_entry.packing import PINS, THROWS_PER_GAME
+
+FRAME_VALUES = ('game_id', 'frame_number', 'throw1_type', 'throw1_value', 'throw2_type', 'throw2_value',
+                'throw3_type', 'throw3_value', )
+
+
+def throws_array(frame_rows):
+    """
+    Build the throws array from frame rows.  Fouls and missing throws count as zero pins.
+    :param frame_rows: iterable of tuples in the FRAME_VALUES order.
+    :return: list of the game ids and the array of pin counts, rows of the array follow the order of the game ids.
+    """
+    frame_rows = [row for row in frame_rows if 1 <= row[1] <= bowling_models.FRAMES_PER_GAME]
+    count = len(frame_rows)
+
+    def column(index):
+        return numpy.fromiter((row[index] for row in frame_rows), dtype=numpy.int32, count=count)
+
+    def pins(index):
+        return numpy.fromiter(((row[index + 1] or 0) if row[index] != bowling_models.FOUL else 0
+                               for row in frame_rows), dtype=numpy.int16, count=count)
+
+    game_ids, rows = numpy.unique(column(0), return_inverse=True)
+    frame_numbers = column(1)
+
+    # Frames one through nine start on every other column, the tenth frame takes the last three.
+    tenth = frame_numbers == bowling_models.FRAMES_PER_GAME
+    columns = numpy.where(tenth, THROWS_PER_GAME - 3, (frame_numbers - 1) * 2)
+
+    throws = numpy.zeros((len(game_ids), THROWS_PER_GAME), dtype=numpy.int16)
+    throws[rows, columns] = pins(2)
+    throws[rows, columns + 1] = pins(4)
+    throws[rows[tenth], THROWS_PER_GAME - 1] = pins(6)[tenth]
+
+    return game_ids.tolist(), throws
+
+
+def packed_throws_array(packed_rows):
+    """
+    Build the throws array from the packed frames of games, the packed layout matches the columns of the array.
+    :param packed_rows: iterable of (game id, packed frames) tuples.
+    :return: list of the game ids and the array of pin counts, rows of the array follow the order of the game ids.
+    """
+    game_ids = []
+    values = []
+    for game_id, packed in packed_rows:
+        game_ids.append(game_id)
+        values.append(bytes(packed))
+
+    data = numpy.frombuffer(b''.join(values), dtype=numpy.uint8).reshape(len(game_ids), THROWS_PER_GAME)
+    pins = data & packing.VALUE_MASK
+    missed = (pins == packing.EMPTY) | ((data & packing.FOUL_FLAG) != 0)
+
+    return game_ids, numpy.where(missed, 0, pins).astype(numpy.int16)
+
+
+def frame_scores(throws):
+    """
+    Score of each of the frames of the games.
+    :param throws: array of pin counts with one row per game.
+    :return: array with one row per game and one column per frame.
+    """
+    throws = numpy.asarray(throws, dtype=numpy.int32)
+    game_count = throws.shape[0]
+    rows = numpy.arange(game_count)[:, numpy.newaxis]
+
+    first = throws[:, 0:18:2]
+    second = throws[:, 1:18:2]
+    strike = first == PINS
+
+    # Position of the first throw of each frame once the empty throws after strikes are removed.
+    starts = numpy.zeros((game_count, bowling_models.FRAMES_PER_GAME), dtype=numpy.int32)
+    starts[:, 1:] = numpy.cumsum(numpy.where(strike, 1, 2), axis=1)
+
+    # Throws in the order that they were bowled, the last column collects the empty throws after strikes.
+    rolls = numpy.zeros((game_count, THROWS_PER_GAME + 1), dtype=numpy.int32)
+    rolls[rows, starts[:, :9]] = first
+    rolls[rows, numpy.where(strike, THROWS_PER_GAME, starts[:, :9] + 1)] = second
+    rolls[rows, starts[:, 9:] + numpy.arange(3)] = throws[:, 18:21]
+
+    roll1 = rolls[rows, starts]
+    roll2 = rolls[rows, starts + 1]
+    roll3 = rolls[rows, starts + 2]
+
+    bonus = (roll1 == PINS) | (roll1 + roll2 == PINS)
+    return roll1 + roll2 + numpy.where(bonus, roll3, 0)
+
+
+def running_totals(throws):
+    """
+    Running total of the games after each of the frames.
+    """
+    return numpy.cumsum(frame_scores(throws), axis=1)
+
+
+def game_totals(throws):
+    """
+    Total score of each of the games.
+    """
+    return frame_scores(throws).sum(axis=1)
+
+
+def load_throws(games):
+    """
+    Read the frames of the games with one query for the frame rows and one for the packed frames.
+    :param games: queryset of the games to load, games without any frames are left out.
+    :return: list of the game ids and the array of pin counts.
+    """
+    frames = bowling_models.Frame.objects.filter(game__in=games, game__packed_frames__isnull=True).order_by()
+    game_ids, throws = throws_array(frames.values_list(*FRAME_VALUES).iterator())
+
+    packed = games.filter(packed_frames__isnull=False).order_by()
+    packed_ids, packed_throws = packed_throws_array(packed.values_list('pk', 'packed_frames').iterator())
+
+    return game_ids + packed_ids, numpy.concatenate([throws, packed_throws])
+
+
+def score_games(games):
+    """
+    Compute the totals of the games from their frames.
+    :param games: queryset of the games to score.
+    :return: dictionary of game id to total, games without any frames are left out.
+    """
+    game_ids, throws = load_throws(games)
+    return dict(zip(game_ids, game_totals(throws).tolist()))
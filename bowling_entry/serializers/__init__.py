@@ -1,3 +1,3 @@
 
 from .common import *
-from .scoresheet import ScoreSheet
+from .scoresheet import FrameEntry, ScoreSheet
@@ -1,7 +1,10 @@
 import logging
 
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from bowling_entry import models as bowling_models
+from bowling_entry import roster as bowling_roster
+from bowling_entry.bulk import bulk_insert, bulk_update
 from django.contrib.auth import models as auth_models
 
 
@@ -132,48 +135,180 @@ class TeamInstance(serializers.ModelSerializer):
         fields = ('id', 'name', )
 
 
+def check_lane_conflicts(week, lanes):
+    """
+    Make sure that none of the lanes is used twice, by the lanes provided or by the matches of the week.
+    """
+    lanes = list(lanes)
+    for existing_lanes in week.matches.values_list('lanes', flat=True):
+        lanes.extend(int(lane) for lane in existing_lanes.split(',') if lane)
+
+    for lane in lanes:
+        if lanes.count(lane) > 1:
+            raise serializers.ValidationError('Lane %s is used by more than one match the week of %s' % (lane, week))
+
+
+def check_team_conflicts(week, teams, exclude_match=None):
+    """
+    Make sure that none of the teams already has a match during the week, with a single indexed query.
+    """
+    conflicts = bowling_models.TeamInstance.objects.filter(week=week, definition__in=teams)
+    if exclude_match is not None:
+        conflicts = conflicts.exclude(match=exclude_match)
+
+    conflict = conflicts.values_list('definition', flat=True).first()
+    if conflict is not None:
+        team = [team for team in teams if team.pk == conflict][0]
+        raise serializers.ValidationError('%s already has a match the week of %s' % (team, week))
+
+
+class TeamDefinitionField(serializers.PrimaryKeyRelatedField):
+    """
+    Team definition that is taken from the team_definitions preloaded in the serializer context when it is there.
+    """
+
+    def to_internal_value(self, data):
+        team_definitions = self.context.get('team_definitions')
+        if team_definitions is not None:
+            try:
+                return team_definitions[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        return super(TeamDefinitionField, self).to_internal_value(data)
+
+
+class MatchListSerializer(serializers.ListSerializer):
+    """
+    Creates all of the matches of a week at once.  The matches are validated together in memory and against the week
+    with a fixed number of queries, then created with their team instances, bowlers and games in a single transaction
+    with batched inserts.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            team_pks = set()
+            for match_data in data:
+                for field_name in ('team1_definition', 'team2_definition'):
+                    try:
+                        team_pks.add(int(match_data.get(field_name)))
+                    except (AttributeError, TypeError, ValueError):
+                        pass
+
+            self.context['team_definitions'] = bowling_models.TeamDefinition.objects.in_bulk(team_pks)
+
+        return super(MatchListSerializer, self).to_internal_value(data)
+
+    def validate(self, attrs):
+        week = self.context.get('week')
+
+        teams = []
+        lanes = []
+        for match_data in attrs:
+            teams.extend([match_data['team1']['definition'], match_data['team2']['definition']])
+            lanes.extend(int(lane) for lane in match_data['lanes'].split(','))
+
+        for team in teams:
+            if teams.count(team) > 1:
+                raise serializers.ValidationError('%s is in more than one of the matches' % team)
+
+        check_lane_conflicts(week, lanes)
+        check_team_conflicts(week, teams)
+
+        return attrs
+
+    def create(self, validated_data):
+        week = self.context.get('week')
+        league = self.context.get('league')
+
+        if not validated_data:
+            return []
+
+        try:
+            with transaction.atomic():
+                # The keys of the new matches are read back by their lanes, which are only unique while no other match
+                # is created for the week.  The week is locked and the lanes are checked again under the lock.
+                bowling_models.Week.objects.select_for_update().get(pk=week.pk)
+                check_lane_conflicts(week, [int(lane) for match_data in validated_data
+                                            for lane in match_data['lanes'].split(',')])
+
+                matches = [bowling_models.Match(week=week, lanes=match_data['lanes']) for match_data in validated_data]
+                bulk_insert(bowling_models.Match, matches, ('lanes', ), week=week,
+                            lanes__in=[match.lanes for match in matches])
+
+                team_instances = []
+                for match, match_data in zip(matches, validated_data):
+                    match.team1 = bowling_models.TeamInstance(definition=match_data['team1']['definition'],
+                                                              match=match, week=week)
+                    match.team2 = bowling_models.TeamInstance(definition=match_data['team2']['definition'],
+                                                              match=match, week=week)
+                    team_instances.extend([match.team1, match.team2])
+
+                bulk_insert(bowling_models.TeamInstance, team_instances, ('definition_id', ), week=week,
+                            definition__in=[team.definition_id for team in team_instances])
+
+                for match in matches:
+                    match.team1_id, match.team2_id = match.team1.pk, match.team2.pk
+                bulk_update(bowling_models.Match, matches, ('team1', 'team2'))
+
+                bowling_models.TeamInstance.provision(team_instances, league=league)
+                bowling_models.Week.touch([week.pk])
+        except IntegrityError:
+            # Another match with one of the teams was created for the week since these were validated.
+            raise serializers.ValidationError('One of the teams already has a match the week of %s' % week)
+
+        return matches
+
+
 class Match(serializers.ModelSerializer):
     team1 = TeamInstance(read_only=True)
     team2 = TeamInstance(read_only=True)
-    team1_definition = serializers.PrimaryKeyRelatedField(write_only=True,
-                                                          source='team1.definition',
-                                                          queryset=bowling_models.TeamDefinition.objects.all())
-    team2_definition = serializers.PrimaryKeyRelatedField(write_only=True,
-                                                          source='team2.definition',
-                                                          queryset=bowling_models.TeamDefinition.objects.all())
+    team1_definition = TeamDefinitionField(write_only=True, source='team1.definition',
+                                           queryset=bowling_models.TeamDefinition.objects.all())
+    team2_definition = TeamDefinitionField(write_only=True, source='team2.definition',
+                                           queryset=bowling_models.TeamDefinition.objects.all())
 
     class Meta:
         model = bowling_models.Match
         fields = ('id', 'lanes', 'team1', 'team2', 'team1_definition', 'team2_definition', )
+        list_serializer_class = MatchListSerializer
 
     def create(self, validated_data):
 
-        logger.debug('Validated_data %s' % validated_data)
-        logger.debug('Context %s' % self.context)
+        logger.debug('Validated_data %s', validated_data)
+        logger.debug('Context %s', self.context)
 
-        logger.debug('Week: %s' % self.context.get('week'))
-
-        match = bowling_models.Match(week=self.context.get('week'), lanes=validated_data['lanes'])
-        match.save()
+        logger.debug('Week: %s', self.context.get('week'))
 
+        week = self.context.get('week')
         team01 = validated_data.pop('team1')
-        team01_instance = bowling_models.TeamInstance(definition=team01['definition'], match=match)
-        team01_instance.save()
-        team01_instance.define_bowlers()
-
         team02 = validated_data.pop('team2')
-        team02_instance = bowling_models.TeamInstance(definition=team02['definition'], match=match)
-        team02_instance.save()
-        team02_instance.define_bowlers()
 
-        match.team1 = team01_instance
-        match.team2 = team02_instance
-        match.save()
+        try:
+            with transaction.atomic():
+                match = bowling_models.Match(week=week, lanes=validated_data['lanes'])
+                match.save()
+
+                team01_instance = bowling_models.TeamInstance(definition=team01['definition'], match=match, week=week)
+                team01_instance.save()
+
+                team02_instance = bowling_models.TeamInstance(definition=team02['definition'], match=match, week=week)
+                team02_instance.save()
+
+                match.team1 = team01_instance
+                match.team2 = team02_instance
+                match.save(update_fields=['team1', 'team2'])
+
+                match.create_games(league=self.context.get('league'))
+        except IntegrityError:
+            # Another match with one of the teams was created for the week since this one was validated.
+            raise serializers.ValidationError('%s or %s already has a match the week of %s' % (
+                team01['definition'], team02['definition'], week))
 
         return match
 
     def validate(self, data):
-        logger.debug('%s' % data)
+        logger.debug('%s', data)
 
         week = self.context.get('week')
 
@@ -184,35 +319,86 @@ class Match(serializers.ModelSerializer):
 
         lane01, lane02 = data.get('lanes').split(',')
 
-        logger.debug('%s' % league)
+        logger.debug('%s', league)
 
-        if week.league.pk != league.pk:
+        if week.league_id != league.pk:
             raise serializers.ValidationError('Week is not a part of the league.')
-        elif team01.league.pk != league.pk:
+        elif team01.league_id != league.pk:
             raise serializers.ValidationError('Team 1 is not a part of the correct league')
-        elif team02.league.pk != league.pk:
+        elif team02.league_id != league.pk:
             raise serializers.ValidationError('Team 2 is not a part of the correct league')
         elif team01 == team02:
             raise serializers.ValidationError('The same team cannot play against each other')
         elif int(lane01) != int(lane02) - 1:
             raise serializers.ValidationError('The lanes are not next to each other')
 
-        for match in week.matches.all():
-            if self.instance is not None and match.pk == self.instance.pk:
-                continue
-
-            if match.team1.definition.pk == team01.pk:
-                raise serializers.ValidationError('%s already has a match the week of %s' % (team01, week))
-            elif match.team2.definition.pk == team01.pk:
-                raise serializers.ValidationError('%s already has a match the week of %s' % (team01, week))
-            elif match.team1.definition.pk == team02.pk:
-                raise serializers.ValidationError('%s already has a match the week of %s' % (team02, week))
-            elif match.team2.definition.pk == team02.pk:
-                raise serializers.ValidationError('%s already has a match the week of %s' % (team02, week))
+        # Matches created together are checked against the week all at once by the list serializer.
+        if not isinstance(self.parent, MatchListSerializer):
+            check_team_conflicts(week, [team01, team02], exclude_match=self.instance)
 
         return data
 
 
+class Standing(serializers.Serializer):
+    """
+    Standings of a team summed up over the matches that it has bowled.
+    """
+    id = serializers.IntegerField(source='team')
+    name = serializers.CharField(source='team__name')
+    matches = serializers.IntegerField()
+    points_won = serializers.FloatField(source='won')
+    points_lost = serializers.FloatField(source='lost')
+    games_bowled = serializers.IntegerField(source='games')
+    scratch_pins = serializers.IntegerField(source='scratch')
+    handicap_pins = serializers.IntegerField(source='handicap')
+
+
+class LeaderboardQuery(serializers.Serializer):
+    """
+    Options of a leaderboard, read from the query string.
+    """
+    handicap = serializers.BooleanField(default=False)
+    gender = serializers.ChoiceField(choices=bowling_models.BOWLER_GENDER_CHOICES, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class LeaderboardEntry(serializers.Serializer):
+    """
+    Score of a bowler on a leaderboard along with the league and the week it was bowled in.
+    """
+    rank = serializers.IntegerField()
+    id = serializers.IntegerField(source='bowler')
+    name = serializers.CharField(source='bowler__name')
+    gender = serializers.CharField()
+    league = serializers.IntegerField()
+    league_name = serializers.CharField(source='league__name')
+    week_number = serializers.IntegerField()
+    handicap = serializers.IntegerField()
+    games_bowled = serializers.IntegerField()
+    score = serializers.IntegerField()
+
+
+class Schedule(serializers.Serializer):
+    """
+    Options of the generation of the schedule of a season.
+    """
+    first_lane = serializers.IntegerField(min_value=1, default=1)
+    replace = serializers.BooleanField(default=False)
+
+
+class Roster(serializers.Serializer):
+    """
+    Upload of the roster of a league, the format is guessed from the name of the file when it is not provided.
+    """
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=bowling_roster.FORMATS, required=False)
+
+    def validate(self, attrs):
+        if not attrs.get('format'):
+            attrs['format'] = bowling_roster.guess_format(attrs['file'].name)
+        return attrs
+
+
 class TeamBowlerInstance(serializers.ModelSerializer):
 
     class Meta:
@@ -1,14 +1,52 @@
 from rest_framework import serializers
 from bowling_entry import models as bowling_models
+from bowling_entry.batch import ScoreSheetBatch
+from bowling_entry.packing import PINS
+
+
+class FrameEntry(serializers.ModelSerializer):
+    """
+    Throws of a single frame, written through the batch of the view along with the total of its game when requested.
+    """
+    update_total = serializers.BooleanField(write_only=True, required=False, default=False)
+    total = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = bowling_models.Frame
+        fields = ('frame_number', 'throw1_type', 'throw1_value', 'throw2_type', 'throw2_value', 'throw3_type',
+                  'throw3_value', 'update_total', 'total', )
+        read_only_fields = ('frame_number', )
+
+    def get_total(self, frame):
+        return self.context['batch'].games_by_pk[frame.game_id].total
+
+    def validate(self, attrs):
+        for field in ('throw1_value', 'throw2_value', 'throw3_value'):
+            value = attrs.get(field)
+            if value is not None and not 0 <= value <= PINS:
+                raise serializers.ValidationError('%s must be between 0 and %s' % (field, PINS))
+        return attrs
+
+    def update(self, instance, validated_data):
+        batch = self.context['batch']
+        update_total = validated_data.pop('update_total', False)
+
+        batch.update_frame(instance, validated_data)
+        if update_total:
+            batch.score_game(batch.games_by_pk[instance.game_id])
+
+        batch.save()
+        return instance
 
 
 class ScoreSheetFrameListSerializer(serializers.ListSerializer):
 
     def update(self, instance, validated_data):
+        batch = self.root.batch
         ret = []
 
         for frame_data in validated_data:
-            frame, created = instance.get_or_create(frame_number=frame_data.get('frame_number'))
+            frame = batch.get_frame(instance, frame_data.get('frame_number'))
             result = self.child.update(frame, frame_data)
 
             if result is not None:
@@ -16,6 +54,10 @@ class ScoreSheetFrameListSerializer(serializers.ListSerializer):
 
         return ret
 
+    def get_attribute(self, instance):
+        # A list, so that to_representation does not clone the queryset and lose the prefetched frames.
+        return list(instance.get_frames())
+
 
 class ScoreSheetFrame(serializers.ModelSerializer):
 
@@ -29,6 +71,10 @@ class ScoreSheetFrame(serializers.ModelSerializer):
                         'throw3_type': {'required': False},
                         'throw3_value': {'required': False}}
 
+    def update(self, instance, validated_data):
+        self.root.batch.update_frame(instance, validated_data)
+        return instance
+
     def validate(self, attrs):
         # frame_number must be provided, same with throws
         if attrs.get('frame_number') is None:
@@ -39,10 +85,11 @@ class ScoreSheetFrame(serializers.ModelSerializer):
 class ScoreSheetGameListSerializer(serializers.ListSerializer):
 
     def update(self, instance, validated_data):
+        batch = self.root.batch
         ret = []
 
         for game_data in validated_data:
-            game = instance.get(game_number=game_data.get('game_number'))
+            game = batch.get_game(instance, game_data.get('game_number'))
             result = self.child.update(game, game_data)
 
             if result is not None:
@@ -66,13 +113,11 @@ class ScoreSheetGame(serializers.ModelSerializer):
         # Only fields that we are going to update are the totals
         total_value = validated_data.get('total')
         if total_value is not None:
-            instance.total = total_value
-        instance.save()
+            self.root.batch.update_game(instance, total_value)
 
-        # TODO: Update the split and frame values.
         frame_data = validated_data.get('frames')
         if frame_data is not None:
-            self.fields['frames'].update(instance.frames, frame_data)
+            self.fields['frames'].update(instance, frame_data)
 
         return instance
 
@@ -86,11 +131,11 @@ class ScoreSheetGame(serializers.ModelSerializer):
 class ScoreSheetBowlerListSerializer(serializers.ListSerializer):
 
     def update(self, instance, validated_data):
-
+        batch = self.root.batch
         ret = []
 
         for bowler_data in validated_data:
-            bowler = instance.get(pk=bowler_data.get('id'))
+            bowler = batch.get_bowler(instance, bowler_data.get('id'))
             result = self.child.update(bowler, bowler_data)
 
             if result is not None:
@@ -124,12 +169,12 @@ class ScoreSheetBowler(serializers.ModelSerializer):
 
         games = validated_data.get('games')
         if games is not None:
-            self.fields['games'].update(instance.games, games)
+            self.fields['games'].update(instance, games)
 
         definition = validated_data.get('definition')
         type = validated_data.get('type')
         if definition is not None and type is not None:
-            instance.update_definition(definition, type)
+            self.root.batch.update_bowler(instance, definition, type)
 
         return instance
 
@@ -170,8 +215,8 @@ class ScoreSheetTeam(serializers.ModelSerializer):
     def update(self, instance, validated_data):
 
         bowlers = validated_data.get('bowlers')
-
-        self.fields['bowlers'].update(instance.bowlers, bowlers)
+        if bowlers is not None:
+            self.fields['bowlers'].update(instance, bowlers)
 
         return instance
 
@@ -184,16 +229,55 @@ class ScoreSheet(serializers.ModelSerializer):
         model = bowling_models.Match
         fields = ('id', 'lanes', 'team1', 'team2', )
 
-    def update(self, instance, validated_data):
-
-        instance.lanes = validated_data.get('lanes')
+    def validate(self, attrs):
+        # The changes are applied to the batch while validating, so that bowlers and games that are not a part of the
+        # match and invalid frames are rejected before anything is written.
+        if self.instance is not None:
+            self.prepare_batch(self.instance, attrs)
+        return attrs
 
+    def prepare_batch(self, instance, validated_data):
+        """
+        Load everything that the update touches up front and apply the changes to it in memory.
+        """
         team1_definition = validated_data.get('team1')
+        team2_definition = validated_data.get('team2')
+
+        self.batch = ScoreSheetBatch(instance, league=self.context.get('league'))
+        self.batch.load(*self.get_update_targets([team1_definition, team2_definition]))
+
+        if 'lanes' in validated_data and validated_data['lanes'] != instance.lanes:
+            self.batch.update_lanes(validated_data['lanes'])
+
         if team1_definition is not None:
             self.fields['team1'].update(instance.team1, team1_definition)
 
-        team2_definition = validated_data.get('team2')
         if team2_definition is not None:
             self.fields['team2'].update(instance.team2, team2_definition)
 
+        self.batch.repack()
+
+    def update(self, instance, validated_data):
+        # The lanes and the scores are written together, in the transaction of the batch.
+        self.batch.save()
+        if self.batch.lanes is not None:
+            instance.lanes = self.batch.lanes
+
         return instance
+
+    def get_update_targets(self, team_definitions):
+        """
+        Collect the bowler ids and the (bowler id, game number) pairs with frames in the validated team data.
+        """
+        bowler_ids = []
+        frame_games = []
+
+        for team_definition in team_definitions:
+            for bowler_data in (team_definition or {}).get('bowlers') or []:
+                bowler_ids.append(bowler_data.get('id'))
+
+                for game_data in bowler_data.get('games') or []:
+                    if game_data.get('frames'):
+                        frame_games.append((bowler_data.get('id'), game_data.get('game_number')))
+
+        return bowler_ids, frame_games
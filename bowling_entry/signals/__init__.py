@@ -1 +1,5 @@
 __author__ = 'rerobins'
+from django.dispatch import Signal
+
+# Sent after the games or frames of matches have been written with bulk queries, which do not send the model signals.
+scores_updated = Signal(providing_args=['matches', 'league'])
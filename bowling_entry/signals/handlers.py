@@ -1,9 +1,99 @@
+__author__ = 'rerobins'
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from bowling_entry import models as bowling_models
+from bowling_entry.signals import scores_updated
 
 
 @receiver(post_save, sender=bowling_models.League)
 def update_weeks(sender, **kwargs):
     league = kwargs['instance']
-    league.update_weeks()
\ No newline at end of file
+    league.update_weeks()
+
+
+@receiver(scores_updated)
+def update_standings(sender, **kwargs):
+    for match in kwargs['matches']:
+        bowling_models.TeamStanding.update_for_match(match, league=kwargs.get('league'))
+
+
+@receiver(scores_updated)
+def update_bowler_stats(sender, **kwargs):
+    for match in kwargs['matches']:
+        bowling_models.BowlerWeekStats.update_for_match(match, league=kwargs.get('league'))
+
+
+@receiver(scores_updated)
+def update_bowler_series(sender, **kwargs):
+    for match in kwargs['matches']:
+        bowling_models.BowlerSeries.update_for_match(match, league=kwargs.get('league'))
+
+
+@receiver(post_save, sender=bowling_models.BowlerDefinition)
+def update_series_gender(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    bowler = kwargs['instance']
+    bowling_models.BowlerSeries.objects.filter(bowler=bowler).exclude(gender=bowler.gender).update(
+        gender=bowler.gender)
+
+
+@receiver(scores_updated)
+def touch_matches(sender, **kwargs):
+    bowling_models.Match.touch([match.pk for match in kwargs['matches']])
+
+
+# The match is looked up from the row that the instance belongs to, which is still there once the instance is deleted.
+@receiver(post_save, sender=bowling_models.TeamInstanceBowler)
+@receiver(post_delete, sender=bowling_models.TeamInstanceBowler)
+def touch_bowler_match(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    teams = bowling_models.TeamInstance.objects.filter(pk=kwargs['instance'].team_id)
+    bowling_models.Match.touch(teams.values('match'))
+
+
+@receiver(post_save, sender=bowling_models.Game)
+@receiver(post_delete, sender=bowling_models.Game)
+def touch_game_match(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    teams = bowling_models.TeamInstance.objects.filter(bowlers=kwargs['instance'].bowler_id)
+    bowling_models.Match.touch(teams.values('match'))
+
+
+@receiver(post_save, sender=bowling_models.Frame)
+@receiver(post_delete, sender=bowling_models.Frame)
+def touch_frame_match(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    teams = bowling_models.TeamInstance.objects.filter(bowlers__games=kwargs['instance'].game_id)
+    bowling_models.Match.touch(teams.values('match'))
+
+
+@receiver(post_save, sender=bowling_models.Week)
+@receiver(post_delete, sender=bowling_models.Week)
+@receiver(post_save, sender=bowling_models.TeamDefinition)
+@receiver(post_delete, sender=bowling_models.TeamDefinition)
+@receiver(post_save, sender=bowling_models.BowlerDefinition)
+@receiver(post_delete, sender=bowling_models.BowlerDefinition)
+def touch_league(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    league_id = kwargs['instance'].league_id
+    if league_id is not None:
+        bowling_models.League.touch([league_id])
+
+
+@receiver(post_save, sender=bowling_models.Match)
+@receiver(post_delete, sender=bowling_models.Match)
+def touch_match_week(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    bowling_models.Week.touch([kwargs['instance'].week_id])
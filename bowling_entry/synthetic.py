@@ -0,0 +1,241 @@
+"""
+Generation of synthetic leagues, used to measure how the application behaves with seasons of any size.
+
+A generated league has its teams, bowlers and substitutes, a full round-robin schedule and random scores for the
+weeks that were bowled.  The rows are written with bulk queries, and the same seed always generates the same league.
+
+The throws of every game are drawn at once as NumPy arrays.  Each ball knocks down every standing pin with the same
+chance, so the pins of a ball follow a binomial distribution, and the chance of each bowler is picked so that the games
+of the bowler average out to the average of the bowler.  The frames are written as plain rows, without building a
+model instance for each of them.
+"""
+import datetime
+import random
+
+import numpy
+
+from django.db import transaction
+from django.utils import six
+from bowling_entry import models as bowling_models
+from bowling_entry import packing
+from bowling_entry import schedule
+from bowling_entry import scoring
+from bowling_entry.bulk import bulk_insert, bulk_update, insert_rows
+from bowling_entry.signals import scores_updated
+
+# Number of frames written by a single insert.
+FRAME_BATCH_SIZE = 1000
+
+# Marks the throws of the arrays that were not bowled, the second ball after a strike for instance.
+NO_THROW = -1
+
+# Average of the bowlers that do not have one yet.
+DEFAULT_AVERAGE = 150
+
+# Chances of a ball knocking down a pin that the averages are calibrated against, along with the number of games
+# bowled for each of the chances.
+CALIBRATION_CHANCES = numpy.linspace(0.3, 0.99, 70)
+CALIBRATION_GAMES = 1000
+
+# Spread of the chance of a bowler from one game to the next, a bowler does not bowl every game as well.
+CHANCE_SPREAD = 0.03
+
+FRAME_FIELDS = ('game', 'frame_number', ) + tuple(field for fields in packing.THROW_FIELDS for field in fields)
+
+_calibration = None
+
+
+def bowl(random_state, chances):
+    """
+    Throws of games bowled with the chances of knocking down a pin.
+    :param random_state: numpy.random.RandomState that the pins are drawn from.
+    :param chances: array with the chance of each game.
+    :return: array with one row per game and one column per throw, in the layout of the scoring arrays, NO_THROW where
+    no ball was thrown.
+    """
+    chances = numpy.asarray(chances, dtype=float)
+    frames = bowling_models.FRAMES_PER_GAME - 1
+    throws = numpy.empty((len(chances), packing.THROWS_PER_GAME), dtype=numpy.int16)
+
+    first = random_state.binomial(packing.PINS, chances[:, numpy.newaxis], size=(len(chances), frames))
+    second = random_state.binomial(packing.PINS - first, chances[:, numpy.newaxis])
+    throws[:, 0:frames * 2:2] = first
+    throws[:, 1:frames * 2:2] = numpy.where(first == packing.PINS, NO_THROW, second)
+
+    # The tenth frame racks the pins again after a strike or a spare and gives a third ball for them.
+    first = random_state.binomial(packing.PINS, chances)
+    second = random_state.binomial(numpy.where(first == packing.PINS, packing.PINS, packing.PINS - first), chances)
+    standing = numpy.where((first == packing.PINS) & (second < packing.PINS), packing.PINS - second, packing.PINS)
+    third = random_state.binomial(standing, chances)
+    bonus = (first == packing.PINS) | (first + second == packing.PINS)
+
+    throws[:, -3] = first
+    throws[:, -2] = second
+    throws[:, -1] = numpy.where(bonus, third, NO_THROW)
+    return throws
+
+
+def vary(random_state, chances):
+    """
+    Chances of the games of bowlers with the chances, moved by the spread of the form of a bowler.
+    """
+    return numpy.clip(chances + random_state.normal(0, CHANCE_SPREAD, len(chances)), 0, 1)
+
+
+def calibration():
+    """
+    Average score of the games bowled with each of the CALIBRATION_CHANCES, always drawn from the same seed.
+    """
+    global _calibration
+
+    if _calibration is None:
+        chances = numpy.repeat(CALIBRATION_CHANCES, CALIBRATION_GAMES)
+        random_state = numpy.random.RandomState(0)
+        totals = scoring.game_totals(numpy.maximum(bowl(random_state, vary(random_state, chances)), 0))
+        scores = totals.reshape(len(CALIBRATION_CHANCES), CALIBRATION_GAMES).mean(axis=1)
+
+        # Keep the scores increasing, so that they can be interpolated.
+        _calibration = numpy.maximum.accumulate(scores)
+
+    return _calibration
+
+
+def random_throws(random_state, averages):
+    """
+    Throws of games bowled by bowlers with the averages.
+    :param random_state: numpy.random.RandomState that the pins are drawn from.
+    :param averages: average of the bowler of each of the games, None when the bowler does not have one.
+    :return: array of the throws, see bowl.
+    """
+    averages = numpy.array([average or DEFAULT_AVERAGE for average in averages], dtype=float)
+    chances = numpy.interp(averages, calibration(), CALIBRATION_CHANCES)
+    return bowl(random_state, vary(random_state, chances))
+
+
+def frame_rows(game_ids, throws):
+    """
+    Rows of the frames of the games, in the order of FRAME_FIELDS.
+    """
+    frames = bowling_models.FRAMES_PER_GAME
+
+    # One row per frame with three throws, the third throw of the first nine frames is never bowled.
+    values = numpy.full((len(game_ids), frames, 3), NO_THROW, dtype=numpy.int16)
+    values[:, :frames - 1, :2] = throws[:, :(frames - 1) * 2].reshape(len(game_ids), frames - 1, 2)
+    values[:, frames - 1, :] = throws[:, -3:]
+
+    # Text, so that the database adapter does not have to decode the type of every throw.
+    throw = six.text_type(bowling_models.THROW)
+    for game_id, game_values in zip(game_ids, values.tolist()):
+        for frame_number, (first, second, third) in enumerate(game_values, 1):
+            yield (game_id, frame_number, throw, first, throw, None if second == NO_THROW else second, throw,
+                   None if third == NO_THROW else third)
+
+
+def packed_values(throws):
+    """
+    Packed frames of each of the games, see bowling_entry.packing.
+    """
+    packed = numpy.where(throws == NO_THROW, packing.EMPTY, throws).astype(numpy.uint8)
+    return [row.tobytes() for row in packed]
+
+
+def score_games(game_rows, seed=None):
+    """
+    Bowl random games and write their frames and totals, the frames are stored packed or as rows depending on the
+    BOWLING_ENTRY_PACKED_FRAMES setting.
+    :param game_rows: list of (game pk, average of the bowler) tuples.
+    :param seed: seed of the random scores.
+    :return: the number of frames written.
+    """
+    if not game_rows:
+        return 0
+
+    game_ids = [game_id for game_id, average in game_rows]
+    throws = random_throws(numpy.random.RandomState(seed), [average for game_id, average in game_rows])
+    totals = scoring.game_totals(numpy.maximum(throws, 0)).tolist()
+
+    if packing.packed_frames_enabled():
+        packed = packed_values(throws)
+    else:
+        packed = [None] * len(game_ids)
+        insert_rows(bowling_models.Frame, FRAME_FIELDS, frame_rows(game_ids, throws), batch_size=FRAME_BATCH_SIZE)
+
+    games = [bowling_models.Game(pk=game_id, total=total, packed_frames=packed_value)
+             for game_id, total, packed_value in zip(game_ids, totals, packed)]
+    bulk_update(bowling_models.Game, games, ('total', 'packed_frames', ))
+
+    return len(game_ids) * bowling_models.FRAMES_PER_GAME
+
+
+def score_weeks(league, weeks, seed=None, update_standings=True):
+    """
+    Bowl random games for every bowler of the matches of the weeks.
+    :param league: league that the weeks belong to.
+    :param weeks: weeks to bowl.
+    :param seed: seed of the random scores.
+    :param update_standings: send scores_updated for the matches, which updates their standings and statistics.
+    :return: the number of frames written.
+    """
+    games = bowling_models.Game.objects.filter(bowler__team__week__in=weeks).order_by('pk')
+
+    with transaction.atomic():
+        frames = score_games(list(games.values_list('pk', 'bowler__average')), seed=seed)
+
+        if frames and update_standings:
+            matches = list(bowling_models.Match.objects.filter(week__in=weeks))
+            scores_updated.send(sender=score_weeks, matches=matches, league=league)
+
+    return frames
+
+
+def generate_league(secretary, number_of_teams=8, number_of_weeks=10, number_of_games=3, players_per_team=4,
+                    number_of_substitutes=2, scored_weeks=0, open_weeks=0, seed=None, name=None, start_date=None,
+                    update_standings=True):
+    """
+    Create a league with its teams, bowlers, substitutes and schedule.
+    :param secretary: user that runs the league.
+    :param number_of_teams: number of teams in the league.
+    :param number_of_weeks: number of weeks in the season.
+    :param number_of_games: number of games bowled every week.
+    :param players_per_team: number of bowlers on a team.
+    :param number_of_substitutes: number of substitutes of the league.
+    :param scored_weeks: number of weeks, from the start of the season, that have been bowled.
+    :param open_weeks: number of weeks, at the end of the season, that are left without matches.
+    :param seed: seed of the random averages and scores.
+    :param name: name of the league.
+    :param start_date: date of the first week.
+    :param update_standings: update the standings and the bowler statistics of the weeks that were bowled.
+    :return: the league.
+    """
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        league = bowling_models.League.objects.create(
+            secretary=secretary, name=name or 'Synthetic League %s' % rng.randint(1, 10 ** 6),
+            start_date=start_date or datetime.date.today(), number_of_weeks=number_of_weeks,
+            number_of_games=number_of_games, players_per_team=players_per_team)
+
+        teams = bulk_insert(bowling_models.TeamDefinition,
+                            [bowling_models.TeamDefinition(league=league, name='Team %s' % (index + 1))
+                             for index in range(number_of_teams)],
+                            ('name', ), league=league)
+
+        bowlers = []
+        for index in range(number_of_teams * players_per_team + number_of_substitutes):
+            team = teams[index // players_per_team] if index < number_of_teams * players_per_team else None
+            bowlers.append(bowling_models.BowlerDefinition(
+                league=league, team=team, name='Bowler %s' % (index + 1),
+                gender=rng.choice([bowling_models.MALE, bowling_models.FEMALE]),
+                average=min(max(int(rng.gauss(160, 25)), 80), 240)))
+        bowling_models.BowlerDefinition.objects.bulk_create(bowlers)
+
+        schedule.schedule_season(league)
+
+        weeks = list(league.weeks.order_by('week_number'))
+        if open_weeks:
+            schedule.delete_matches(weeks[-open_weeks:])
+        if scored_weeks:
+            score_weeks(league, weeks[:scored_weeks], seed=rng.randint(0, 2 ** 32 - 1),
+                        update_standings=update_standings)
+
+    return league
@@ -0,0 +1,130 @@
+import json
+
+import numpy
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import override_settings
+from django.utils.six import StringIO
+from bowling_entry import benchmark
+from bowling_entry import models as bowling_models
+from bowling_entry import packing
+from bowling_entry import scoring
+from bowling_entry import synthetic
+from django.contrib.auth import models as auth_models
+
+
+class SyntheticLeagueTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+
+    def test_generate_league(self):
+        league = synthetic.generate_league(self.user, number_of_teams=6, number_of_weeks=6, number_of_games=3,
+                                           players_per_team=4, scored_weeks=2, open_weeks=1, seed=3)
+
+        self.assertEqual(league.teams.count(), 6)
+        self.assertEqual(league.bowlers.filter(team__isnull=True).count(), 2)
+        self.assertEqual(league.weeks.count(), 6)
+        self.assertEqual(bowling_models.Match.objects.filter(week__league=league).count(), 3 * 5)
+        self.assertFalse(league.weeks.get(week_number=6).matches.exists())
+
+        scored = bowling_models.Game.objects.filter(bowler__team__week__week_number__lte=2,
+                                                    bowler__team__week__league=league)
+        self.assertEqual(scored.filter(total=0).count(), 0)
+        self.assertEqual(bowling_models.Frame.objects.filter(game__in=scored).count(), scored.count() * 10)
+        self.assertFalse(bowling_models.Game.objects.filter(bowler__team__week__week_number=3,
+                                                            bowler__team__week__league=league,
+                                                            total__gt=0).exists())
+        self.assertTrue(league.standings.exists())
+
+    def test_seed(self):
+        totals = []
+        for index in range(2):
+            league = synthetic.generate_league(self.user, number_of_teams=2, number_of_weeks=1, scored_weeks=1,
+                                               seed=7)
+            totals.append(list(bowling_models.Game.objects.filter(bowler__team__week__league=league).order_by(
+                'pk').values_list('total', flat=True)))
+
+        self.assertEqual(totals[0], totals[1])
+
+    def test_scores_follow_averages(self):
+        random_state = numpy.random.RandomState(11)
+
+        for average in (110, 160, 210):
+            throws = synthetic.random_throws(random_state, [average] * 5000)
+            totals = scoring.game_totals(numpy.maximum(throws, 0))
+            self.assertAlmostEqual(totals.mean(), average, delta=3)
+
+    def test_throws(self):
+        throws = synthetic.random_throws(numpy.random.RandomState(5), [150, 250, None] * 100)
+        pins = numpy.maximum(throws, 0)
+
+        # The pins of a frame never go over a rack, the ball after a strike is not thrown.
+        first, second = throws[:, 0:18:2], throws[:, 1:18:2]
+        self.assertTrue((pins[:, 0:18:2] + pins[:, 1:18:2] <= packing.PINS).all())
+        self.assertTrue(((first == packing.PINS) == (second == synthetic.NO_THROW)).all())
+
+        # The third ball of the tenth frame is only thrown after a strike or a spare.
+        bonus = (throws[:, -3] == packing.PINS) | (throws[:, -3] + throws[:, -2] == packing.PINS)
+        self.assertTrue((bonus == (throws[:, -1] != synthetic.NO_THROW)).all())
+
+    @override_settings(BOWLING_ENTRY_PACKED_FRAMES=True)
+    def test_packed_frames(self):
+        league = synthetic.generate_league(self.user, number_of_teams=2, number_of_weeks=2, scored_weeks=1, seed=4)
+        games = bowling_models.Game.objects.filter(bowler__team__week__league=league, bowler__team__week__week_number=1)
+
+        self.assertFalse(bowling_models.Frame.objects.filter(game__in=games).exists())
+        game_ids, throws = scoring.packed_throws_array(games.order_by('pk').values_list('pk', 'packed_frames'))
+        self.assertEqual(scoring.game_totals(throws).tolist(),
+                         list(games.order_by('pk').values_list('total', flat=True)))
+
+    def test_generate_leagues(self):
+        output = StringIO()
+        call_command('generate_leagues', leagues=2, teams=4, weeks=3, games=2, players=3, scored_weeks=2, seed=9,
+                     stdout=output)
+
+        leagues = bowling_models.League.objects.filter(secretary__username='bowling-entry-synthetic')
+        self.assertEqual(leagues.count(), 2)
+
+        frames = bowling_models.Frame.objects.filter(game__bowler__team__week__league__in=leagues)
+        self.assertEqual(frames.count(), 2 * 2 * 2 * 2 * 3 * 2 * 10)
+        self.assertIn('%s frames' % frames.count(), output.getvalue())
+        self.assertTrue(bowling_models.TeamStanding.objects.filter(league__in=leagues).exists())
+
+        with self.assertRaises(CommandError):
+            call_command('generate_leagues', weeks=3, scored_weeks=4, stdout=StringIO())
+
+
+class BenchmarkTest(TestCase):
+
+    def test_every_route(self):
+        output = StringIO()
+        call_command('benchmark_api', scales=['teams=4,weeks=3,games=2,players=3'], repeat=1, stdout=output)
+
+        report = json.loads(output.getvalue())
+        self.assertEqual([result['route'] for result in report['results']],
+                         [route.name for route in benchmark.ROUTES])
+
+        for result in report['results']:
+            self.assertLess(result['status'], 300, result['route'])
+
+        self.assertFalse(bowling_models.League.objects.exists())
+        self.assertFalse(auth_models.User.objects.exists())
+
+    def test_compare(self):
+        baseline = {'results': [{'scale': 'small', 'route': 'teams', 'queries': 2, 'median_ms': 2.0}]}
+        report = {'results': [{'scale': 'small', 'route': 'teams', 'queries': 3, 'median_ms': 3.0},
+                              {'scale': 'small', 'route': 'weeks', 'queries': 1, 'median_ms': 1.0}]}
+
+        self.assertEqual(benchmark.compare(baseline, report),
+                         [{'scale': 'small', 'route': 'teams', 'queries': 1, 'median_ratio': 1.5}])
+
+    def test_unknown_options(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', routes=['nowhere'], stdout=StringIO())
+
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', scales=['lanes=4'], stdout=StringIO())
@@ -0,0 +1,106 @@
+import datetime
+
+from django.core.management import call_command
+from django.utils.six import StringIO
+from bowling_entry.tests.testcases import SharedDataTestCase
+from bowling_entry import models as bowling_models
+from bowling_entry.signals import scores_updated
+
+
+class BowlerSeriesTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.league = bowling_models.League.objects.get(pk=3)
+        self.match = bowling_models.Match.objects.get(pk=3)
+        self.bowler = self.match.team1.bowlers.filter(definition__isnull=False)[0]
+
+    def test_update_for_match(self):
+        self.bowler.handicap = 20
+        self.bowler.save()
+
+        rows = bowling_models.BowlerSeries.update_for_match(self.match)
+
+        bowlers = bowling_models.TeamInstanceBowler.objects.filter(team__match=self.match, definition__isnull=False)
+        self.assertEqual(set(row.bowler_id for row in rows), set(bowlers.values_list('definition', flat=True)))
+
+        row = bowling_models.BowlerSeries.objects.get(match=self.match, bowler=self.bowler.definition)
+        totals = list(self.bowler.games.values_list('total', flat=True))
+        self.assertEqual(row.week_number, self.match.week.week_number)
+        self.assertEqual(row.games_bowled, self.league.number_of_games)
+        self.assertEqual(row.high_game, max(totals))
+        self.assertEqual(row.high_game_handicap, max(totals) + self.bowler.handicap)
+        self.assertEqual(row.series, sum(totals))
+        self.assertEqual(row.series_handicap, sum(totals) + self.bowler.handicap * len(totals))
+
+    def test_series_not_finished(self):
+        self.bowler.games.filter(game_number=3).update(total=0)
+
+        bowling_models.BowlerSeries.update_for_match(self.match)
+
+        row = bowling_models.BowlerSeries.objects.get(match=self.match, bowler=self.bowler.definition)
+        self.assertEqual(row.games_bowled, self.league.number_of_games - 1)
+        self.assertEqual(row.series, 0)
+        self.assertEqual(row.series_handicap, 0)
+
+    def test_updated_with_scores(self):
+        bowling_models.BowlerSeries.update_for_match(self.match)
+        other = bowling_models.BowlerSeries.objects.exclude(bowler=self.bowler.definition)[0]
+        self.bowler.games.filter(game_number=1).update(total=289)
+
+        scores_updated.send(sender=self.__class__, matches=[self.match])
+
+        self.assertEqual(bowling_models.BowlerSeries.objects.get(bowler=self.bowler.definition).high_game, 289)
+        self.assertEqual(bowling_models.BowlerSeries.objects.get(bowler=other.bowler).high_game, other.high_game)
+
+    def test_gender_copied(self):
+        bowling_models.BowlerSeries.update_for_match(self.match)
+
+        definition = self.bowler.definition
+        definition.gender = bowling_models.FEMALE
+        definition.save()
+
+        self.assertEqual(bowling_models.BowlerSeries.objects.get(bowler=definition).gender, bowling_models.FEMALE)
+
+    def test_active_leagues(self):
+        last_week = self.league.weeks.order_by('-week_number')[0]
+
+        self.assertIn(self.league, bowling_models.BowlerSeries.active_leagues(self.league.start_date))
+        self.assertIn(self.league, bowling_models.BowlerSeries.active_leagues(last_week.date))
+        self.assertNotIn(self.league, bowling_models.BowlerSeries.active_leagues(
+            self.league.start_date - datetime.timedelta(days=1)))
+        self.assertNotIn(self.league, bowling_models.BowlerSeries.active_leagues(
+            last_week.date + datetime.timedelta(days=1)))
+
+    def test_leaderboard(self):
+        bowling_models.BowlerSeries.update_for_match(self.match)
+        today = self.league.start_date
+
+        entries = bowling_models.BowlerSeries.leaderboard('series', limit=3, today=today)
+        self.assertEqual([entry['rank'] for entry in entries], [1, 2, 3])
+        self.assertEqual([entry['score'] for entry in entries],
+                         list(bowling_models.BowlerSeries.objects.order_by('-series').values_list(
+                             'series', flat=True)[:3]))
+
+        self.assertEqual(bowling_models.BowlerSeries.leaderboard('game', gender=bowling_models.MALE, today=today), [])
+        self.assertEqual(bowling_models.BowlerSeries.leaderboard(
+            'game', today=self.league.start_date - datetime.timedelta(days=1)), [])
+
+    def test_prune(self):
+        rows = bowling_models.BowlerSeries.update_for_match(self.match)
+        last_week = self.league.weeks.order_by('-week_number')[0]
+
+        self.assertEqual(bowling_models.BowlerSeries.prune(last_week.date), 0)
+        self.assertEqual(self.league.bowler_series.count(), len(rows))
+
+        self.assertEqual(bowling_models.BowlerSeries.prune(last_week.date + datetime.timedelta(days=1)), len(rows))
+        self.assertFalse(self.league.bowler_series.exists())
+
+    def test_prune_command(self):
+        bowling_models.BowlerSeries.update_for_match(self.match)
+        output = StringIO()
+
+        call_command('prune_leaderboards', stdout=output)
+
+        self.assertIn('bowler series removed', output.getvalue())
+        self.assertFalse(self.league.bowler_series.exists())
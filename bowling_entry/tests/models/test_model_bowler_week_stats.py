@@ -0,0 +1,81 @@
+from bowling_entry.tests.testcases import SharedDataTestCase
+from bowling_entry import models as bowling_models
+from bowling_entry.serializers import common
+
+
+class BowlerWeekStatsTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.league = bowling_models.League.objects.get(pk=3)
+        self.match = bowling_models.Match.objects.get(pk=3)
+        self.bowler = self.match.team1.bowlers.all()[0]
+
+    def create_match(self, week_number):
+        week = self.league.weeks.get(week_number=week_number)
+
+        serializer = common.Match(data={'team1_definition': self.match.team1.definition.pk,
+                                        'team2_definition': self.match.team2.definition.pk,
+                                        'lanes': '1,2'},
+                                  context={'week': week, 'league': self.league})
+        self.assertTrue(serializer.is_valid(raise_exception=True))
+        return serializer.save()
+
+    def test_week_stats(self):
+        bowling_models.BowlerWeekStats.update_for_match(self.match)
+
+        totals = list(self.bowler.games.values_list('total', flat=True))
+        stats = self.bowler.definition.week_stats.get(week_number=1)
+
+        self.assertEqual(stats.games_bowled, len(totals))
+        self.assertEqual(stats.pins, sum(totals))
+        self.assertEqual(stats.season_pins, sum(totals))
+        self.assertEqual(stats.average, sum(totals) // len(totals))
+        self.assertEqual(stats.handicap, self.league.calculate_handicap(stats))
+
+    def test_handicap_carried_into_next_week(self):
+        bowling_models.BowlerWeekStats.update_for_match(self.match)
+        stats = self.bowler.definition.week_stats.get(week_number=1)
+
+        match = self.create_match(2)
+        bowler = match.team1.bowlers.get(definition=self.bowler.definition)
+
+        self.assertEqual(bowler.average, stats.average)
+        self.assertEqual(bowler.handicap, stats.handicap)
+
+    def test_changes_carried_forward(self):
+        bowling_models.BowlerWeekStats.update_for_match(self.match)
+
+        match = self.create_match(2)
+        bowler = match.team1.bowlers.get(definition=self.bowler.definition)
+        bowler.games.update(total=200)
+        bowling_models.BowlerWeekStats.update_for_match(match)
+
+        # Rewrite the first week, the second week must follow without reading its games again.
+        self.bowler.games.update(total=100)
+
+        with self.assertNumQueries(5):
+            bowling_models.BowlerWeekStats.update_for_match(self.match, league=self.league)
+
+        stats = self.bowler.definition.week_stats.get(week_number=2)
+        self.assertEqual(stats.pins, 600)
+        self.assertEqual(stats.season_games, 6)
+        self.assertEqual(stats.season_pins, 900)
+        self.assertEqual(stats.average, 150)
+        self.assertEqual(stats.handicap, self.league.calculate_handicap(stats))
+
+    def test_latest_for_weeks(self):
+        bowling_models.BowlerWeekStats.update_for_match(self.match)
+
+        match = self.create_match(2)
+        match.team1.bowlers.get(definition=self.bowler.definition).games.update(total=200)
+        bowling_models.BowlerWeekStats.update_for_match(match)
+
+        definition = self.bowler.definition_id
+        with self.assertNumQueries(1):
+            latest = bowling_models.BowlerWeekStats.latest_for_weeks([definition], [3, 1, 2])
+
+        self.assertEqual(sorted(latest.keys()), [1, 2, 3])
+        self.assertNotIn(definition, latest[1])
+        self.assertEqual(latest[2][definition].week_number, 1)
+        self.assertEqual(latest[3][definition].week_number, 2)
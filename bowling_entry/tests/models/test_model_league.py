@@ -88,4 +88,37 @@ class LeagueCreationTest(TestCase):
         bowler.average = 220
         handicap = league.calculate_handicap(bowler)
 
-        self.assertEqual(handicap, 0)
\ No newline at end of file
+        self.assertEqual(handicap, 0)
+
+    def test_league_update_start_date(self):
+        user = auth_models.User.objects.create_user(username='example', password='example', email='example@example.com')
+        league = bowling_models.League.objects.create(secretary=user, name='Bowling League')
+
+        # Move the season a few days later, all of the weeks should follow.
+        league.start_date += datetime.timedelta(days=3)
+        league.save()
+
+        self.assertEqual(len(league.weeks.all()), league.number_of_weeks)
+
+        week_number = 1
+        date = league.start_date
+        delta = datetime.timedelta(days=7)
+        for week in league.weeks.all():
+            self.assertEqual(week.week_number, week_number)
+            self.assertEqual(week.date, date)
+            week_number += 1
+            date += delta
+
+    def test_league_update_weeks_query_count(self):
+        user = auth_models.User.objects.create_user(username='example', password='example', email='example@example.com')
+        short_league = bowling_models.League(secretary=user, name='Short League', number_of_weeks=5)
+        long_league = bowling_models.League(secretary=user, name='Long League', number_of_weeks=36)
+
+        # Creating the season costs the same no matter how many weeks are scheduled.
+        with self.assertNumQueries(3):
+            short_league.save()
+
+        with self.assertNumQueries(3):
+            long_league.save()
+
+        self.assertEqual(len(long_league.weeks.all()), 36)
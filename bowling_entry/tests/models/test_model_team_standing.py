@@ -0,0 +1,74 @@
+from bowling_entry.tests.testcases import SharedDataTestCase
+from bowling_entry import models as bowling_models
+from bowling_entry.serializers import scoresheet
+
+
+class TeamStandingTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.league = bowling_models.League.objects.get(pk=3)
+        self.match = bowling_models.Match.objects.get(pk=3)
+
+    def set_game_totals(self, team, game_number, total):
+        for bowler in team.bowlers.all():
+            bowler.games.filter(game_number=game_number).update(total=total)
+
+    def test_points_awarded(self):
+        for bowler in self.match.team1.bowlers.all() | self.match.team2.bowlers.all():
+            bowler.handicap = 0
+            bowler.save()
+
+        self.set_game_totals(self.match.team1, 1, 150)
+        self.set_game_totals(self.match.team2, 1, 100)
+        self.set_game_totals(self.match.team1, 2, 100)
+        self.set_game_totals(self.match.team2, 2, 150)
+        self.set_game_totals(self.match.team1, 3, 120)
+        self.set_game_totals(self.match.team2, 3, 120)
+
+        team1, team2 = bowling_models.TeamStanding.update_for_match(self.match)
+
+        # One win and one tie each, the series is tied as well.
+        self.assertEqual(team1.team, self.match.team1.definition)
+        self.assertEqual(team1.points_won, self.league.points_per_game * 1.5 + self.league.points_for_totals / 2.0)
+        self.assertEqual(team1.points_lost, team2.points_won)
+        self.assertEqual(team1.games_bowled, self.league.number_of_games)
+        self.assertEqual(team1.scratch_pins, 370 * len(self.match.team1.bowlers.all()))
+        self.assertEqual(team1.week_number, self.match.week.week_number)
+
+    def test_games_not_bowled(self):
+        self.set_game_totals(self.match.team2, 3, 0)
+
+        team1, team2 = bowling_models.TeamStanding.update_for_match(self.match)
+
+        self.assertEqual(team1.games_bowled, self.league.number_of_games - 1)
+        self.assertEqual(team1.points_won + team2.points_won, self.league.points_per_game * 2)
+
+    def test_updated_by_score_sheet(self):
+        bowling_models.TeamStanding.update_for_match(self.match)
+        self.set_game_totals(self.match.team2, 1, 0)
+
+        data = {
+            'team2': {
+                'bowlers': [
+                    {
+                        'id': self.match.team2.bowlers.all()[0].pk,
+                        'games': [
+                            {
+                                'game_number': 1,
+                                'total': 300
+                            }
+                        ]
+                    }
+                ]
+            }
+        }
+
+        serializer = scoresheet.ScoreSheet(self.match, data=data, partial=True, )
+        self.assertTrue(serializer.is_valid(raise_exception=True))
+        serializer.save()
+
+        standing = bowling_models.TeamStanding.objects.get(match=self.match, team=self.match.team2.definition)
+        self.assertEqual(standing.scratch_pins,
+                         sum(bowling_models.Game.objects.filter(bowler__team=self.match.team2).values_list('total',
+                                                                                                          flat=True)))
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.utils.six import StringIO
+from bowling_entry import models as bowling_models
+from bowling_entry import roster
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+ROSTER_CSV = u"""name,gender,average,team
+Alice,F,150,Test Team
+Bob,male,,test team
+Carol,,170,New Team
+Dan,M,120,
+Émile,M,140,New Team
+"""
+
+ROSTER_JSON = u"""{"name": "Alice", "gender": "F", "average": 150, "team": "Test Team"}
+
+{"name": "Bob", "team": "Other Team"}
+{"name": "Carol", "average": "170"}
+"""
+
+
+class RosterImportTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.league = bowling_models.League.objects.get(pk=10)
+        self.version = self.league.version
+
+    def test_csv(self):
+        with self.assertNumQueries(7):
+            summary = roster.import_roster(self.league, ROSTER_CSV.splitlines(True))
+
+        self.assertEqual(summary, {'teams': 1, 'bowlers': 4, 'substitutes': 1})
+
+        team = self.league.teams.get(name='Test Team')
+        self.assertEqual(sorted(bowler.name for bowler in team.bowlers.all()), ['Alice', 'Bob'])
+
+        new_team = self.league.teams.get(name='New Team')
+        self.assertEqual(sorted(bowler.name for bowler in new_team.bowlers.all()), ['Carol', u'Émile'])
+
+        dan = self.league.bowlers.get(name='Dan')
+        self.assertIsNone(dan.team)
+        self.assertEqual(dan.gender, bowling_models.MALE)
+        self.assertEqual(dan.average, 120)
+
+        bob = team.bowlers.get(name='Bob')
+        self.assertEqual(bob.gender, bowling_models.MALE)
+        self.assertIsNone(bob.average)
+
+        self.assertGreater(bowling_models.League.objects.get(pk=self.league.pk).version, self.version)
+
+    def test_json_batches(self):
+        summary = roster.import_roster(self.league, ROSTER_JSON.encode('utf-8').splitlines(True),
+                                       roster_format=roster.JSON, batch_size=1)
+
+        self.assertEqual(summary, {'teams': 1, 'bowlers': 2, 'substitutes': 1})
+        self.assertEqual(self.league.teams.get(name='Other Team').bowlers.get().name, 'Bob')
+        self.assertEqual(self.league.bowlers.get(name='Carol').average, 170)
+
+    def test_invalid_row(self):
+        lines = (ROSTER_CSV + u'Eve,X,100,New Team\n').splitlines(True)
+
+        with self.assertRaises(roster.RosterError) as context:
+            roster.import_roster(self.league, lines, batch_size=2)
+
+        self.assertEqual(context.exception.line_number, 7)
+        self.assertFalse(self.league.teams.filter(name='New Team').exists())
+        self.assertFalse(self.league.bowlers.filter(name='Alice').exists())
+
+    def test_missing_name(self):
+        with self.assertRaises(roster.RosterError):
+            roster.import_roster(self.league, [u'{"team": "Test Team"}'], roster_format=roster.JSON)
+
+        with self.assertRaises(roster.RosterError):
+            roster.import_roster(self.league, [u'name,average\n', u'Alice,ten\n'])
+
+    def test_upload(self):
+        upload = SimpleUploadedFile('roster.csv', ROSTER_CSV.encode('utf-8'), content_type='text/csv')
+
+        response = self.client.post(self.league.get_absolute_roster_url(), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'teams': 1, 'bowlers': 4, 'substitutes': 1})
+
+    def test_upload_invalid(self):
+        upload = SimpleUploadedFile('roster.txt', b'not json\n')
+
+        response = self.client.post(self.league.get_absolute_roster_url(), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        os.write(handle, ROSTER_CSV.encode('utf-8'))
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        output = StringIO()
+        call_command('import_roster', str(self.league.pk), path, stdout=output)
+
+        self.assertIn('1 teams, 4 bowlers and 1 substitutes imported', output.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('import_roster', '999', path, stdout=output)
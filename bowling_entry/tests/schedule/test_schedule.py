@@ -0,0 +1,147 @@
+import itertools
+from collections import Counter
+
+from django.core.management import CommandError, call_command
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.utils.six import StringIO
+from bowling_entry import models as bowling_models
+from bowling_entry import schedule, synthetic
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class RoundRobinTest(TestCase):
+
+    def test_every_pair_meets_once(self):
+        teams = list(range(8))
+        weeks = schedule.round_robin(teams, 7)
+
+        pairs = Counter(frozenset(pair) for week in weeks for pair in week)
+        self.assertEqual(set(pairs), set(frozenset(pair) for pair in itertools.combinations(teams, 2)))
+        self.assertEqual(set(pairs.values()), {1})
+
+        for week in weeks:
+            self.assertEqual(sorted(team for pair in week for team in pair), teams)
+
+    def test_second_cycle_swaps_teams(self):
+        weeks = schedule.round_robin(range(6), 10)
+
+        self.assertEqual(weeks[5], [(team2, team1) for team1, team2 in weeks[0]])
+
+        first = Counter(team1 for week in weeks for team1, team2 in week)
+        self.assertEqual(set(first.values()), {5})
+
+    def test_odd_number_of_teams(self):
+        weeks = schedule.round_robin(range(5), 5)
+
+        for week in weeks:
+            self.assertEqual(len(week), 2)
+
+        byes = [set(range(5)) - set(team for pair in week for team in pair) for week in weeks]
+        self.assertEqual(sorted(bye.pop() for bye in byes), list(range(5)))
+
+    def test_not_enough_teams(self):
+        with self.assertRaises(schedule.ScheduleError):
+            schedule.round_robin([1], 4)
+
+    def test_lane_rotation(self):
+        lanes = [schedule.lane_pairs(week_index, 4, first_lane=3) for week_index in range(4)]
+
+        self.assertEqual(lanes[0], ['3,4', '5,6', '7,8', '9,10'])
+        self.assertEqual(lanes[1], ['5,6', '7,8', '9,10', '3,4'])
+
+        for match_index in range(4):
+            self.assertEqual(len(set(week[match_index] for week in lanes)), 4)
+
+
+class ScheduleSeasonTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_league(self, number_of_teams, number_of_weeks):
+        league = bowling_models.League.objects.create(secretary=self.user, name='Schedule League',
+                                                      number_of_weeks=number_of_weeks, players_per_team=4)
+        bowling_models.TeamDefinition.objects.bulk_create([
+            bowling_models.TeamDefinition(league=league, name='Team %s' % index) for index in range(number_of_teams)
+        ])
+        return league
+
+    def test_full_season(self):
+        league = self.create_league(16, 32)
+
+        matches = schedule.schedule_season(league)
+
+        self.assertEqual(len(matches), 8 * 32)
+        self.assertEqual(bowling_models.Match.objects.filter(week__league=league).count(), 8 * 32)
+        self.assertEqual(bowling_models.TeamInstanceBowler.objects.filter(team__week__league=league).count(),
+                         16 * 32 * league.players_per_team)
+        self.assertEqual(bowling_models.Game.objects.filter(bowler__team__week__league=league).count(),
+                         16 * 32 * league.players_per_team * league.number_of_games)
+
+        for week in league.weeks.all():
+            week_matches = week.matches.select_related('team1', 'team2')
+            self.assertEqual(len(week_matches), 8)
+
+            teams = [team.definition_id for match in week_matches for team in (match.team1, match.team2)]
+            self.assertEqual(len(set(teams)), 16)
+
+    def test_existing_matches(self):
+        league = bowling_models.League.objects.get(pk=3)
+
+        with self.assertRaises(schedule.ScheduleError):
+            schedule.schedule_season(league)
+
+        matches = schedule.schedule_season(league, replace=True)
+
+        self.assertEqual(len(matches), 6 * league.number_of_weeks)
+        self.assertEqual(bowling_models.Match.objects.filter(week__league=league).count(), len(matches))
+
+    def test_replace_scored_season(self):
+        league = synthetic.generate_league(self.user, number_of_teams=4, number_of_weeks=4, number_of_games=2,
+                                           players_per_team=3, scored_weeks=2, seed=7)
+        self.assertTrue(league.bowler_stats.exists())
+
+        schedule.schedule_season(league, replace=True)
+
+        self.assertFalse(league.bowler_stats.exists())
+        self.assertFalse(league.bowler_series.exists())
+
+        bowlers = bowling_models.TeamInstanceBowler.objects.filter(team__week__league=league,
+                                                                   type=bowling_models.REGULAR)
+        self.assertTrue(bowlers.exists())
+        for bowler in bowlers.select_related('definition'):
+            self.assertEqual(bowler.average, bowler.definition.average)
+            self.assertEqual(bowler.handicap, league.calculate_handicap(bowler.definition))
+
+    def test_schedule_endpoint(self):
+        league = bowling_models.League.objects.get(pk=10)
+
+        response = self.client.post(league.get_absolute_schedule_url(), {'first_lane': 5}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'weeks': 10, 'matches': 10})
+        self.assertEqual(league.weeks.get(week_number=1).matches.get().lanes, '5,6')
+
+        response = self.client.post(league.get_absolute_schedule_url(), {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_schedule_endpoint_missing_league(self):
+        response = self.client.post(reverse('bowling_entry_league_schedule', args=[999]), {}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_schedule_command(self):
+        league = bowling_models.League.objects.get(pk=10)
+        output = StringIO()
+
+        call_command('schedule_season', str(league.pk), first_lane=3, stdout=output)
+
+        self.assertIn('10 matches scheduled', output.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('schedule_season', str(league.pk), stdout=output)
@@ -0,0 +1,104 @@
+from django.core.management import call_command
+from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.utils.six import StringIO
+from bowling_entry import models as bowling_models
+from bowling_entry import packing
+from bowling_entry import scoring
+
+
+def frame(frame_number, *throws, **kwargs):
+    """
+    Build an unsaved frame from throw values, missing throws are left empty.
+    """
+    result = bowling_models.Frame(frame_number=frame_number)
+    for (type_field, value_field), value in zip(packing.THROW_FIELDS, throws):
+        setattr(result, value_field, value)
+    for type_field, throw_type in kwargs.items():
+        setattr(result, type_field, throw_type)
+    return result
+
+
+class PackingTest(TestCase):
+
+    def unpack(self, packed):
+        return packing.unpack_frames(bowling_models.Game(packed_frames=packed))
+
+    def test_round_trip(self):
+        frames = [frame(1, 10), frame(2, 7, 2, throw1_type=bowling_models.SPLIT),
+                  frame(3, 0, 4, throw1_type=bowling_models.FOUL), frame(10, 10, 10, 9)]
+
+        unpacked = self.unpack(packing.pack_frames(frames))
+
+        self.assertEqual([result.frame_number for result in unpacked], [1, 2, 3, 10])
+        self.assertEqual(unpacked[0].throw_list(), [10])
+        self.assertEqual(unpacked[1].throw1_type, bowling_models.SPLIT)
+        self.assertEqual(unpacked[1].throw_list(), [7, 2])
+        self.assertEqual(unpacked[2].throw1_type, bowling_models.FOUL)
+        self.assertEqual(unpacked[2].throw1_value, 0)
+        self.assertEqual(unpacked[3].throw_list(), [10, 10, 9])
+
+    def test_round_trip_foul_only(self):
+        unpacked = self.unpack(packing.pack_frames([frame(4, throw1_type=bowling_models.FOUL)]))
+
+        self.assertEqual([result.frame_number for result in unpacked], [4])
+        self.assertEqual(unpacked[0].throw1_type, bowling_models.FOUL)
+        self.assertIsNone(unpacked[0].throw1_value)
+
+    def test_size(self):
+        self.assertEqual(len(packing.pack_frames([frame(number, 5, 5) for number in range(1, 11)])), 21)
+        self.assertEqual(self.unpack(packing.pack_frames([])), [])
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            packing.pack_frames([frame(1, 11)])
+
+        with self.assertRaises(ValueError):
+            packing.pack_frames([frame(11, 1)])
+
+    def test_scoring(self):
+        perfect = packing.pack_frames([frame(number, 10) for number in range(1, 10)] + [frame(10, 10, 10, 10)])
+        fouled = packing.pack_frames([frame(1, 8, 2, throw1_type=bowling_models.FOUL)])
+
+        game_ids, throws = scoring.packed_throws_array([(1, perfect), (2, fouled)])
+
+        self.assertEqual(game_ids, [1, 2])
+        self.assertEqual(scoring.game_totals(throws).tolist(), [300, 2])
+
+
+class PackFramesTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    @classmethod
+    def setUpTestData(cls):
+        game = bowling_models.Game.objects.filter(bowler__team__match__week__league=3)[0]
+        bowling_models.Frame.objects.bulk_create([
+            bowling_models.Frame(game=game, frame_number=frame_number, throw1_value=5, throw2_value=5,
+                                 throw3_value=5)
+            for frame_number in range(1, 11)
+        ])
+
+    def setUp(self):
+        self.league = bowling_models.League.objects.get(pk=3)
+        self.game = bowling_models.Game.objects.filter(bowler__team__match__week__league=self.league)[0]
+
+    def test_pack_frames(self):
+        output = StringIO()
+
+        call_command('pack_frames', str(self.league.pk), batch_size=1, stdout=output)
+
+        self.assertIn('1 games packed', output.getvalue())
+
+        game = bowling_models.Game.objects.get(pk=self.game.pk)
+        self.assertEqual(game.frames.count(), 0)
+        self.assertEqual(len(game.get_frames()), 10)
+        self.assertEqual(scoring.score_games(bowling_models.Game.objects.all()), {self.game.pk: 150})
+
+    def test_pack_frames_invalid(self):
+        bowling_models.Frame.objects.filter(game=self.game, frame_number=1).update(throw1_value=12)
+        output = StringIO()
+
+        call_command('pack_frames', stdout=output)
+
+        self.assertIn('Game %s' % self.game.pk, output.getvalue())
+        self.assertEqual(bowling_models.Game.objects.get(pk=self.game.pk).frames.count(), 10)
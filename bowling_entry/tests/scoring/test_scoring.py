@@ -0,0 +1,102 @@
+from django.core.management import call_command
+from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.utils.six import StringIO
+from bowling_entry import models as bowling_models
+from bowling_entry import scoring
+
+
+def frame_row(game_id, frame_number, *throws):
+    """
+    Build a frame row from throw values, missing throws are left empty.
+    """
+    throws = list(throws) + [None] * (3 - len(throws))
+    return (game_id, frame_number,
+            bowling_models.THROW, throws[0], bowling_models.THROW, throws[1], bowling_models.THROW, throws[2])
+
+
+def game_rows(game_id, frames):
+    return [frame_row(game_id, frame_number, *throws) for frame_number, throws in enumerate(frames, 1)]
+
+
+class ScoringTest(TestCase):
+
+    def score(self, *games):
+        rows = []
+        for game_id, frames in enumerate(games):
+            rows.extend(game_rows(game_id, frames))
+
+        game_ids, throws = scoring.throws_array(rows)
+        return scoring.game_totals(throws).tolist()
+
+    def test_perfect_game(self):
+        self.assertEqual(self.score([(10,)] * 9 + [(10, 10, 10)]), [300])
+
+    def test_open_frames(self):
+        self.assertEqual(self.score([(9, 0)] * 10, [(0, 0)] * 10), [90, 0])
+
+    def test_spares(self):
+        self.assertEqual(self.score([(5, 5)] * 9 + [(5, 5, 5)]), [150])
+
+    def test_tenth_frame(self):
+        self.assertEqual(self.score([(0, 0)] * 9 + [(10, 7, 2)]), [19])
+        self.assertEqual(self.score([(0, 0)] * 9 + [(7, 3, 10)]), [20])
+        self.assertEqual(self.score([(0, 0)] * 9 + [(7, 2)]), [9])
+
+    def test_strike_followed_by_spare(self):
+        self.assertEqual(self.score([(10,), (6, 4), (3, 0)] + [(0, 0)] * 7), [20 + 13 + 3])
+
+    def test_incomplete_game(self):
+        self.assertEqual(self.score([(10,), (10,), (4, 2)]), [24 + 16 + 6])
+
+    def test_running_totals(self):
+        game_ids, throws = scoring.throws_array(game_rows(1, [(10,)] * 9 + [(10, 10, 10)]))
+        self.assertEqual(scoring.running_totals(throws)[0].tolist(), [30, 60, 90, 120, 150, 180, 210, 240, 270, 300])
+
+    def test_foul(self):
+        rows = game_rows(1, [(0, 0)] * 10)
+        rows[0] = (1, 1, bowling_models.FOUL, 8, bowling_models.THROW, 2, bowling_models.THROW, None)
+
+        game_ids, throws = scoring.throws_array(rows)
+        self.assertEqual(scoring.game_totals(throws).tolist(), [2])
+
+
+class RescoreGamesTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    @classmethod
+    def setUpTestData(cls):
+        game = bowling_models.Game.objects.filter(bowler__team__match__week__league=3)[0]
+        bowling_models.Frame.objects.bulk_create([
+            bowling_models.Frame(game=game, frame_number=frame_number, throw1_value=5, throw2_value=5,
+                                 throw3_value=5)
+            for frame_number in range(1, 11)
+        ])
+
+    def setUp(self):
+        self.league = bowling_models.League.objects.get(pk=3)
+        self.game = bowling_models.Game.objects.filter(bowler__team__match__week__league=self.league)[0]
+        self.other_game = bowling_models.Game.objects.exclude(pk=self.game.pk)[0]
+
+    def test_score_games(self):
+        totals = scoring.score_games(bowling_models.Game.objects.all())
+        self.assertEqual(totals, {self.game.pk: 150})
+
+    def test_rescore_games(self):
+        other_total = self.other_game.total
+        output = StringIO()
+
+        call_command('rescore_games', str(self.league.pk), stdout=output)
+
+        self.assertIn('Game %s' % self.game.pk, output.getvalue())
+        self.assertEqual(bowling_models.Game.objects.get(pk=self.game.pk).total, 150)
+        self.assertEqual(bowling_models.Game.objects.get(pk=self.other_game.pk).total, other_total)
+
+    def test_rescore_games_dry_run(self):
+        total = self.game.total
+        output = StringIO()
+
+        call_command('rescore_games', dry_run=True, stdout=output)
+
+        self.assertIn('Game %s' % self.game.pk, output.getvalue())
+        self.assertEqual(bowling_models.Game.objects.get(pk=self.game.pk).total, total)
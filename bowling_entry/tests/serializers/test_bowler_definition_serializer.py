@@ -1,9 +1,9 @@
-from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
 from bowling_entry import models as bowling_models
 from bowling_entry.serializers import common
 
 
-class MatchCreationTest(TestCase):
+class MatchCreationTest(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def test_move_bowler_to_substitute(self):
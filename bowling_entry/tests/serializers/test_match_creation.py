@@ -1,9 +1,10 @@
-from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
 from bowling_entry import models as bowling_models
 from bowling_entry.serializers import common
+from rest_framework import serializers
 
 
-class MatchCreationTest(TestCase):
+class MatchCreationTest(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def test_create_match(self):
@@ -150,4 +151,119 @@ class MatchCreationTest(TestCase):
 
         serializer = common.Match(data=match_create_definition, context=context)
 
-        self.assertFalse(serializer.is_valid())
\ No newline at end of file
+        self.assertFalse(serializer.is_valid())
+
+    def test_conflict_check_single_query(self):
+        league = bowling_models.League.objects.get(pk=3)
+        week = league.weeks.get(week_number=1)
+        teams = list(league.teams.all())
+
+        context = {'week': week, 'league': league}
+
+        # Two lookups of the team definitions and one existence query, however many matches the week has.
+        serializer = common.Match(data={'team1_definition': teams[-2].pk, 'team2_definition': teams[-1].pk,
+                                        'lanes': '11,12'}, context=context)
+        with self.assertNumQueries(3):
+            self.assertTrue(serializer.is_valid())
+
+        serializer = common.Match(data={'team1_definition': teams[0].pk, 'team2_definition': teams[-1].pk,
+                                        'lanes': '11,12'}, context=context)
+        self.assertFalse(serializer.is_valid())
+
+    def test_concurrent_conflict(self):
+        league = bowling_models.League.objects.get(pk=3)
+        week = league.weeks.get(week_number=2)
+        teams = list(league.teams.all())
+
+        match_create_definition = {
+            'team1_definition': teams[0].pk,
+            'team2_definition': teams[1].pk,
+            'lanes': '1,2'
+        }
+
+        serializer = common.Match(data=match_create_definition, context={'week': week, 'league': league})
+        self.assertTrue(serializer.is_valid())
+
+        # A match for the same team is created by another terminal after this one was validated.
+        other_match = bowling_models.Match.objects.create(week=week, lanes='3,4')
+        bowling_models.TeamInstance.objects.create(definition=teams[0], match=other_match, week=week)
+
+        with self.assertRaises(serializers.ValidationError):
+            serializer.save()
+
+        self.assertEqual(week.matches.count(), 1)
+
+    def test_concurrent_lane_conflict(self):
+        league = bowling_models.League.objects.get(pk=3)
+        week = league.weeks.get(week_number=2)
+        teams = list(league.teams.all())
+
+        serializer = common.Match(data=[
+            {'team1_definition': teams[0].pk, 'team2_definition': teams[1].pk, 'lanes': '1,2'},
+            {'team1_definition': teams[2].pk, 'team2_definition': teams[3].pk, 'lanes': '3,4'},
+        ], many=True, context={'week': week, 'league': league})
+        self.assertTrue(serializer.is_valid())
+
+        # A match on the same lanes is created by another terminal after these were validated.
+        other_match = bowling_models.Match.objects.create(week=week, lanes='1,2')
+
+        with self.assertRaises(serializers.ValidationError):
+            serializer.save()
+
+        self.assertEqual(list(week.matches.all()), [other_match])
+        self.assertIsNone(bowling_models.Match.objects.get(pk=other_match.pk).team1)
+
+    def test_create_match_fills_vacant_bowlers(self):
+        league = bowling_models.League.objects.get(pk=3)
+        week = league.weeks.get(week_number=2)
+
+        team1 = league.teams.all()[0]
+        team2 = league.teams.all()[1]
+
+        # Leave team 1 short handed.
+        for bowler in team1.bowlers.all()[3:]:
+            bowler.delete()
+
+        match_create_definition = {
+            'team1_definition': team1.pk,
+            'team2_definition': team2.pk,
+            'lanes': '1,2'
+        }
+
+        context = {
+            'week': week,
+            'league': league
+        }
+
+        serializer = common.Match(data=match_create_definition, context=context)
+
+        self.assertTrue(serializer.is_valid(raise_exception=True))
+
+        with self.assertNumQueries(16):
+            match = serializer.save()
+
+        vacant = match.team1.bowlers.filter(type=bowling_models.VACANT)
+        self.assertEqual(len(vacant), league.players_per_team - len(team1.bowlers.all()))
+
+        for bowler in vacant:
+            self.assertIsNone(bowler.definition)
+            self.assertEqual(len(bowler.games.all()), league.number_of_games)
+
+        self.assertEqual([bowler.order for bowler in match.team1.bowlers.all()], list(range(league.players_per_team)))
+
+    def test_create_games_with_frames(self):
+        league = bowling_models.League.objects.get(pk=3)
+        week = league.weeks.get(week_number=2)
+
+        match = bowling_models.Match.objects.create(week=week, lanes='1,2')
+        match.team1 = bowling_models.TeamInstance.objects.create(definition=league.teams.all()[0], match=match,
+                                                                 week=week)
+        match.team2 = bowling_models.TeamInstance.objects.create(definition=league.teams.all()[1], match=match,
+                                                                 week=week)
+        match.save()
+
+        match.create_games(create_frames=True)
+
+        for bowler in match.team1.bowlers.all():
+            for game in bowler.games.all():
+                self.assertEqual(len(game.frames.all()), bowling_models.FRAMES_PER_GAME)
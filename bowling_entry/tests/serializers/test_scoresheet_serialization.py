@@ -1,35 +1,43 @@
-from django.test import TestCase
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from bowling_entry import models as bowling_models
 from bowling_entry.serializers import common
 from bowling_entry.serializers import scoresheet
 
 
-class ScoreSheetSerializerTestCase(TestCase):
+class ScoreSheetSerializerTestCase(SharedDataTestCase):
     fixtures = ['polarbowler']
 
-    def setUp(self):
-        self.league = bowling_models.League.objects.get(pk=3)
-        self.week = self.league.weeks.get(week_number=2)
-
-        self.team1 = self.league.teams.all()[0]
-        self.team2 = self.league.teams.all()[1]
+    @classmethod
+    def setUpTestData(cls):
+        league = bowling_models.League.objects.get(pk=3)
+        week = league.weeks.get(week_number=2)
 
         match_create_definition = {
-            'team1_definition': self.team1.pk,
-            'team2_definition': self.team2.pk,
+            'team1_definition': league.teams.all()[0].pk,
+            'team2_definition': league.teams.all()[1].pk,
             'lanes': '1,2'
         }
 
         context = {
-            'week': self.week,
-            'league': self.league
+            'week': week,
+            'league': league
         }
 
         serializer = common.Match(data=match_create_definition, context=context)
+        serializer.is_valid(raise_exception=True)
 
-        self.assertTrue(serializer.is_valid(raise_exception=True))
+        cls.match_pk = serializer.save().pk
+
+    def setUp(self):
+        self.league = bowling_models.League.objects.get(pk=3)
+        self.week = self.league.weeks.get(week_number=2)
 
-        self.match = serializer.save()
+        self.team1 = self.league.teams.all()[0]
+        self.team2 = self.league.teams.all()[1]
+
+        self.match = bowling_models.Match.objects.get(pk=self.match_pk)
 
     def test_serialization(self):
         serializer = scoresheet.ScoreSheet(self.match)
@@ -152,3 +160,162 @@ class ScoreSheetSerializerTestCase(TestCase):
         self.assertEqual(frame.get('throw2_type'), 'T')
         self.assertEqual(frame.get('throw2_value'), 5)
 
+    def build_update(self, bowlers, game_numbers, frame_numbers):
+        """
+        Build a partial update that knocks down five pins on each throw of the frames requested.
+        """
+        return {
+            'team1': {
+                'bowlers': [
+                    {
+                        'id': bowler.pk,
+                        'games': [
+                            {
+                                'game_number': game_number,
+                                'total': 150,
+                                'frames': [
+                                    {
+                                        'frame_number': frame_number,
+                                        'throw1_type': 'T',
+                                        'throw1_value': 5,
+                                        'throw2_type': 'T',
+                                        'throw2_value': 5
+                                    } for frame_number in frame_numbers
+                                ]
+                            } for game_number in game_numbers
+                        ]
+                    } for bowler in bowlers
+                ]
+            }
+        }
+
+    def save_update(self, data):
+        serializer = scoresheet.ScoreSheet(self.match, data=data, partial=True, )
+        self.assertTrue(serializer.is_valid(raise_exception=True))
+
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+
+        return len(queries)
+
+    def test_update_query_count_independent_of_frames(self):
+        bowlers = list(self.match.team1.bowlers.all())
+        game_numbers = range(1, self.league.number_of_games + 1)
+
+        # The first update of the match also creates the statistics of its bowlers.
+        self.save_update(self.build_update(bowlers[2:3], [1], [1]))
+
+        single_frame = self.save_update(self.build_update(bowlers[:1], [1], [1]))
+        full_games = self.save_update(self.build_update(bowlers[1:2], game_numbers, range(1, 11)))
+
+        self.assertEqual(single_frame, full_games)
+
+        for bowler in bowlers[1:2]:
+            for game in bowler.games.all():
+                self.assertEqual(game.total, 150)
+                self.assertEqual(len(game.get_frames()), 10)
+
+    def test_update_existing_frames(self):
+        bowler = self.match.team1.bowlers.all()[0]
+
+        self.save_update(self.build_update([bowler], [1], [1, 2]))
+
+        data = self.build_update([bowler], [1], [2])
+        data['team1']['bowlers'][0]['games'][0]['frames'][0]['throw1_value'] = 10
+        del data['team1']['bowlers'][0]['games'][0]['frames'][0]['throw2_value']
+        self.save_update(data)
+
+        frames = bowler.games.get(game_number=1).get_frames()
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].throw1_value, 5)
+        self.assertEqual(frames[1].throw1_value, 10)
+        self.assertEqual(frames[1].throw2_value, 5)
+
+    def test_update_bowler_from_other_team(self):
+        data = self.build_update(self.match.team2.bowlers.all()[:1], [1], [1])
+        data['lanes'] = '5,6'
+
+        serializer = scoresheet.ScoreSheet(self.match, data=data, partial=True, )
+        self.assertFalse(serializer.is_valid())
+
+        # Nothing of the rejected update is written, the lanes included.
+        self.assertEqual(bowling_models.Match.objects.get(pk=self.match.pk).lanes, '1,2')
+
+    def test_update_lanes(self):
+        version = self.match.version
+        bowler = self.match.team1.bowlers.all()[0]
+        data = self.build_update([bowler], [1], [1])
+        data['lanes'] = '5,6'
+
+        self.save_update(data)
+
+        match = bowling_models.Match.objects.get(pk=self.match.pk)
+        self.assertEqual(match.lanes, '5,6')
+        self.assertGreater(match.version, version)
+
+    def test_update_bowler_definition(self):
+        bowler = self.match.team1.bowlers.all()[0]
+        substitute = self.league.substitutes()[0]
+
+        data = {
+            'team1': {
+                'bowlers': [
+                    {
+                        'id': bowler.pk,
+                        'definition': substitute.pk,
+                        'type': bowling_models.SUBSTITUTE
+                    }
+                ]
+            }
+        }
+
+        self.save_update(data)
+
+        bowler = self.match.team1.bowlers.get(pk=bowler.pk)
+        self.assertEqual(bowler.definition, substitute)
+        self.assertEqual(bowler.type, bowling_models.SUBSTITUTE)
+        self.assertEqual(bowler.average, substitute.average)
+        self.assertEqual(bowler.handicap, self.league.calculate_handicap(substitute))
+
+
+@override_settings(BOWLING_ENTRY_PACKED_FRAMES=True)
+class PackedScoreSheetSerializerTestCase(ScoreSheetSerializerTestCase):
+
+    def test_update_packs_frames(self):
+        bowler = self.match.team1.bowlers.all()[0]
+
+        self.save_update(self.build_update([bowler], [1], range(1, 11)))
+
+        game = bowler.games.get(game_number=1)
+        self.assertEqual(game.frames.count(), 0)
+        self.assertEqual(len(bytearray(game.packed_frames)), 21)
+
+        data = scoresheet.ScoreSheet(self.match).data
+        frames = data['team1']['bowlers'][0]['games'][0]['frames']
+        self.assertEqual([frame['frame_number'] for frame in frames], list(range(1, 11)))
+        self.assertEqual(frames[9]['throw2_value'], 5)
+
+    def test_update_converts_frame_rows(self):
+        bowler = self.match.team1.bowlers.all()[0]
+        game = bowler.games.get(game_number=1)
+        bowling_models.Frame.objects.create(game=game, frame_number=1, throw1_type=bowling_models.FOUL,
+                                            throw1_value=3, throw2_value=7)
+
+        self.save_update(self.build_update([bowler], [1], [2]))
+
+        game = bowling_models.Game.objects.get(pk=game.pk)
+        self.assertEqual(game.frames.count(), 0)
+
+        frames = game.get_frames()
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].throw1_type, bowling_models.FOUL)
+        self.assertEqual(frames[0].throw2_value, 7)
+        self.assertEqual(frames[1].throw1_value, 5)
+
+    def test_update_invalid_throw(self):
+        bowler = self.match.team1.bowlers.all()[0]
+        data = self.build_update([bowler], [1], [1])
+        data['team1']['bowlers'][0]['games'][0]['frames'][0]['throw1_value'] = 11
+
+        serializer = scoresheet.ScoreSheet(self.match, data=data, partial=True, )
+        self.assertFalse(serializer.is_valid())
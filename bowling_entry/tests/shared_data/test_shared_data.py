@@ -0,0 +1,39 @@
+import datetime
+
+from django.conf import settings
+from django.test.utils import override_settings
+from bowling_entry.tests.testcases import SharedDataTestCase
+from bowling_entry import models as bowling_models
+
+
+@override_settings(BOWLING_ENTRY_SHARED_DATA_MARKER='class')
+class SharedDataTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.marker = getattr(settings, 'BOWLING_ENTRY_SHARED_DATA_MARKER', None)
+        cls.league = bowling_models.League.objects.create(secretary_id=1, name='Shared League',
+                                                          start_date=datetime.date(2015, 1, 1))
+        cls.leagues = bowling_models.League.objects.count()
+
+    def write(self):
+        # Every test sees the shared rows only, whatever the test that ran before it wrote.
+        self.assertEqual(bowling_models.League.objects.count(), self.leagues)
+        self.assertTrue(bowling_models.League.objects.filter(pk=self.league.pk).exists())
+
+        bowling_models.League.objects.create(secretary_id=1, name='Test League', start_date=datetime.date(2015, 1, 1))
+        bowling_models.League.objects.filter(pk=self.league.pk).update(name='Renamed League')
+
+    def test_first_write(self):
+        self.write()
+
+    def test_second_write(self):
+        self.write()
+
+    def test_fixtures_loaded_once(self):
+        self.assertTrue(bowling_models.League.objects.filter(pk=3).exists())
+        self.assertEqual(bowling_models.League.objects.get(pk=self.league.pk).name, 'Shared League')
+
+    def test_class_settings(self):
+        self.assertEqual(self.marker, 'class')
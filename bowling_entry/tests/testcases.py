@@ -0,0 +1,80 @@
+"""
+Test case that sets up the data of its tests once for the whole class.
+
+TestCase runs every test inside a transaction that is rolled back afterwards, and loads the fixtures of the class again
+inside each of those transactions.  SharedDataTestCase loads the fixtures and runs setUpTestData once, inside a
+transaction that is opened when the class is set up and rolled back when it is torn down, and runs each test in a
+savepoint of that transaction.  The rows that a test writes are rolled back with its savepoint, the shared rows are
+left in place for the next test.
+
+Objects that setUpTestData keeps on the class are shared by every test, a test that changes one of them must read it
+again from the database first.  The settings overridden on the class are in effect while the shared data is set up.
+"""
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import TestCase
+from django.test.testcases import connections_support_transactions, disable_transaction_methods
+from django.test.utils import override_settings
+
+
+class SharedDataTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create the data shared by all of the tests of the class, runs once after the fixtures were loaded.
+        """
+
+    @classmethod
+    def shared_databases(cls, include_mirrors=True):
+        if getattr(cls, 'multi_db', False):
+            return [alias for alias in connections
+                    if include_mirrors or not connections[alias].settings_dict['TEST']['MIRROR']]
+        return [DEFAULT_DB_ALIAS]
+
+    @classmethod
+    def setUpClass(cls):
+        super(SharedDataTestCase, cls).setUpClass()
+        if not connections_support_transactions():
+            return
+
+        cls.class_atomics = {}
+        for db_name in cls.shared_databases():
+            cls.class_atomics[db_name] = transaction.atomic(using=db_name)
+            cls.class_atomics[db_name].__enter__()
+
+        try:
+            with override_settings(**(cls._overridden_settings or {})):
+                for db_name in cls.shared_databases(include_mirrors=False):
+                    if cls.fixtures:
+                        call_command('loaddata', *cls.fixtures, verbosity=0, commit=False, database=db_name,
+                                     skip_checks=True)
+                cls.setUpTestData()
+        except Exception:
+            cls.rollback_class_atomics()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        if connections_support_transactions():
+            cls.rollback_class_atomics()
+        super(SharedDataTestCase, cls).tearDownClass()
+
+    @classmethod
+    def rollback_class_atomics(cls):
+        for db_name in reversed(cls.shared_databases()):
+            connections[db_name].needs_rollback = True
+            cls.class_atomics[db_name].__exit__(None, None, None)
+
+    def _fixture_setup(self):
+        if not connections_support_transactions():
+            super(SharedDataTestCase, self)._fixture_setup()
+            self.setUpTestData()
+            return
+
+        # The fixtures were loaded for the class, only the savepoint of the test is opened.
+        self.atomics = {}
+        for db_name in self._databases_names():
+            self.atomics[db_name] = transaction.atomic(using=db_name)
+            self.atomics[db_name].__enter__()
+        disable_transaction_methods()
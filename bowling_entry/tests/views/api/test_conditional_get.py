@@ -0,0 +1,136 @@
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import CaptureQueriesContext
+from bowling_entry import models as bowling_models
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class ConditionalGet(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.league = bowling_models.League.objects.get(pk=3)
+        self.week = self.league.weeks.get(week_number=1)
+        self.match = bowling_models.Match.objects.get(pk=3)
+
+    def get_not_modified(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, format='json', **headers)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+        return response
+
+    def assert_conditional(self, url):
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        not_modified = self.get_not_modified(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        self.get_not_modified(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        return response['ETag']
+
+    def test_league_detail(self):
+        url = self.league.get_absolute_url()
+        etag = self.assert_conditional(url)
+
+        team = self.league.teams.all()[0]
+        team.name = 'Renamed'
+        team.save()
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_week_list(self):
+        url = self.league.get_absolute_weeks_url()
+        etag = self.assert_conditional(url)
+
+        self.match.lanes = '7,8'
+        self.match.save()
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_match_list(self):
+        url = self.week.get_absolute_matches_url()
+        etag = self.assert_conditional(url)
+
+        self.match.lanes = '7,8'
+        self.match.save()
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('7,8', [match['lanes'] for match in response.data['results']])
+
+    def test_match_list_lanes_updated(self):
+        url = self.week.get_absolute_matches_url()
+        etag = self.assert_conditional(url)
+
+        response = self.client.patch(self.match.get_absolute_url(), {'lanes': '11,12'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('11,12', [match['lanes'] for match in response.data['results']])
+
+    def test_match_detail(self):
+        url = self.match.get_absolute_url()
+        etag = self.assert_conditional(url)
+
+        bowler = self.match.team1.bowlers.all()[0]
+        data = {'team1': {'bowlers': [{'id': bowler.pk, 'games': [{'game_number': 1, 'total': 299}]}]}}
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['team1']['bowlers'][0]['games'][0]['total'], 299)
+
+    def test_match_detail_rows_deleted(self):
+        url = self.match.get_absolute_url()
+        bowler = self.match.team1.bowlers.all()[0]
+        game = bowler.games.get(game_number=1)
+        frame = bowling_models.Frame.objects.create(game=game, frame_number=1, throw1_value=7)
+
+        for instance in (frame, game, bowler):
+            etag = self.assert_conditional(url)
+            instance.delete()
+
+            response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+    def test_match_detail_bowler_renamed(self):
+        url = self.match.get_absolute_url()
+        etag = self.assert_conditional(url)
+
+        definition = self.match.team1.bowlers.all()[0].definition
+        definition.name = 'Renamed'
+        definition.save()
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_match_unchanged(self):
+        url = self.match.get_absolute_url()
+        etag = self.assert_conditional(url)
+
+        other_match = bowling_models.Match.objects.get(pk=4)
+        other_match.lanes = '7,8'
+        other_match.save()
+
+        self.get_not_modified(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_missing_match(self):
+        url = self.match.get_absolute_url().replace('/%s/' % self.match.pk, '/999/')
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+
+from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
+from bowling_entry import events as bowling_events
+from bowling_entry import models as bowling_models
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+def parse_message(message):
+    if isinstance(message, bytes):
+        message = message.decode('utf-8')
+
+    fields = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+    return int(fields['id']), fields['event'], json.loads(fields['data'])
+
+
+class BrokerTest(TestCase):
+
+    def test_history(self):
+        broker = bowling_events.Broker(history_size=3)
+        for index in range(5):
+            broker.publish(['a', 'b'], 'scores', {'index': index})
+        broker.publish(['b'], 'scores', {'index': 5})
+
+        stream = broker.listen('a', last_id=0, keepalive=0.01, timeout=1)
+        self.assertEqual([parse_message(next(stream))[2]['index'] for index in range(3)], [2, 3, 4])
+        self.assertEqual(next(stream), bowling_events.KEEPALIVE)
+
+        stream = broker.listen('b', last_id=4, keepalive=0.01, timeout=1)
+        self.assertEqual([parse_message(next(stream))[2]['index'] for index in range(2)], [4, 5])
+
+    def test_reconnect(self):
+        broker = bowling_events.Broker(topic_ttl=60)
+        broker.publish(['a'], 'scores', {'index': 0})
+
+        stream = broker.listen('a', last_id=0, keepalive=0.01, timeout=1)
+        last_id = parse_message(next(stream))[0]
+        stream.close()
+
+        # Published while the only viewer of the topic was reconnecting.
+        broker.publish(['a'], 'scores', {'index': 1})
+
+        stream = broker.listen('a', last_id=last_id, keepalive=0.01, timeout=1)
+        self.assertEqual(parse_message(next(stream))[2]['index'], 1)
+
+    def test_topics_expire(self):
+        broker = bowling_events.Broker(topic_ttl=0.01)
+        broker.publish(['a', 'b'], 'scores', {})
+
+        stream = broker.listen('b', last_id=0, keepalive=0.01, timeout=1)
+        next(stream)
+
+        time.sleep(0.02)
+        broker.publish(['c'], 'scores', {})
+        self.assertEqual(set(broker.topics), {'b', 'c'})
+
+        stream.close()
+        time.sleep(0.02)
+        broker.publish(['d'], 'scores', {})
+        self.assertEqual(set(broker.topics), {'d'})
+        self.assertFalse(broker.subscribers)
+
+    def test_wakes_up_listeners(self):
+        broker = bowling_events.Broker()
+        received = []
+
+        def listen():
+            stream = broker.listen('a', last_id=0, keepalive=5, timeout=5)
+            received.append(next(stream))
+
+        listeners = [threading.Thread(target=listen) for index in range(3)]
+        for listener in listeners:
+            listener.start()
+
+        broker.publish(['b'], 'scores', {})
+        message_id = broker.publish(['a'], 'scores', {'total': 201})
+
+        for listener in listeners:
+            listener.join(5)
+
+        self.assertEqual(len(received), 3)
+        self.assertEqual(set(received), {bowling_events.format_message(message_id, 'scores', '{"total": 201}')})
+
+
+class ScoreEvents(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.match = bowling_models.Match.objects.get(pk=3)
+        self.bowler = self.match.team1.bowlers.all()[0]
+
+    def update_scores(self):
+        last_id = bowling_events.broker.last_id
+
+        data = {'team1': {'bowlers': [{'id': self.bowler.pk, 'games': [
+            {'game_number': 1, 'total': 201, 'frames': [{'frame_number': 1, 'throw1_value': 7, 'throw2_value': 2}]}
+        ]}]}}
+        response = self.client.patch(self.match.get_absolute_url(), data, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        return last_id
+
+    def read_event(self, url, last_id):
+        response = self.client.get(url, HTTP_LAST_EVENT_ID=str(last_id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        message = next(response.streaming_content)
+        response.close()
+        return parse_message(message)
+
+    def test_match_stream(self):
+        last_id = self.update_scores()
+
+        message_id, event, data = self.read_event(self.match.get_absolute_events_url(), last_id)
+
+        self.assertEqual(message_id, last_id + 1)
+        self.assertEqual(event, bowling_events.SCORES_EVENT)
+        self.assertEqual(data['match'], self.match.pk)
+        self.assertEqual([(game['bowler'], game['game_number'], game['total']) for game in data['games']],
+                         [(self.bowler.pk, 1, 201)])
+        self.assertEqual([(frame['frame_number'], frame['throw1_value'], frame['throw2_value'])
+                          for frame in data['frames']], [(1, 7, 2)])
+
+    def test_week_stream(self):
+        last_id = self.update_scores()
+
+        message_id, event, data = self.read_event(self.match.week.get_absolute_events_url(), last_id)
+
+        self.assertEqual(message_id, last_id + 1)
+        self.assertEqual(data['week'], self.match.week_id)
+
+    def test_missing_match(self):
+        url = self.match.get_absolute_events_url().replace('/%s/events/' % self.match.pk, '/999/events/')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,92 @@
+import csv
+import json
+
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import six
+from bowling_entry import export as bowling_export
+from bowling_entry import models as bowling_models
+from bowling_entry import packing
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class LeagueExport(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    @classmethod
+    def setUpTestData(cls):
+        game = bowling_models.Game.objects.filter(bowler__team__week__league=3, bowler__definition__isnull=False)
+        bowling_models.Frame.objects.bulk_create([
+            bowling_models.Frame(game=game.order_by('pk')[0], frame_number=frame_number,
+                                 throw1_value=frame_number % 10, throw2_value=0)
+            for frame_number in range(1, 6)
+        ])
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.league = bowling_models.League.objects.get(pk=3)
+        self.games = bowling_models.Game.objects.filter(bowler__team__week__league=self.league)
+
+        self.game = self.games.filter(bowler__definition__isnull=False).order_by('pk')[0]
+
+    def expected_rows(self):
+        frames = bowling_models.Frame.objects.filter(game__in=self.games).count()
+        empty_games = self.games.exclude(pk__in=bowling_models.Frame.objects.values('game')).count()
+        return frames + empty_games
+
+    def read_content(self, response):
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content)
+        return content if six.PY2 else content.decode('utf-8')
+
+    def test_csv(self):
+        response = self.client.get(self.league.get_absolute_export_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+
+        rows = list(csv.reader(self.read_content(response).splitlines()))
+        self.assertEqual(tuple(rows[0]), bowling_export.COLUMNS)
+        self.assertEqual(len(rows) - 1, self.expected_rows())
+
+        frame_rows = [dict(zip(rows[0], row)) for row in rows[1:] if row[rows[0].index('frame_number')]]
+        self.assertEqual([row['frame_number'] for row in frame_rows], ['1', '2', '3', '4', '5'])
+        self.assertEqual(frame_rows[0]['bowler'], self.game.bowler.definition.name)
+        self.assertEqual(frame_rows[0]['game_number'], str(self.game.game_number))
+        self.assertEqual(frame_rows[0]['throw1_value'], '1')
+        self.assertEqual(frame_rows[0]['throw3_value'], '')
+
+    def test_ndjson_packed_games(self):
+        game = self.game
+        frames = list(game.frames.all())
+        game.packed_frames = packing.pack_frames(frames)
+        game.save()
+        game.frames.all().delete()
+
+        response = self.client.get(self.league.get_absolute_export_url('ndjson'))
+        self.assertEqual(response.status_code, 200)
+
+        rows = [json.loads(line) for line in self.read_content(response).splitlines()]
+        self.assertEqual(len(rows), self.expected_rows() + len(frames) - 1)
+
+        packed_rows = [row for row in rows if row['match'] == game.bowler.team.match_id and
+                       row['bowler'] == game.bowler.definition.name and row['game_number'] == game.game_number]
+        self.assertEqual([row['frame_number'] for row in packed_rows], [frame.frame_number for frame in frames])
+        self.assertEqual([row['throw1_value'] for row in packed_rows], [frame.throw1_value for frame in frames])
+
+    def test_chunked_queries(self):
+        chunks = (self.games.count() + 9) // 10
+
+        with CaptureQueriesContext(connection) as queries:
+            rows = sum(len(chunk) for chunk in bowling_export.export_rows(self.league, chunk_size=10))
+
+        self.assertEqual(rows, self.expected_rows())
+        self.assertLessEqual(len(queries), chunks * 2 + 1)
+
+    def test_missing_league(self):
+        response = self.client.get(self.league.get_absolute_export_url().replace('/3/', '/999/'))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,105 @@
+from django.core.urlresolvers import reverse
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from bowling_entry import models as bowling_models
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class FrameDetail(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.match = bowling_models.Match.objects.get(pk=3)
+        self.bowler = self.match.team1.bowlers.all()[0]
+        self.game = self.bowler.games.get(game_number=1)
+
+    def frame_url(self, frame_number, bowler_pk=None, match=None):
+        match = match or self.match
+        return reverse('bowling_entry_league_week_match_frame_detail',
+                       args=[match.week.league_id, match.week.week_number, match.pk, bowler_pk or self.bowler.pk,
+                             self.game.game_number, frame_number])
+
+    def test_create_frame(self):
+        url = self.frame_url(1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'throw1_value': 7, 'throw2_value': 2}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['frame_number'], 1)
+        self.assertEqual(response.data['throw1_value'], 7)
+
+        frame = self.game.frames.get(frame_number=1)
+        self.assertEqual((frame.throw1_value, frame.throw2_value), (7, 2))
+
+        # The game and its frames are read with one query each, the rest are the writes.
+        selects = [query for query in queries if 'SELECT' in query['sql']]
+        self.assertEqual(len([query for query in selects if 'FROM "bowling_entry_week"' in query['sql']]), 0)
+        self.assertEqual(len([query for query in selects if 'FROM "bowling_entry_league"' in query['sql']]), 0)
+        self.assertEqual(len([query for query in selects if 'FROM "bowling_entry_frame"' in query['sql']]), 1)
+
+        response = self.client.get(self.frame_url(1), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['throw2_value'], 2)
+
+    def test_update_total(self):
+        bowling_models.Frame.objects.create(game=self.game, frame_number=1, throw1_value=10)
+
+        response = self.client.patch(self.frame_url(2), {'throw1_value': 3, 'throw2_value': 4, 'update_total': True},
+                                     format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 24)
+        self.assertEqual(bowling_models.Game.objects.get(pk=self.game.pk).total, 24)
+
+        response = self.client.patch(self.frame_url(2), {'throw2_value': 5}, format='json')
+        self.assertEqual(response.data['total'], 24)
+        self.assertEqual(self.game.frames.get(frame_number=2).throw2_value, 5)
+
+    def test_unchanged_total(self):
+        bowling_models.Frame.objects.create(game=self.game, frame_number=1, throw1_value=10)
+        bowling_models.Frame.objects.create(game=self.game, frame_number=2, throw1_value=3, throw2_value=4)
+        bowling_models.Game.objects.filter(pk=self.game.pk).update(total=24)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.frame_url(2), {'throw1_value': 3, 'throw2_value': 4,
+                                                             'update_total': True}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 24)
+
+        # Only the frame is written, the standings, statistics and series of the match are left alone.
+        for table in ('game', 'teamstanding', 'bowlerweekstats', 'bowlerseries'):
+            self.assertFalse([query for query in queries if '"bowling_entry_%s"' % table in query['sql'] and
+                              'SELECT' not in query['sql']], table)
+
+    @override_settings(BOWLING_ENTRY_PACKED_FRAMES=True)
+    def test_packed_game(self):
+        response = self.client.put(self.frame_url(10), {'throw1_value': 10, 'throw2_value': 10, 'throw3_value': 10,
+                                                        'update_total': True}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 30)
+
+        game = bowling_models.Game.objects.get(pk=self.game.pk)
+        self.assertIsNotNone(game.packed_frames)
+        self.assertEqual([frame.throw_list() for frame in game.get_frames()], [[10, 10, 10]])
+
+    def test_invalid_throw(self):
+        response = self.client.patch(self.frame_url(1), {'throw1_value': 11}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_missing(self):
+        response = self.client.patch(self.frame_url(11), {'throw1_value': 1}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+        other_bowler = bowling_models.Match.objects.get(pk=4).team1.bowlers.all()[0]
+        response = self.client.patch(self.frame_url(1, bowler_pk=other_bowler.pk), {'throw1_value': 1},
+                                     format='json')
+        self.assertEqual(response.status_code, 404)
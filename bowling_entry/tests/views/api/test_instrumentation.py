@@ -0,0 +1,113 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import override_settings
+from bowling_entry import instrumentation
+from bowling_entry import models as bowling_models
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+MIDDLEWARE_CLASSES = tuple(settings.MIDDLEWARE_CLASSES) + ('bowling_entry.instrumentation.InstrumentationMiddleware', )
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def parse_header(value):
+    """
+    Dictionary of metric name to the parameters of the metric.
+    """
+    metrics = {}
+    for metric in value.split(', '):
+        parts = metric.split(';')
+        metrics[parts[0]] = dict(part.split('=', 1) for part in parts[1:])
+    return metrics
+
+
+@override_settings(MIDDLEWARE_CLASSES=MIDDLEWARE_CLASSES, BOWLING_ENTRY_INSTRUMENTATION=True)
+class InstrumentationTest(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.match = bowling_models.Match.objects.get(pk=3)
+        self.bowler = self.match.team1.bowlers.all()[0]
+
+        self.handler = RecordingHandler()
+        instrumentation.logger.addHandler(self.handler)
+        instrumentation.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        instrumentation.logger.removeHandler(self.handler)
+        instrumentation.logger.setLevel(logging.NOTSET)
+        instrumentation.set_enabled(None)
+
+    def test_server_timing(self):
+        response = self.client.get(self.match.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+
+        header = response[instrumentation.HEADER]
+        self.assertEqual([metric.split(';')[0] for metric in header.split(', ')],
+                         ['sql', 'serialization', 'render', 'total'])
+        self.assertGreater(float(parse_header(header)['total']['dur']), 0)
+
+    def test_validation(self):
+        data = {'team1': {'bowlers': [{'id': self.bowler.pk, 'games': [{'game_number': 1, 'total': 150}]}]}}
+        response = self.client.patch(self.match.get_absolute_url(), data, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertIn('validation', parse_header(response[instrumentation.HEADER]))
+
+    def test_log_line(self):
+        response = self.client.get(self.match.get_absolute_url())
+
+        self.assertEqual(len(self.handler.records), 1)
+        timings = self.handler.records[0].timings
+        self.assertEqual(timings['path'], self.match.get_absolute_url())
+        self.assertEqual(timings['status'], 200)
+        self.assertEqual('%s queries' % timings['queries'],
+                         parse_header(response[instrumentation.HEADER])['sql']['desc'].strip('"'))
+
+    def test_query_count(self):
+        url = self.match.get_absolute_url()
+
+        with self.assertNumQueries(8):
+            response = self.client.get(url)
+
+        self.assertEqual(parse_header(response[instrumentation.HEADER])['sql']['desc'], '"8 queries"')
+
+    def test_debug_cursor_restored(self):
+        use_debug_cursor = connection.use_debug_cursor
+        logged = len(connection.queries)
+
+        self.client.get(self.match.get_absolute_url())
+
+        self.assertEqual(connection.use_debug_cursor, use_debug_cursor)
+        self.assertEqual(len(connection.queries), logged)
+
+    def test_switched_off(self):
+        instrumentation.set_enabled(False)
+
+        response = self.client.get(self.match.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(instrumentation.HEADER, response)
+        self.assertEqual(self.handler.records, [])
+
+    @override_settings(BOWLING_ENTRY_INSTRUMENTATION=False)
+    def test_switched_on(self):
+        self.assertNotIn(instrumentation.HEADER, self.client.get(self.match.get_absolute_url()))
+
+        instrumentation.set_enabled(True)
+        self.assertIn(instrumentation.HEADER, self.client.get(self.match.get_absolute_url()))
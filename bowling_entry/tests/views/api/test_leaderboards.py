@@ -0,0 +1,84 @@
+import datetime
+
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.db.models import Max
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.utils.six import StringIO
+from bowling_entry import models as bowling_models
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class Leaderboards(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    @classmethod
+    def setUpTestData(cls):
+        # The season of the league is under way.
+        today = datetime.date.today()
+        bowling_models.League.objects.filter(pk=3).update(start_date=today)
+        bowling_models.Week.objects.filter(league=3).update(date=today)
+
+        call_command('update_standings', stdout=StringIO())
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.games = bowling_models.Game.objects.filter(bowler__team__match__week__league=3,
+                                                        bowler__definition__isnull=False)
+
+    def get(self, category, **params):
+        return self.client.get(reverse('bowling_entry_leaderboard', args=[category]), params, format='json')
+
+    def test_high_games(self):
+        with self.assertNumQueries(1):
+            response = self.get('game')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 10)
+
+        scores = [entry['score'] for entry in response.data]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(scores[0], self.games.aggregate(Max('total'))['total__max'])
+        self.assertEqual(response.data[0]['league_name'], 'Polar Bowler Ball League')
+
+    def test_high_series_handicap(self):
+        response = self.get('series', handicap='true', limit=3)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry['rank'] for entry in response.data], [1, 2, 3])
+
+        best = response.data[0]
+        series = self.games.filter(bowler__definition=best['id']).values_list('total', flat=True)
+        self.assertEqual(best['score'], sum(series) + best['handicap'] * len(series))
+
+    def test_gender(self):
+        definition = bowling_models.BowlerDefinition.objects.get(pk=self.games[0].bowler.definition_id)
+        definition.gender = bowling_models.FEMALE
+        definition.save()
+
+        response = self.get('game', gender=bowling_models.FEMALE)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry['id'] for entry in response.data], [definition.pk])
+
+    def test_inactive_leagues(self):
+        bowling_models.League.objects.filter(pk=3).update(start_date=datetime.date.today() + datetime.timedelta(1))
+
+        response = self.get('game')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [])
+
+    def test_invalid_options(self):
+        self.assertEqual(self.get('game', limit=0).status_code, 400)
+        self.assertEqual(self.get('game', gender='X').status_code, 400)
+        self.assertEqual(self.client.get('/api/leaderboards/average/').status_code, 404)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(user=auth_models.User.objects.create(username='secretary'))
+
+        self.assertEqual(self.get('game').status_code, 403)
@@ -1,12 +1,12 @@
 __author__ = 'rerobins'
-from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
 from django.core.urlresolvers import reverse
 from django.contrib.auth import models as auth_models
 from bowling_entry import models as bowling_models
 from rest_framework.test import APIClient
 
 
-class LeagueListCreate(TestCase):
+class LeagueListCreate(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def setUp(self):
@@ -1,11 +1,14 @@
 __author__ = 'rerobins'
-from django.test import TestCase
+from django.core.cache import caches
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from bowling_entry import models as bowling_models
 from rest_framework.test import APIClient
 from django.contrib.auth import models as auth_models
 
 
-class SubstituteListCreate(TestCase):
+class SubstituteListCreate(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def setUp(self):
@@ -73,4 +76,68 @@ class SubstituteListCreate(TestCase):
             week.matches.get(pk=match_pk)
 
         with self.assertRaises(bowling_models.Match.DoesNotExist):
-            bowling_models.Match.objects.get(pk=match_pk)
\ No newline at end of file
+            bowling_models.Match.objects.get(pk=match_pk)
+
+
+@override_settings(BOWLING_ENTRY_SCORESHEET_CACHE='scoresheets',
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                           'scoresheets': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'bowling-entry-tests'}})
+class MatchDetailCache(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.match = bowling_models.Match.objects.get(pk=3)
+        self.url = self.match.get_absolute_url()
+
+    def tearDown(self):
+        caches['scoresheets'].clear()
+
+    def get_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_cached_read(self):
+        first_response, first_queries = self.get_queries()
+        second_response, second_queries = self.get_queries()
+
+        self.assertLess(second_queries, first_queries)
+        self.assertEqual(first_response.data, second_response.data)
+
+    def test_invalidated_by_score_sheet_update(self):
+        self.get_queries()
+
+        bowler = self.match.team1.bowlers.all()[0]
+        data = {'team1': {'bowlers': [{'id': bowler.pk, 'games': [{'game_number': 1, 'total': 299}]}]}}
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response, queries = self.get_queries()
+        self.assertEqual(response.data['team1']['bowlers'][0]['games'][0]['total'], 299)
+
+    def test_invalidated_by_game_save(self):
+        self.get_queries()
+
+        game = self.match.team2.bowlers.all()[0].games.get(game_number=2)
+        game.total = 298
+        game.save()
+
+        response, queries = self.get_queries()
+        self.assertEqual(response.data['team2']['bowlers'][0]['games'][1]['total'], 298)
+
+    def test_other_match_not_invalidated(self):
+        self.get_queries()
+
+        other_match = bowling_models.Match.objects.get(pk=4)
+        other_match.lanes = '1,2'
+        other_match.save()
+
+        response, queries = self.get_queries()
+        self.assertEqual(queries, 1)
@@ -1,11 +1,13 @@
 __author__ = 'rerobins'
-from django.test import TestCase
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import CaptureQueriesContext
 from bowling_entry import models as bowling_models
 from rest_framework.test import APIClient
 from django.contrib.auth import models as auth_models
 
 
-class MatchListCreate(TestCase):
+class MatchListCreate(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def setUp(self):
@@ -26,7 +28,7 @@ class MatchListCreate(TestCase):
 
         response_data = response.data
 
-        self.assertEqual(len(response_data), 4)
+        self.assertEqual(len(response_data['results']), 4)
 
     def test_create_match(self):
 
@@ -55,3 +57,72 @@ class MatchListCreate(TestCase):
         match = week.matches.get(pk=id)
 
         self.assertIsNotNone(match)
+
+    def build_week(self, teams, first_lane=1):
+        return [{
+            'team1_definition': teams[index].pk,
+            'team2_definition': teams[index + 1].pk,
+            'lanes': '%s,%s' % (first_lane + index, first_lane + index + 1)
+        } for index in range(0, len(teams), 2)]
+
+    def post_week(self, week, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(week.get_absolute_matches_url(), data, format='json')
+        return response, len(queries)
+
+    def test_create_week_of_matches(self):
+        league = bowling_models.League.objects.get(pk=3)
+        teams = list(league.teams.all())
+
+        response, small_queries = self.post_week(league.weeks.get(week_number=2), self.build_week(teams[:4]))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 2)
+
+        week = league.weeks.get(week_number=3)
+        response, queries = self.post_week(week, self.build_week(teams))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(queries, small_queries)
+
+        self.assertEqual(week.matches.count(), 6)
+        for match_data in response.data:
+            match = week.matches.get(pk=match_data['id'])
+            self.assertEqual(match.team1.definition.pk, match_data['team1']['id'])
+            self.assertEqual(match.team1.week, week)
+            self.assertEqual(match.team2.bowlers.count(), league.players_per_team)
+            self.assertEqual(match.team2.bowlers.all()[0].games.count(), league.number_of_games)
+
+    def test_create_week_team_twice(self):
+        league = bowling_models.League.objects.get(pk=3)
+        teams = list(league.teams.all())
+        week = league.weeks.get(week_number=2)
+
+        response, queries = self.post_week(week, self.build_week([teams[0], teams[1], teams[2], teams[0]]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(week.matches.count(), 0)
+
+    def test_create_week_lane_twice(self):
+        league = bowling_models.League.objects.get(pk=3)
+        teams = list(league.teams.all())
+        week = league.weeks.get(week_number=2)
+
+        data = self.build_week(teams[:4])
+        data[1]['lanes'] = data[0]['lanes']
+
+        response, queries = self.post_week(week, data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(week.matches.count(), 0)
+
+    def test_create_week_conflicts_with_existing(self):
+        league = bowling_models.League.objects.get(pk=3)
+        teams = list(league.teams.all())
+
+        # Every team but the last four already bowls in week one.
+        week = league.weeks.get(week_number=1)
+        response, queries = self.post_week(week, self.build_week(teams[-6:], first_lane=21))
+        self.assertEqual(response.status_code, 400)
+
+        response, queries = self.post_week(week, self.build_week(teams[-4:], first_lane=3))
+        self.assertEqual(response.status_code, 400)
+
+        response, queries = self.post_week(week, self.build_week(teams[-4:], first_lane=21))
+        self.assertEqual(response.status_code, 201)
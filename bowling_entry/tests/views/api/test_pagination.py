@@ -0,0 +1,97 @@
+import datetime
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import CaptureQueriesContext
+from bowling_entry import models as bowling_models
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class KeysetPagination(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    @classmethod
+    def setUpTestData(cls):
+        # Leagues that share start dates and names so that only the primary key tells them apart.
+        start_date = datetime.date(2015, 1, 1)
+        bowling_models.League.objects.bulk_create([
+            bowling_models.League(secretary_id=1, name='League %s' % (index % 3),
+                                  start_date=start_date + datetime.timedelta(days=index % 4))
+            for index in range(25)
+        ])
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.url = reverse('bowling_entry_leagues')
+        self.expected = list(bowling_models.League.objects.order_by('start_date', 'name', 'pk').values_list(
+            'pk', flat=True))
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_walk_forward(self):
+        seen = []
+        query_counts = set()
+
+        response, queries = self.get(self.url, page_size=4)
+        self.assertIsNone(response.data['previous'])
+
+        while True:
+            seen.extend(league['id'] for league in response.data['results'])
+            query_counts.add(queries)
+
+            if response.data['next'] is None:
+                break
+            response, queries = self.get(response.data['next'])
+
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(query_counts, {1})
+
+    def test_walk_backward(self):
+        response, queries = self.get(self.url, page_size=4)
+        response, queries = self.get(response.data['next'])
+        second_page = [league['id'] for league in response.data['results']]
+
+        response, queries = self.get(response.data['next'])
+        response, queries = self.get(response.data['previous'])
+
+        self.assertEqual([league['id'] for league in response.data['results']], second_page)
+
+        response, queries = self.get(response.data['previous'])
+        self.assertEqual([league['id'] for league in response.data['results']], self.expected[:4])
+        self.assertIsNone(response.data['previous'])
+
+    def test_cursor_stable_on_insert(self):
+        response, queries = self.get(self.url, page_size=4)
+        next_url = response.data['next']
+
+        bowling_models.League.objects.create(secretary=self.user, name='AAA', start_date=datetime.date(2000, 1, 1))
+
+        response, queries = self.get(next_url)
+        self.assertEqual([league['id'] for league in response.data['results']], self.expected[4:8])
+
+    def test_page_size_limit(self):
+        response, queries = self.get(self.url, page_size=5000)
+        self.assertEqual(len(response.data['results']), len(self.expected))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not a cursor'}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_week_list_ordering(self):
+        league = bowling_models.League.objects.get(pk=3)
+
+        response, queries = self.get(league.get_absolute_weeks_url(), page_size=5)
+        self.assertEqual([week['week_number'] for week in response.data['results']], [1, 2, 3, 4, 5])
+
+        response, queries = self.get(response.data['next'])
+        self.assertEqual([week['week_number'] for week in response.data['results']], [6, 7, 8, 9, 10])
@@ -0,0 +1,81 @@
+import re
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from bowling_entry import benchmark
+from bowling_entry import synthetic
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+# Leagues that every route is requested against, the number of queries must not change from one to the other.
+SCALES = (
+    ('small', {'number_of_teams': 4, 'number_of_weeks': 4, 'number_of_games': 2, 'players_per_team': 3}),
+    ('large', {'number_of_teams': 8, 'number_of_weeks': 8, 'number_of_games': 3, 'players_per_team': 5}),
+)
+
+# Routes that write their rows in batches, the larger league takes more batches so only the small one is checked.
+BATCHED_ROUTES = ('schedule', )
+
+# Longest part of a statement shown in the failure report, the selected columns are left out.
+STATEMENT_LENGTH = 300
+SELECTED_COLUMNS = re.compile(r'^SELECT .*? FROM ')
+
+
+# The export is read in chunks, a single chunk holds every game of both of the leagues.
+@override_settings(BOWLING_ENTRY_EXPORT_CHUNK_SIZE=10000)
+class QueryBudgetTest(TestCase):
+
+    def setUp(self):
+        # Staff, the leaderboards of the bowling center are only open to its staff.
+        self.user = auth_models.User.objects.create(username='secretary', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def capture(self, route, context):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                response = route.request(self.client, context)
+            transaction.set_rollback(True)
+
+        self.assertLess(response.status_code, 300, route.name)
+        return captured.captured_queries
+
+    def report(self, route, scale, queries, budget):
+        lines = ['%s %s on the %s league took %s queries, the budget is %s' % (route.name, route.budget, scale,
+                                                                                len(queries), budget)]
+        for count, sql in benchmark.duplicated_queries(queries):
+            lines.append('  %s x %s' % (count, SELECTED_COLUMNS.sub('SELECT ... FROM ', sql)[:STATEMENT_LENGTH]))
+        return '\n'.join(lines)
+
+    def test_routes_within_budget(self):
+        failures = []
+
+        for name, options in SCALES:
+            league = synthetic.generate_league(self.user, scored_weeks=2, open_weeks=1, seed=5, name=name,
+                                               **options)
+            context = benchmark.BenchmarkContext(league)
+
+            for route in benchmark.ROUTES:
+                if name != SCALES[0][0] and route.name in BATCHED_ROUTES:
+                    continue
+
+                budget = benchmark.query_budget(route, context)
+                self.assertIsNotNone(budget, '%s %s does not declare a query budget' % (route.name, route.budget))
+
+                queries = self.capture(route, context)
+                if len(queries) > budget:
+                    failures.append(self.report(route, name, queries, budget))
+
+        if failures:
+            self.fail('\n\n'.join(failures))
+
+    def test_duplicated_queries(self):
+        queries = [
+            {'sql': 'QUERY = u\'SELECT "id" FROM "frame" WHERE "game_id" = %s\' - PARAMS = (1,)', 'time': '0.001'},
+            {'sql': 'QUERY = u\'SELECT "id" FROM "frame" WHERE "game_id" = %s\' - PARAMS = (2,)', 'time': '0.001'},
+            {'sql': 'QUERY = u\'SELECT "id" FROM "game" WHERE "id" IN (%s, %s)\' - PARAMS = (1, 2)', 'time': '0.001'},
+        ]
+
+        self.assertEqual(benchmark.duplicated_queries(queries),
+                         [(2, 'SELECT "id" FROM "frame" WHERE "game_id" = %s')])
@@ -1,11 +1,11 @@
 __author__ = 'rerobins'
-from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
 from django.core.urlresolvers import reverse
 from rest_framework.test import APIClient
 from django.contrib.auth import models as auth_models
 
 
-class SubstituteListCreate(TestCase):
+class SubstituteListCreate(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def setUp(self):
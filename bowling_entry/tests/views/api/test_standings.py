@@ -0,0 +1,56 @@
+from django.core.management import call_command
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.utils.six import StringIO
+from bowling_entry import models as bowling_models
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class StandingsList(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('update_standings', stdout=StringIO())
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_league_standings(self):
+        league = bowling_models.League.objects.get(pk=3)
+
+        url = league.get_absolute_standings_url()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, 200)
+
+        response_data = response.data
+        self.assertEqual(len(response_data), 8)
+
+        points = [standing['points_won'] for standing in response_data]
+        self.assertEqual(points, sorted(points, reverse=True))
+
+        # Only the first match of the fixture has been bowled, every one of its points is won by one of the teams.
+        self.assertEqual(sum(standing['points_won'] for standing in response_data),
+                         league.points_per_game * league.number_of_games + league.points_for_totals)
+        self.assertEqual(sum(standing['games_bowled'] for standing in response_data), 2 * league.number_of_games)
+
+    def test_week_standings(self):
+        league = bowling_models.League.objects.get(pk=3)
+        week = league.weeks.get(week_number=1)
+
+        response = self.client.get(week.get_absolute_standings_url(), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 8)
+
+    def test_week_standings_before_first_match(self):
+        league = bowling_models.League.objects.get(pk=10)
+        week = league.weeks.get(week_number=1)
+
+        response = self.client.get(week.get_absolute_standings_url(), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 0)
@@ -1,11 +1,11 @@
 __author__ = 'rerobins'
-from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
 from bowling_entry import models as bowling_models
 from rest_framework.test import APIClient
 from django.contrib.auth import models as auth_models
 
 
-class SubstituteDetail(TestCase):
+class SubstituteDetail(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def setUp(self):
@@ -1,11 +1,11 @@
 __author__ = 'rerobins'
-from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
 from bowling_entry import models as bowling_models
 from rest_framework.test import APIClient
 from django.contrib.auth import models as auth_models
 
 
-class SubstituteListCreate(TestCase):
+class SubstituteListCreate(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def setUp(self):
@@ -25,7 +25,7 @@ class SubstituteListCreate(TestCase):
 
         response_data = response.data
 
-        self.assertEqual(len(response_data), 1)
+        self.assertEqual(len(response_data['results']), 1)
 
     def test_add_new_substitute(self):
 
@@ -1,11 +1,11 @@
 __author__ = 'rerobins'
-from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
 from bowling_entry import models as bowling_models
 from rest_framework.test import APIClient
 from django.contrib.auth import models as auth_models
 
 
-class TeamBowlerDefinitionListCreate(TestCase):
+class TeamBowlerDefinitionListCreate(SharedDataTestCase):
     fixtures = ['polarbowler']
 
     def setUp(self):
@@ -26,7 +26,7 @@ class TeamBowlerDefinitionListCreate(TestCase):
 
         self.assertEqual(response.status_code, 200)
 
-        self.assertEqual(len(response.data), len(team_initial.bowlers.all()))
+        self.assertEqual(len(response.data['results']), len(team_initial.bowlers.all()))
 
     def test_create_bowler(self):
 
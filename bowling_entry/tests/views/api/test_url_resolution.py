@@ -0,0 +1,69 @@
+from django.db import connection
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import CaptureQueriesContext
+from bowling_entry import models as bowling_models
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class UrlResolution(SharedDataTestCase):
+    """
+    The objects named by the URL are looked up together, the league is never loaded on its own.
+    """
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.league = bowling_models.League.objects.get(pk=3)
+
+    def league_lookups(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+
+        self.assertLess(response.status_code, 300)
+        return [query['sql'] for query in queries
+                if 'SELECT' in query['sql'] and 'FROM "bowling_entry_league"' in query['sql']]
+
+    def test_team_detail(self):
+        team = self.league.teams.all()[0]
+
+        self.assertEqual(self.league_lookups('get', team.get_absolute_url()), [])
+        self.assertEqual(self.league_lookups('patch', team.get_absolute_url(), {'name': 'Renamed'}), [])
+
+    def test_bowler_detail(self):
+        bowler = bowling_models.BowlerDefinition.objects.get(pk=40)
+
+        self.assertEqual(self.league_lookups('get', bowler.get_absolute_url()), [])
+        self.assertEqual(self.league_lookups('patch', bowler.get_absolute_url(), {'name': 'Renamed'}), [])
+
+    def test_bowler_detail_team_not_in_league(self):
+        bowler = bowling_models.BowlerDefinition.objects.get(pk=40)
+        other_team = bowling_models.TeamDefinition.objects.exclude(league=self.league)[0]
+
+        url = bowler.get_absolute_url().replace('/teams/%s/' % bowler.team.pk, '/teams/%s/' % other_team.pk)
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_week_detail(self):
+        week = self.league.weeks.get(week_number=1)
+
+        self.assertEqual(self.league_lookups('get', week.get_absolute_url()), [])
+
+    def test_match_detail(self):
+        match = bowling_models.Match.objects.get(pk=3)
+
+        self.assertEqual(self.league_lookups('get', match.get_absolute_url()), [])
+
+        bowler = match.team1.bowlers.all()[0]
+        data = {'team1': {'bowlers': [{'id': bowler.pk, 'games': [{'game_number': 1, 'total': 201}]}]}}
+        self.assertEqual(self.league_lookups('patch', match.get_absolute_url(), data), [])
+
+    def test_match_create(self):
+        week = self.league.weeks.get(week_number=2)
+        teams = self.league.teams.all()
+        data = {'team1_definition': teams[0].pk, 'team2_definition': teams[1].pk, 'lanes': '1,2'}
+
+        self.assertEqual(self.league_lookups('post', week.get_absolute_matches_url(), data), [])
@@ -0,0 +1,179 @@
+import threading
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from bowling_entry.tests.testcases import SharedDataTestCase
+from django.test.utils import override_settings
+from bowling_entry import coalesce
+from bowling_entry import models as bowling_models
+from bowling_entry.batch import ScoreSheetBatch
+from bowling_entry.signals import scores_updated
+from rest_framework.test import APIClient
+from django.contrib.auth import models as auth_models
+
+
+class RecordingCoalescer(coalesce.WriteCoalescer):
+    """
+    Coalescer that records the groups instead of writing them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingCoalescer, self).__init__(*args, **kwargs)
+        self.groups = []
+
+    def commit(self, batches):
+        self.groups.append(list(batches))
+        return dict((batch.match.pk, len(self.groups)) for batch in batches)
+
+
+class QueuedUpdate(object):
+
+    def __init__(self, match):
+        self.match = match
+
+
+class WriteCoalescerTest(TestCase):
+
+    def submit_all(self, coalescer, updates):
+        versions = {}
+
+        def submit(update):
+            versions[update] = coalescer.submit(update)
+
+        threads = [threading.Thread(target=submit, args=(update, )) for update in updates]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        return versions
+
+    def test_max_updates(self):
+        coalescer = RecordingCoalescer(window=5, max_updates=4)
+        updates = [QueuedUpdate(bowling_models.Match(pk=index % 2)) for index in range(8)]
+
+        versions = self.submit_all(coalescer, updates)
+
+        self.assertEqual(sorted(len(group) for group in coalescer.groups), [4, 4])
+        self.assertEqual(sorted(versions.values()), [1, 1, 1, 1, 2, 2, 2, 2])
+
+    def test_window(self):
+        coalescer = RecordingCoalescer(window=0.05, max_updates=100)
+
+        versions = self.submit_all(coalescer, [QueuedUpdate(bowling_models.Match(pk=1)) for index in range(3)])
+
+        self.assertEqual(sum(len(group) for group in coalescer.groups), 3)
+        self.assertEqual(len(versions), 3)
+
+
+class CoalescedWrites(SharedDataTestCase):
+    fixtures = ['polarbowler']
+
+    def setUp(self):
+        self.user = auth_models.User.objects.get(pk=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.match = bowling_models.Match.objects.select_related('week__league').get(pk=3)
+        self.bowler = self.match.team1.bowlers.all()[0]
+        self.game = self.bowler.games.get(game_number=1)
+
+    def load_batch(self):
+        batch = ScoreSheetBatch(self.match, league=self.match.week.league)
+        batch.load([self.bowler.pk], [(self.bowler.pk, self.game.game_number)])
+        return batch
+
+    def update(self, batch, frame_number, **values):
+        game = batch.get_game(batch.bowlers[self.bowler.pk], self.game.game_number)
+        batch.update_frame(batch.get_frame(game, frame_number), values)
+        batch.repack()
+        return game
+
+    def test_merge_frames(self):
+        first = self.load_batch()
+        second = self.load_batch()
+
+        self.update(first, 1, throw1_value=7)
+        self.update(second, 1, throw2_value=2)
+        game = self.update(second, 2, throw1_value=10)
+        second.update_game(game, 29)
+
+        version = bowling_models.Match.objects.get(pk=self.match.pk).version
+        versions = coalesce.commit_batches([first, second])
+
+        self.assertEqual(versions, {self.match.pk: version + 1})
+        self.assertEqual([(frame.frame_number, frame.throw1_value, frame.throw2_value) for frame in
+                          self.game.frames.all()], [(1, 7, 2), (2, 10, None)])
+        self.assertEqual(bowling_models.Game.objects.get(pk=self.game.pk).total, 29)
+
+    def test_merge_game_loaded_later(self):
+        first = ScoreSheetBatch(self.match, league=self.match.week.league)
+        first.load([self.match.team1.bowlers.all()[1].pk])
+        second = self.load_batch()
+
+        second.update_game(second.games_by_pk[self.game.pk], 199)
+        coalesce.commit_batches([first, second])
+
+        self.assertEqual(bowling_models.Game.objects.get(pk=self.game.pk).total, 199)
+
+    def test_scores_updated_only_for_totals(self):
+        sent = []
+
+        def receiver(sender, **kwargs):
+            sent.append(kwargs['matches'])
+
+        scores_updated.connect(receiver)
+        try:
+            batch = self.load_batch()
+            game = self.update(batch, 1, throw1_value=7)
+            batch.update_game(game, game.total)
+
+            version = bowling_models.Match.objects.get(pk=self.match.pk).version
+            coalesce.commit_batches([batch])
+
+            # The match still moves to a new version for the frame alone.
+            self.assertEqual(sent, [])
+            self.assertEqual(bowling_models.Match.objects.get(pk=self.match.pk).version, version + 1)
+
+            batch = self.load_batch()
+            batch.update_game(batch.games_by_pk[self.game.pk], self.game.total + 1)
+            coalesce.commit_batches([batch])
+
+            self.assertEqual(sent, [[self.match]])
+        finally:
+            scores_updated.disconnect(receiver)
+
+    @override_settings(BOWLING_ENTRY_PACKED_FRAMES=True)
+    def test_merge_packed_frames(self):
+        first = self.load_batch()
+        second = self.load_batch()
+
+        self.update(first, 1, throw1_value=7)
+        self.update(second, 1, throw2_value=2)
+        self.update(second, 3, throw1_value=4)
+
+        coalesce.commit_batches([first, second])
+
+        frames = bowling_models.Game.objects.get(pk=self.game.pk).get_frames()
+        self.assertEqual([(frame.frame_number, frame.throw_list()) for frame in frames], [(1, [7, 2]), (3, [4])])
+        self.assertFalse(self.game.frames.exists())
+
+    @override_settings(BOWLING_ENTRY_COALESCE_WINDOW=0.01, BOWLING_ENTRY_COALESCE_MAX_UPDATES=10)
+    def test_version_header(self):
+        url = reverse('bowling_entry_league_week_match_frame_detail',
+                      args=[self.match.week.league_id, self.match.week.week_number, self.match.pk, self.bowler.pk,
+                            self.game.game_number, 1])
+
+        response = self.client.patch(url, {'throw1_value': 9}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response[coalesce.VERSION_HEADER],
+                         str(bowling_models.Match.objects.get(pk=self.match.pk).version))
+        self.assertEqual(self.game.frames.get(frame_number=1).throw1_value, 9)
+
+        data = {'team1': {'bowlers': [{'id': self.bowler.pk, 'games': [{'game_number': 1, 'total': 150}]}]}}
+        response = self.client.patch(self.match.get_absolute_url(), data, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response[coalesce.VERSION_HEADER],
+                         str(bowling_models.Match.objects.get(pk=self.match.pk).version))
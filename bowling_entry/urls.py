@@ -33,6 +33,32 @@ urlpatterns = patterns('',
                        url(r'^api/league/(?P<league_pk>\d+)/weeks/(?P<week_number>\d+)/matches/(?P<pk>\d+)/$',
                            bowling_views.MatchDetail.as_view(),
                            name='bowling_entry_league_week_match_detail'),
+                       url(r'^api/league/(?P<league_pk>\d+)/weeks/(?P<week_number>\d+)/matches/(?P<pk>\d+)/events/$',
+                           bowling_views.MatchEvents.as_view(),
+                           name='bowling_entry_league_week_match_events'),
+                       url(r'^api/league/(?P<league_pk>\d+)/weeks/(?P<week_number>\d+)/matches/(?P<match_pk>\d+)/'
+                           r'bowlers/(?P<bowler_pk>\d+)/games/(?P<game_number>\d+)/frames/(?P<frame_number>\d+)/$',
+                           bowling_views.FrameDetail.as_view(),
+                           name='bowling_entry_league_week_match_frame_detail'),
+                       url(r'^api/league/(?P<league_pk>\d+)/weeks/(?P<week_number>\d+)/events/$',
+                           bowling_views.WeekEvents.as_view(),
+                           name='bowling_entry_league_week_events'),
+
+                       url(r'^api/league/(?P<league_pk>\d+)/weeks/(?P<week_number>\d+)/standings/$',
+                           bowling_views.StandingsList.as_view(),
+                           name='bowling_entry_league_week_standings'),
+                       url(r'^api/league/(?P<league_pk>\d+)/standings/$',
+                           bowling_views.StandingsList.as_view(),
+                           name='bowling_entry_league_standings'),
+                       url(r'^api/league/(?P<league_pk>\d+)/schedule/$',
+                           bowling_views.ScheduleCreate.as_view(),
+                           name='bowling_entry_league_schedule'),
+                       url(r'^api/league/(?P<league_pk>\d+)/roster/$',
+                           bowling_views.RosterImport.as_view(),
+                           name='bowling_entry_league_roster'),
+                       url(r'^api/league/(?P<league_pk>\d+)/export\.(?P<export_format>csv|ndjson)$',
+                           bowling_views.LeagueExport.as_view(),
+                           name='bowling_entry_league_export'),
 
                        url(r'^api/league/(?P<league_pk>\d+)/teams/$',
                            bowling_views.TeamDefinitionListCreate.as_view(),
@@ -46,6 +72,9 @@ urlpatterns = patterns('',
                        url(r'^api/league/(?P<league_pk>\d+)/teams/(?P<team_pk>\d+)/bowlers/(?P<pk>\d+)/$',
                            bowling_views.TeamBowlerDefinitionDetail.as_view(),
                            name='bowling_entry_league_team_bowlers_detail'),
+                       url(r'^api/leaderboards/(?P<category>game|series)/$',
+                           bowling_views.Leaderboard.as_view(),
+                           name='bowling_entry_leaderboard'),
                        url(r'^api/self/$',
                            bowling_views.Self.as_view(),
                            name='bowling_entry_self'),
@@ -1,27 +1,70 @@
+from django import shortcuts
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.http import Http404, StreamingHttpResponse
+from django.utils import six
 from bowling_entry import models as bowling_models
-from rest_framework import generics
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
+from bowling_entry import cache as bowling_cache
+from bowling_entry.batch import ScoreSheetBatch
+from bowling_entry.coalesce import VERSION_HEADER
+from bowling_entry import events as bowling_events
+from bowling_entry import export as bowling_export
+from bowling_entry import roster as bowling_roster
+from bowling_entry import schedule as bowling_schedule
+from bowling_entry.pagination import KeysetPagination
 from bowling_entry import serializers as bowling_serializers
 from bowling_entry.views import mixins
 
 
-class LeagueListCreate(generics.ListCreateAPIView):
+def set_version_header(response, batch):
+    """
+    Acknowledge the version of the match that a coalesced score sheet update was written at.
+    """
+    if batch is not None and batch.version is not None:
+        response[VERSION_HEADER] = str(batch.version)
+
+
+class LeagueListCreate(mixins.InstrumentedMixin, generics.ListCreateAPIView):
     queryset = bowling_models.League.objects
     serializer_class = bowling_serializers.LeagueList
+    query_budgets = {'GET': 1}
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
         serializer.save(secretary=self.request.user)
 
 
-class LeagueDetail(generics.RetrieveUpdateDestroyAPIView):
+class LeagueDetail(mixins.InstrumentedMixin, mixins.ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = bowling_models.League.objects.prefetch_related('teams', 'weeks')
     serializer_class = bowling_serializers.League
+    query_budgets = {'GET': 4, 'PATCH': 5}
+
+    def get_version_stamp(self):
+        stamp = bowling_models.League.objects.filter(pk=self.kwargs['pk']).values_list('version', 'modified').first()
+        if stamp is None:
+            return None
+
+        version, modified = stamp
+        return (self.kwargs['pk'], version), modified
 
+    def perform_destroy(self, instance):
+        # The matches are cleared a table at a time, the cascade would touch a match for every frame, game and bowler.
+        with transaction.atomic():
+            bowling_schedule.delete_matches(list(instance.weeks.all()))
+            instance.delete()
 
-class TeamDefinitionListCreate(generics.ListCreateAPIView, mixins.LeagueMixin):
+
+class TeamDefinitionListCreate(mixins.InstrumentedMixin, generics.ListCreateAPIView, mixins.LeagueMixin):
     serializer_class = bowling_serializers.TeamDefinition
+    query_budgets = {'GET': 3}
+    pagination_class = KeysetPagination
 
     def list(self, request, *args, **kwargs):
-        self.league = self.get_league()
+        self.get_league()
         return super(TeamDefinitionListCreate, self).list(request, *args, **kwargs)
 
     def get_queryset(self):
@@ -36,23 +79,17 @@ class TeamDefinitionListCreate(generics.ListCreateAPIView, mixins.LeagueMixin):
         return context
 
 
-class TeamDetail(generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin):
+class TeamDetail(mixins.InstrumentedMixin, generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin):
     serializer_class = bowling_serializers.TeamDefinition
-
-    def retrieve(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(TeamDetail, self).retrieve(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(TeamDetail, self).update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(TeamDetail, self).destroy(request, *args, **kwargs)
+    query_budgets = {'GET': 2}
 
     def get_queryset(self):
-        return self.league.teams
+        return bowling_models.TeamDefinition.objects.filter(**self.get_league_filter()).select_related('league')
+
+    def get_object(self):
+        obj = super(TeamDetail, self).get_object()
+        self.share_url_objects(league=obj.league)
+        return obj
 
     def perform_update(self, serializer):
         serializer.save(league=self.league)
@@ -63,18 +100,18 @@ class TeamDetail(generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin):
         return context
 
 
-class TeamBowlerDefinitionListCreate(generics.ListCreateAPIView, mixins.TeamMixin):
+class TeamBowlerDefinitionListCreate(mixins.InstrumentedMixin, generics.ListCreateAPIView, mixins.TeamMixin):
     serializer_class = bowling_serializers.TeamBowlerDefinition
+    query_budgets = {'GET': 2}
+    pagination_class = KeysetPagination
     team_url_kwarg = 'pk'
 
     def list(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.team = self.get_team()
+        self.get_team()
         return super(TeamBowlerDefinitionListCreate, self).list(request, *args, **kwargs)
 
     def create(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.team = self.get_team()
+        self.get_team()
         return super(TeamBowlerDefinitionListCreate, self).create(request, *args, **kwargs)
 
     def get_queryset(self):
@@ -89,26 +126,22 @@ class TeamBowlerDefinitionListCreate(generics.ListCreateAPIView, mixins.TeamMixi
         return context
 
 
-class TeamBowlerDefinitionDetail(generics.RetrieveUpdateDestroyAPIView, mixins.TeamMixin):
+class TeamBowlerDefinitionDetail(mixins.InstrumentedMixin, generics.RetrieveUpdateDestroyAPIView, mixins.TeamMixin):
     serializer_class = bowling_serializers.BowlerDefinition
-
-    def retrieve(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.team = self.get_team()
-        return super(TeamBowlerDefinitionDetail, self).retrieve(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.team = self.get_team()
-        return super(TeamBowlerDefinitionDetail, self).update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.team = self.get_team()
-        return super(TeamBowlerDefinitionDetail, self).destroy(request, *args, **kwargs)
+    query_budgets = {'GET': 2, 'PATCH': 4}
 
     def get_queryset(self):
-        return bowling_models.BowlerDefinition.objects.filter(league=self.league)
+        # Joining the teams of the league checks that the team of the URL is in the league as well.
+        filter_kwargs = self.get_league_filter()
+        filter_kwargs['league__teams__%s' % self.team_lookup_field] = self.kwargs[self.team_url_kwarg]
+        return bowling_models.BowlerDefinition.objects.filter(**filter_kwargs).select_related('league', 'team')
+
+    def get_object(self):
+        obj = super(TeamBowlerDefinitionDetail, self).get_object()
+        self.share_url_objects(league=obj.league)
+        if obj.team is not None and str(obj.team.pk) == str(self.kwargs[self.team_url_kwarg]):
+            self.share_url_objects(team=obj.team)
+        return obj
 
     def get_serializer_context(self):
         context = super(TeamBowlerDefinitionDetail, self).get_serializer_context()
@@ -119,15 +152,17 @@ class TeamBowlerDefinitionDetail(generics.RetrieveUpdateDestroyAPIView, mixins.T
         return context
 
 
-class SubstitutesList(generics.ListCreateAPIView, mixins.LeagueMixin):
+class SubstitutesList(mixins.InstrumentedMixin, generics.ListCreateAPIView, mixins.LeagueMixin):
     serializer_class = bowling_serializers.Substitute
+    query_budgets = {'GET': 2}
+    pagination_class = KeysetPagination
 
     def list(self, request, *args, **kwargs):
-        self.league = self.get_league()
+        self.get_league()
         return super(SubstitutesList, self).list(request, *args, **kwargs)
 
     def create(self, request, *args, **kwargs):
-        self.league = self.get_league()
+        self.get_league()
         return super(SubstitutesList, self).create(request, *args, **kwargs)
 
     def get_queryset(self):
@@ -142,23 +177,18 @@ class SubstitutesList(generics.ListCreateAPIView, mixins.LeagueMixin):
         return context
 
 
-class SubstituteDetail(generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin):
+class SubstituteDetail(mixins.InstrumentedMixin, generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin):
     serializer_class = bowling_serializers.Substitute
-
-    def destroy(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(SubstituteDetail, self).destroy(request, *args, **kwargs)
-
-    def retrieve(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(SubstituteDetail, self).retrieve(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(SubstituteDetail, self).update(request, *args, **kwargs)
+    query_budgets = {'GET': 1, 'PATCH': 4}
 
     def get_queryset(self):
-        return self.league.substitutes()
+        return bowling_models.BowlerDefinition.objects.filter(team=None, **self.get_league_filter()).select_related(
+            'league')
+
+    def get_object(self):
+        obj = super(SubstituteDetail, self).get_object()
+        self.share_url_objects(league=obj.league)
+        return obj
 
     def get_serializer_context(self):
         context = super(SubstituteDetail, self).get_serializer_context()
@@ -166,15 +196,26 @@ class SubstituteDetail(generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin
         return context
 
 
-class WeekList(generics.ListAPIView, mixins.LeagueMixin):
+class WeekList(mixins.InstrumentedMixin, mixins.ConditionalGetMixin, generics.ListAPIView,
+               mixins.LeagueMixin):
     serializer_class = bowling_serializers.Week
+    query_budgets = {'GET': 3}
+    pagination_class = KeysetPagination
+    ordering = ('week_number', )
 
-    def list(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(WeekList, self).list(request, *args, **kwargs)
+    def get_version_stamp(self):
+        leagues = bowling_models.League.objects.filter(pk=self.kwargs['league_pk'])
+        stamp = leagues.annotate(weeks_version=Sum('weeks__version'), weeks_modified=Max('weeks__modified')).values_list(
+            'version', 'modified', 'weeks_version', 'weeks_modified').first()
+        if stamp is None:
+            return None
+
+        version, modified, weeks_version, weeks_modified = stamp
+        return (self.kwargs['league_pk'], version, weeks_version), max(modified, weeks_modified or modified)
 
     def get_queryset(self):
-        return self.league.weeks.prefetch_related('matches')
+        # The version stamp already found the league, the weeks are listed without loading it again.
+        return bowling_models.Week.objects.filter(**self.get_league_filter()).prefetch_related('matches')
 
     def get_serializer_context(self):
         context = super(WeekList, self).get_serializer_context()
@@ -182,27 +223,21 @@ class WeekList(generics.ListAPIView, mixins.LeagueMixin):
         return context
 
 
-class WeekDetail(generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin):
+class WeekDetail(mixins.InstrumentedMixin, generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin):
     serializer_class = bowling_serializers.Week
+    query_budgets = {'GET': 2}
     lookup_field = 'week_number'
 
-    def retrieve(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(WeekDetail, self).retrieve(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(WeekDetail, self).update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        return super(WeekDetail, self).destroy(request, *args, **kwargs)
-
     def get_queryset(self):
-        return self.league.weeks
+        return bowling_models.Week.objects.filter(**self.get_league_filter()).select_related('league')
+
+    def get_object(self):
+        obj = super(WeekDetail, self).get_object()
+        self.share_url_objects(league=obj.league)
+        return obj
 
     def perform_update(self, serializer):
-        serializer.save(league=self.get_league())
+        serializer.save(league=self.league)
 
     def get_serializer_context(self):
         context = super(WeekDetail, self).get_serializer_context()
@@ -210,21 +245,36 @@ class WeekDetail(generics.RetrieveUpdateDestroyAPIView, mixins.LeagueMixin):
         return context
 
 
-class MatchList(generics.ListCreateAPIView, mixins.WeekMixin):
+class MatchList(mixins.InstrumentedMixin, mixins.ConditionalGetMixin, generics.ListCreateAPIView, mixins.WeekMixin):
     serializer_class = bowling_serializers.Match
+    query_budgets = {'GET': 6, 'POST': 20}
+    pagination_class = KeysetPagination
+    ordering = ('pk', )
+
+    def get_version_stamp(self):
+        weeks = bowling_models.Week.objects.filter(league=self.kwargs['league_pk'],
+                                                   week_number=self.kwargs['week_number'])
+        stamp = weeks.values_list('pk', 'version', 'modified', 'league__version', 'league__modified').first()
+        if stamp is None:
+            return None
+
+        week_pk, version, modified, league_version, league_modified = stamp
+        return (week_pk, version, league_version), max(modified, league_modified)
 
     def create(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.week = self.get_week()
+        self.get_week()
         return super(MatchList, self).create(request, *args, **kwargs)
 
-    def list(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.week = self.get_week()
-        return super(MatchList, self).list(request, *args, **kwargs)
+    def get_serializer(self, *args, **kwargs):
+        # A list of matches creates all of the matches of the week at once.
+        if isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super(MatchList, self).get_serializer(*args, **kwargs)
 
     def get_queryset(self):
-        return self.week.matches.prefetch_related('team1__definition', 'team2__definition')
+        # The version stamp already found the week, the matches are listed without loading it again.
+        matches = bowling_models.Match.objects.filter(**self.get_week_filter())
+        return matches.prefetch_related('team1__definition', 'team2__definition')
 
     def get_serializer_context(self):
         context = super(MatchList, self).get_serializer_context()
@@ -232,29 +282,53 @@ class MatchList(generics.ListCreateAPIView, mixins.WeekMixin):
         return context
 
 
-class MatchDetail(generics.RetrieveUpdateDestroyAPIView, mixins.WeekMixin):
+class MatchDetail(mixins.InstrumentedMixin, mixins.ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView,
+                  mixins.WeekMixin):
     serializer_class = bowling_serializers.ScoreSheet
+    # A changed game total adds the update of the standings, statistics and series of the match.
+    query_budgets = {'GET': 8, 'PATCH': 14, 'PATCH_TOTAL': 26}
+    batch = None
 
-    def retrieve(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.week = self.get_week()
-        return super(MatchDetail, self).retrieve(request, *args, **kwargs)
+    def get_version_stamp(self):
+        matches = bowling_models.Match.objects.filter(pk=self.kwargs['pk'], week__league=self.kwargs['league_pk'],
+                                                      week__week_number=self.kwargs['week_number'])
+        stamp = matches.values_list('version', 'modified', 'week__league__version', 'week__league__modified').first()
+        if stamp is None:
+            return None
 
-    def update(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.week = self.get_week()
-        return super(MatchDetail, self).update(request, *args, **kwargs)
+        version, modified, league_version, league_modified = stamp
+        return (self.kwargs['pk'], version, league_version), max(modified, league_modified)
 
-    def destroy(self, request, *args, **kwargs):
-        self.league = self.get_league()
-        self.week = self.get_week()
-        return super(MatchDetail, self).destroy(request, *args, **kwargs)
+    def retrieve(self, request, *args, **kwargs):
+        # The version stamp has already been looked up, a cached score sheet is served without loading the match.
+        data = bowling_cache.get_scoresheet(self.kwargs['pk'], self.versions)
+        if data is None:
+            instance = self.get_object()
+            data = self.get_serializer(instance).data
+            bowling_cache.set_scoresheet(instance.pk, self.versions, data)
+
+        return Response(data)
 
     def get_queryset(self):
-        return self.week.matches.select_related('team1', 'team2')
+        return bowling_models.Match.objects.filter(**self.get_week_filter()).select_related(
+            'week__league', 'team1__definition', 'team2__definition')
+
+    def get_object(self):
+        obj = super(MatchDetail, self).get_object()
+        self.share_url_objects(week=obj.week, league=obj.week.league)
+        return obj
+
+    def update(self, request, *args, **kwargs):
+        response = super(MatchDetail, self).update(request, *args, **kwargs)
+        set_version_header(response, self.batch)
+        return response
 
     def perform_update(self, serializer):
         serializer.save(week=self.week)
+        self.batch = serializer.batch
+
+    def perform_destroy(self, instance):
+        bowling_schedule.delete_match(instance)
 
     def get_serializer_context(self):
         context = super(MatchDetail, self).get_serializer_context()
@@ -262,8 +336,204 @@ class MatchDetail(generics.RetrieveUpdateDestroyAPIView, mixins.WeekMixin):
         return context
 
 
-class Self(generics.RetrieveUpdateAPIView):
+class FrameDetail(mixins.InstrumentedMixin, generics.GenericAPIView, mixins.WeekMixin):
+    """
+    Read or record the throws of a single frame of a game, addressed by the match, the bowler instance, the game number
+    and the frame number.  The game is looked up with everything above it in a single query.
+    """
+    serializer_class = bowling_serializers.FrameEntry
+    # A changed game total adds the update of the game and of the standings, statistics and series of the match.
+    query_budgets = {'GET': 2, 'PATCH': 6, 'PATCH_TOTAL': 19}
+    batch = None
+
+    def get_game(self):
+        games = bowling_models.Game.objects.filter(bowler=self.kwargs['bowler_pk'],
+                                                   game_number=self.kwargs['game_number'],
+                                                   bowler__team__match=self.kwargs['match_pk'],
+                                                   **self.get_week_filter('bowler__team__match__week'))
+        game = shortcuts.get_object_or_404(games.select_related('bowler__team__match__week__league'))
+
+        week = game.bowler.team.match.week
+        self.share_url_objects(week=week, league=week.league)
+        return game
+
+    def get_object(self):
+        frame_number = int(self.kwargs['frame_number'])
+        if not 1 <= frame_number <= bowling_models.FRAMES_PER_GAME:
+            raise Http404
+
+        game = self.get_game()
+        self.batch = ScoreSheetBatch(game.bowler.team.match, league=self.league)
+        self.batch.load_game(game)
+        return self.batch.get_frame(game, frame_number)
+
+    def get_serializer_context(self):
+        context = super(FrameDetail, self).get_serializer_context()
+        context['batch'] = self.batch
+        self.append_bowling_context(context)
+        return context
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        return Response(serializer.data)
+
+    def put(self, request, *args, **kwargs):
+        return self.update(request, partial=False)
+
+    def patch(self, request, *args, **kwargs):
+        return self.update(request, partial=True)
+
+    def update(self, request, partial):
+        serializer = self.get_serializer(self.get_object(), data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        response = Response(serializer.data)
+        set_version_header(response, self.batch)
+        return response
+
+
+class EventStreamMixin(object):
+    """
+    Stream the messages of the topic of the view as server-sent events.
+    """
+
+    def get_topic(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        last_id = bowling_events.parse_last_event_id(request.META.get('HTTP_LAST_EVENT_ID'))
+
+        response = StreamingHttpResponse(bowling_events.broker.listen(self.get_topic(), last_id),
+                                         content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class MatchEvents(EventStreamMixin, generics.GenericAPIView, mixins.WeekMixin):
+    """
+    Score sheet changes of the match as they are saved.
+    """
+
+    def get_topic(self):
+        matches = bowling_models.Match.objects.filter(pk=self.kwargs['pk'], **self.get_week_filter())
+        if not matches.exists():
+            raise Http404
+        return bowling_events.match_topic(self.kwargs['pk'])
+
+
+class WeekEvents(EventStreamMixin, generics.GenericAPIView, mixins.WeekMixin):
+    """
+    Score sheet changes of all of the matches of the week as they are saved.
+    """
+
+    def get_topic(self):
+        return bowling_events.week_topic(self.get_week().pk)
+
+
+class StandingsList(mixins.InstrumentedMixin, generics.ListAPIView):
+    """
+    Standings of the league as of the week requested, or as of the latest week when no week is provided.  Served from
+    the standings table with a single query.
+    """
+    serializer_class = bowling_serializers.Standing
+    query_budgets = {'GET': 1}
+
+    def get_queryset(self):
+        standings = bowling_models.TeamStanding.objects.filter(league=self.kwargs['league_pk'])
+
+        if 'week_number' in self.kwargs:
+            standings = standings.filter(week_number__lte=self.kwargs['week_number'])
+
+        return standings.values('team', 'team__name').annotate(
+            matches=Count('match'), won=Sum('points_won'), lost=Sum('points_lost'), games=Sum('games_bowled'),
+            scratch=Sum('scratch_pins'), handicap=Sum('handicap_pins')).order_by('-won', '-handicap', 'team__name')
+
+
+class Leaderboard(mixins.InstrumentedMixin, generics.GenericAPIView):
+    """
+    Highest games or series bowled across every active league of the bowling center, scratch or with handicap and
+    optionally for a single gender.  Served from the bowler series table with a single query.
+    """
+    serializer_class = bowling_serializers.LeaderboardQuery
+    permission_classes = (permissions.IsAdminUser, )
+    query_budgets = {'GET': 1}
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        entries = bowling_models.BowlerSeries.leaderboard(self.kwargs['category'], **serializer.validated_data)
+        return Response(bowling_serializers.LeaderboardEntry(entries, many=True).data)
+
+
+class ScheduleCreate(mixins.InstrumentedMixin, generics.GenericAPIView, mixins.LeagueMixin):
+    """
+    Generate the matches of every week of the season as a round-robin with rotating lanes.
+    """
+    serializer_class = bowling_serializers.Schedule
+    # Queries of a league whose rows fit in a single batch of inserts, larger leagues take one more per batch.
+    query_budgets = {'POST': 32}
+
+    def post(self, request, *args, **kwargs):
+        league = self.get_league()
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            matches = bowling_schedule.schedule_season(league, **serializer.validated_data)
+        except bowling_schedule.ScheduleError as error:
+            raise ValidationError(str(error))
+
+        return Response({'weeks': len(set(match.week_id for match in matches)), 'matches': len(matches)},
+                        status=status.HTTP_201_CREATED)
+
+
+class RosterImport(mixins.InstrumentedMixin, generics.GenericAPIView, mixins.LeagueMixin):
+    """
+    Add the teams, bowlers and substitutes of an uploaded CSV or JSON lines file to the league.
+    """
+    serializer_class = bowling_serializers.Roster
+    query_budgets = {'POST': 8}
+    parser_classes = (MultiPartParser, FormParser, )
+
+    def post(self, request, *args, **kwargs):
+        league = self.get_league()
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            summary = bowling_roster.import_roster(league, serializer.validated_data['file'],
+                                                   roster_format=serializer.validated_data['format'])
+        except bowling_roster.RosterError as error:
+            raise ValidationError(six.text_type(error))
+
+        return Response(summary, status=status.HTTP_201_CREATED)
+
+
+class LeagueExport(mixins.InstrumentedMixin, generics.GenericAPIView, mixins.LeagueMixin):
+    """
+    Stream every game and frame of the league as CSV or newline delimited JSON.
+    """
+    # Queries of a league that fits in a single chunk, every further chunk takes two more.
+    query_budgets = {'GET': 3}
+
+    def get(self, request, *args, **kwargs):
+        league = self.get_league()
+        export_format = self.kwargs['export_format']
+
+        response = StreamingHttpResponse(bowling_export.EXPORTERS[export_format](league),
+                                         content_type=bowling_export.CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = 'attachment; filename="league-%s.%s"' % (league.pk, export_format)
+        return response
+
+
+class Self(mixins.InstrumentedMixin, generics.RetrieveUpdateAPIView):
     serializer_class = bowling_serializers.User
+    query_budgets = {'GET': 0}
 
     def get_object(self):
         return self.request.user
@@ -1,10 +1,22 @@
+import calendar
+import zlib
+
+from bowling_entry import instrumentation
 from bowling_entry import models as bowling_models
 from django import shortcuts
+from django.http import Http404
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
 
 
 class LeagueMixin(object):
     """
     Mixin that should make looking up related items easier.
+
+    The objects named by the URL are looked up at most once per request, objects further down the URL are fetched
+    together with the objects above them in a single joined query.  The instances are kept on the view and shared with
+    the serializer context.
     """
     league_url_kwarg = 'league_pk'
     league_lookup_field = 'pk'
@@ -15,10 +27,25 @@ class LeagueMixin(object):
         return self.league_queryset
 
     def get_league(self):
-        filter_kwargs = {self.league_lookup_field: self.kwargs[self.league_url_kwarg]}
-        obj = shortcuts.get_object_or_404(self.get_league_queryset(), **filter_kwargs)
+        if self.league is None:
+            filter_kwargs = {self.league_lookup_field: self.kwargs[self.league_url_kwarg]}
+            self.league = shortcuts.get_object_or_404(self.get_league_queryset(), **filter_kwargs)
+
+        return self.league
 
-        return obj
+    def get_league_filter(self, path='league'):
+        """
+        Filter that restricts the objects related through the path to the league of the URL.
+        """
+        return {'%s__%s' % (path, self.league_lookup_field): self.kwargs[self.league_url_kwarg]}
+
+    def share_url_objects(self, **objects):
+        """
+        Keep the objects of the URL that were loaded along with another object, so they are not looked up again.
+        """
+        for name, obj in objects.items():
+            if getattr(self, name) is None:
+                setattr(self, name, obj)
 
     def append_bowling_context(self, context):
         if self.league is not None:
@@ -31,20 +58,19 @@ class TeamMixin(LeagueMixin):
     """
     team_url_kwarg = 'team_pk'
     team_lookup_field = 'pk'
-    team_queryset = bowling_models.League.objects
+    team_queryset = bowling_models.TeamDefinition.objects.select_related('league')
     team = None
 
     def get_team_queryset(self):
-        if self.league is None:
-            self.league = self.get_league()
-
-        return self.league.teams
+        return self.team_queryset.filter(**self.get_league_filter())
 
     def get_team(self):
-        filter_kwargs = {self.team_lookup_field: self.kwargs[self.team_url_kwarg]}
-        obj = shortcuts.get_object_or_404(self.get_team_queryset(), **filter_kwargs)
+        if self.team is None:
+            filter_kwargs = {self.team_lookup_field: self.kwargs[self.team_url_kwarg]}
+            self.team = shortcuts.get_object_or_404(self.get_team_queryset(), **filter_kwargs)
+            self.share_url_objects(league=self.team.league)
 
-        return obj
+        return self.team
 
     def append_bowling_context(self, context):
         super(TeamMixin, self).append_bowling_context(context)
@@ -55,22 +81,94 @@ class TeamMixin(LeagueMixin):
 class WeekMixin(LeagueMixin):
     week_url_kwarg = 'week_number'
     week_lookup_field = 'week_number'
-    week_queryset = bowling_models.League.objects
+    week_queryset = bowling_models.Week.objects.select_related('league')
     week = None
 
     def get_week_queryset(self):
-        if self.league is None:
-            self.league = self.get_league()
+        return self.week_queryset.filter(**self.get_league_filter())
 
-        return self.league.weeks
+    def get_week_filter(self, path='week'):
+        """
+        Filter that restricts the objects related through the path to the week of the URL.
+        """
+        filter_kwargs = self.get_league_filter('%s__league' % path)
+        filter_kwargs['%s__%s' % (path, self.week_lookup_field)] = self.kwargs[self.week_url_kwarg]
+        return filter_kwargs
 
     def get_week(self):
-        filter_kwargs = {self.week_lookup_field: self.kwargs[self.week_url_kwarg]}
-        obj = shortcuts.get_object_or_404(self.get_week_queryset(), **filter_kwargs)
+        if self.week is None:
+            filter_kwargs = {self.week_lookup_field: self.kwargs[self.week_url_kwarg]}
+            self.week = shortcuts.get_object_or_404(self.get_week_queryset(), **filter_kwargs)
+            self.share_url_objects(league=self.week.league)
 
-        return obj
+        return self.week
 
     def append_bowling_context(self, context):
         super(WeekMixin, self).append_bowling_context(context)
         if self.week is not None:
             context['week'] = self.week
+
+
+class ConditionalGetMixin(object):
+    """
+    Mixin that answers conditional GET requests from the version stamps of the resource.  The stamp is looked up before
+    anything is serialized, so a client that already has the current representation receives a 304 for the price of
+    that single lookup.
+    """
+    versions = None
+
+    def get_version_stamp(self):
+        """
+        Look up the version stamp of the resource.
+        :return: (tuple of versions identifying the representation, last modified datetime) or None when the resource
+        does not exist.
+        """
+        raise NotImplementedError
+
+    def get_etag(self, versions):
+        etag = '%s-%s-%s' % (self.__class__.__name__.lower(), '.'.join(str(version) for version in versions),
+                             self.request.accepted_renderer.format)
+
+        # Pages and other query parameters select different representations of the resource.
+        query_string = self.request.META.get('QUERY_STRING')
+        if query_string:
+            etag += '-%08x' % (zlib.crc32(query_string.encode('utf-8')) & 0xffffffff)
+        return etag
+
+    def is_not_modified(self, request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag in etags
+
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and last_modified <= if_modified_since
+
+    def get(self, request, *args, **kwargs):
+        stamp = self.get_version_stamp()
+        if stamp is None:
+            raise Http404
+
+        self.versions, modified = stamp
+        etag = self.get_etag(self.versions)
+        last_modified = calendar.timegm(modified.utctimetuple())
+
+        if self.is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+
+        response['ETag'] = quote_etag(etag)
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class InstrumentedMixin(object):
+    """
+    Mixin that times the validation and the serialization done by the serializers of the view when the request is
+    instrumented, see bowling_entry.instrumentation.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super(InstrumentedMixin, self).get_serializer(*args, **kwargs)
+        return instrumentation.instrument_serializer(serializer)
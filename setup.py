@@ -8,8 +8,10 @@ setup(name='bowling_entry',
       description='Bowling Entry core components',
       author='Robert Robinson',
       author_email='rerobins@meerkatlabs.org',
-      packages=['bowling_entry', 'bowling_entry.migrations', ],
+      packages=['bowling_entry', 'bowling_entry.management', 'bowling_entry.management.commands',
+                'bowling_entry.migrations', 'bowling_entry.rest_renderers', 'bowling_entry.serializers',
+                'bowling_entry.signals', 'bowling_entry.views', ],
       package_data={'bowling_entry': ['templates/bowling_entry/*.html']},
       include_package_data=True,
-      requires=['django', ],
+      requires=['django', 'numpy', ],
       )